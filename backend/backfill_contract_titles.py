@@ -0,0 +1,14 @@
+"""
+Fill contract_documents.display_title for rows ingested before titles were
+cleaned at ingest time (migration 0005 runs this once).
+
+    python backfill_contract_titles.py              # rows with no display_title
+    python backfill_contract_titles.py --recompute  # every row, after changing the cleaning rules
+"""
+import sys
+
+from database import engine
+from services.document_titles import backfill_display_titles
+
+if __name__ == "__main__":
+    backfill_display_titles(engine, recompute="--recompute" in sys.argv)
@@ -0,0 +1,85 @@
+"""
+Benchmark: fetching a folder of mail over IMAP, one message per round trip
+versus chunked UID FETCH (services/imap_fetch.py).
+
+Runs against the in-process fake IMAP server with a simulated per-command
+latency (default 20 ms, roughly a round trip to imappro.zoho.in), so the
+round-trip count dominates the way it does in production. Peak memory is
+what the consumer holds while handling messages one at a time.
+
+Run from the backend folder:
+    python benchmarks/bench_imap_fetch.py [messages] [latency_ms] [attachment_kb]
+"""
+import email
+import imaplib
+import os
+import sys
+import time
+import tracemalloc
+from email import policy
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_imap import FakeImapServer, make_message
+from services.imap_fetch import iter_headers, iter_messages, search_new_uids, select_folder
+
+MESSAGES = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+LATENCY_MS = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+ATTACHMENT_KB = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+
+def per_message(mail, uids, items):
+    """The pre-change loop: one UID FETCH round trip per message."""
+    for uid in uids:
+        status, data = mail.uid("FETCH", uid, items)
+        yield uid, email.message_from_bytes(data[0][1], policy=policy.default)
+
+
+def single_fetch(mail, uids, items):
+    """Everything in one FETCH - fewest round trips, whole folder in memory."""
+    status, data = mail.uid("FETCH", b",".join(uids).decode(), items)
+    messages = [email.message_from_bytes(item[1], policy=policy.default) for item in data if isinstance(item, tuple)]
+    for uid, msg in zip(uids, messages):
+        yield uid, msg
+
+
+def measure(server, label, fetch):
+    mail = imaplib.IMAP4("127.0.0.1", server.port)
+    mail.login("bench", "bench")
+    select_folder(mail, "Sent")
+    uids = search_new_uids(mail, 0)
+
+    commands_before = len(server.commands)
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = sum(1 for _uid, msg in fetch(mail, uids) if msg["Subject"])
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    mail.logout()
+
+    print(f"{label:<38} {elapsed * 1000:9.0f} ms   {len(server.commands) - commands_before:5} round trips   "
+          f"peak {peak / 1024 / 1024:7.1f} MB   {count} messages")
+
+
+if __name__ == "__main__":
+    server = FakeImapServer().start()
+    for i in range(MESSAGES):
+        server.add_message("Sent", make_message(f"[## {100000 + i} ##] Plumbing :: Leak :: K15A40324{i:05d}",
+                                                attachment_size=ATTACHMENT_KB * 1024 if i % 5 == 0 else 0))
+    server.latency = LATENCY_MS / 1000
+    print(f"{MESSAGES} messages (every 5th with a {ATTACHMENT_KB} KB PDF), {LATENCY_MS:g} ms per round trip\n")
+
+    print("Headers only")
+    headers = "(BODY.PEEK[HEADER.FIELDS (SUBJECT MESSAGE-ID DATE FROM TO)])"
+    measure(server, "  per message", lambda mail, uids: per_message(mail, uids, headers))
+    measure(server, "  chunked, 200 per FETCH", lambda mail, uids: iter_headers(mail, uids, chunk_size=200))
+
+    print("Full messages")
+    measure(server, "  per message", lambda mail, uids: per_message(mail, uids, "(RFC822)"))
+    measure(server, "  one FETCH for everything", lambda mail, uids: single_fetch(mail, uids, "(RFC822)"))
+    for chunk_size in (20, 100):
+        measure(server, f"  chunked, {chunk_size} per FETCH",
+                lambda mail, uids: iter_messages(mail, uids, chunk_size=chunk_size))
+    server.stop()
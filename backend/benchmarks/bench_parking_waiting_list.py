@@ -0,0 +1,114 @@
+"""
+Benchmark: parking waiting-list position for a property with a long queue.
+
+Compares the old lookup (load every waiting ParkingLock for the property and
+walk the list in Python) against the indexed COUNT and the optional
+in-memory per-property index. Uses an in-memory SQLite database, so
+absolute numbers are only indicative; rows transferred are exact.
+
+Run from the backend folder:
+    python benchmarks/bench_parking_waiting_list.py [waiting] [other_properties_rows]
+"""
+import os
+import sys
+import time
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import asc, create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+from models.parking import ParkingLock
+from services.parking_queue import WaitingListIndex, waiting_position_query
+
+WAITING = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+OTHER_ROWS = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+PROPERTY_ID = 1
+RUNS = 50
+
+engine = create_engine("sqlite://", poolclass=StaticPool)
+Session = sessionmaker(bind=engine, autoflush=False)
+Base.metadata.create_all(engine)
+
+# Rows each strategy pulls from the database for one lookup
+rows_fetched = 0
+
+
+def seed():
+    db = Session()
+    db.add_all(
+        ParkingLock(id=i, property_id=PROPERTY_ID, flat_customer_reference_id=f"D{i}",
+                    parking_notify_me=(i % 4 != 0))
+        for i in range(1, WAITING * 4 // 3 + 2)
+    )
+    db.add_all(
+        ParkingLock(id=100000 + i, property_id=2 + i % 50, flat_customer_reference_id=f"O{i}",
+                    parking_notify_me=True)
+        for i in range(OTHER_ROWS)
+    )
+    db.commit()
+    db.close()
+
+
+def legacy_position(db, parking):
+    """The pre-change lookup: every waiting row for the property, then a Python scan."""
+    global rows_fetched
+    waiting_list = db.query(ParkingLock).filter(
+        ParkingLock.property_id == parking.property_id,
+        ParkingLock.parking_notify_me == True
+    ).order_by(asc(ParkingLock.id)).all()
+    rows_fetched = len(waiting_list)
+    for i, entry in enumerate(waiting_list):
+        if entry.id == parking.id:
+            return i + 1
+    return 1
+
+
+def count_position(db, parking):
+    global rows_fetched
+    rows_fetched = 1
+    return db.execute(waiting_position_query(parking)).scalar()
+
+
+index = WaitingListIndex(ttl=3600)
+
+
+def index_position(db, parking):
+    global rows_fetched
+    rows_fetched = 0
+    return index.position(db, parking)
+
+
+def measure(label, fn, parking):
+    timings = []
+    result = None
+    for _ in range(RUNS):
+        db = Session()
+        started = time.perf_counter()
+        result = fn(db, parking)
+        timings.append((time.perf_counter() - started) * 1000)
+        db.close()
+    print(f"{label:<34} median {statistics.median(timings):8.3f} ms   "
+          f"p95 {sorted(timings)[int(RUNS * 0.95) - 1]:8.3f} ms   "
+          f"position {result:>6}   rows fetched {rows_fetched}")
+    return result
+
+
+if __name__ == "__main__":
+    seed()
+    db = Session()
+    waiting = db.query(ParkingLock).filter(
+        ParkingLock.property_id == PROPERTY_ID, ParkingLock.parking_notify_me == True
+    ).order_by(ParkingLock.id).all()
+    target = waiting[-1]  # worst case for the old scan: last in the queue
+    db.expunge_all()
+    db.close()
+    print(f"Property with {len(waiting)} waiting entries (+{OTHER_ROWS} rows elsewhere), {RUNS} runs each\n")
+
+    index.position(Session(), target)  # first lookup loads the property's queue
+    expected = measure("legacy (load queue + scan)", legacy_position, target)
+    assert measure("indexed COUNT(*) WHERE id <= :id", count_position, target) == expected
+    assert measure("in-memory per-property index", index_position, target) == expected
@@ -0,0 +1,128 @@
+"""
+Benchmark: referral dashboard latency for a referrer with hundreds of invites.
+
+Compares the old dashboard (one LIKE query per pending referral on every GET)
+against the current read-only dashboard plus the batched reconciliation job.
+Uses an in-memory SQLite database, so absolute numbers are only indicative;
+the statement counts are exact.
+
+Run from the backend folder:
+    python benchmarks/bench_referral_dashboard.py [invites] [bookings]
+"""
+import os
+import sys
+import time
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+from models.booking import FlatBookingOrder
+from models.referral import Referral, ReferralCode
+from routes.referral import get_dashboard
+from services.referral_sync import reconcile_pending_referrals
+
+INVITES = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+BOOKINGS = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+REFERRER = "K01BENCH000001"
+RUNS = 20
+
+engine = create_engine("sqlite://", poolclass=StaticPool)
+Session = sessionmaker(bind=engine, autoflush=False)
+Base.metadata.create_all(engine)
+
+statement_count = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count(conn, cursor, statement, parameters, context, executemany):
+    global statement_count
+    statement_count += 1
+
+
+def seed():
+    db = Session()
+    db.add_all(
+        FlatBookingOrder(
+            id=i,
+            flat_booking_order_code=f"K{i:012d}",
+            tenant_phone_number=f"+91 9{i:09d}",
+            status="Active",
+        )
+        for i in range(1, BOOKINGS + 1)
+    )
+    # Every 10th referee has booked
+    db.add_all(
+        Referral(
+            referrer_booking_id=REFERRER,
+            referee_name=f"Friend {i}",
+            referee_phone=f"9{i:09d}" if i % 10 == 0 else f"8{i:09d}",
+            referral_code=f"KOTS-{i:06d}",
+            status="Pending",
+        )
+        for i in range(1, INVITES + 1)
+    )
+    db.add(ReferralCode(booking_id=REFERRER, code="KOTS-BENCH1"))
+    db.commit()
+    db.close()
+
+
+def legacy_dashboard(db):
+    """The pre-batching dashboard: N LIKE queries + 3 counts + list."""
+    pending = db.query(Referral).filter(
+        Referral.referrer_booking_id == REFERRER,
+        Referral.status == "Pending"
+    ).all()
+    for ref in pending:
+        booked = db.query(FlatBookingOrder).filter(
+            FlatBookingOrder.tenant_phone_number.contains(ref.referee_phone),
+            FlatBookingOrder.flat_booking_order_code.isnot(None),
+            FlatBookingOrder.flat_booking_order_code != ""
+        ).first()
+        if booked:
+            ref.status = "Successful"
+            ref.booking_id = booked.flat_booking_order_code
+    if pending:
+        db.commit()
+    for status in (None, "Successful", "Pending"):
+        q = db.query(Referral).filter(Referral.referrer_booking_id == REFERRER)
+        if status:
+            q = q.filter(Referral.status == status)
+        q.count()
+    return db.query(Referral).filter(
+        Referral.referrer_booking_id == REFERRER
+    ).order_by(Referral.created_at.desc()).all()
+
+
+def measure(label, fn):
+    global statement_count
+    timings = []
+    statements = 0
+    for _ in range(RUNS):
+        db = Session()
+        statement_count = 0
+        started = time.perf_counter()
+        fn(db)
+        timings.append((time.perf_counter() - started) * 1000)
+        statements = statement_count
+        db.close()
+    print(f"{label:<38} median {statistics.median(timings):8.2f} ms   "
+          f"p95 {sorted(timings)[int(RUNS * 0.95) - 1]:8.2f} ms   {statements} statements")
+
+
+if __name__ == "__main__":
+    seed()
+    print(f"Referrer with {INVITES} invites, {BOOKINGS} bookings, {RUNS} runs each\n")
+
+    # Warm-up run settles the referees who have booked, like production steady state
+    db = Session()
+    legacy_dashboard(db)
+    db.close()
+    measure("legacy dashboard (per-referral LIKE)", legacy_dashboard)
+
+    measure("reconcile job (batched)", lambda db: reconcile_pending_referrals(db))
+    measure("dashboard GET (read-only)", lambda db: get_dashboard(booking_id=REFERRER, db=db, current_user_phone=""))
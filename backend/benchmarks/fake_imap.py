@@ -0,0 +1,338 @@
+"""
+In-process fake IMAP server for offline tests and benchmarks of the email syncs.
+
+Speaks the subset of IMAP4rev1 that imaplib and the sync services use:
+CAPABILITY, LOGIN, SELECT/EXAMINE, SEARCH / UID SEARCH (ALL, SINCE, UID sets,
+SUBJECT, OR, NOT and parenthesised lists), FETCH / UID FETCH (UID, RFC822,
+BODY[] / BODY.PEEK[], BODY.PEEK[HEADER.FIELDS (...)]), IDLE/DONE, CLOSE, LOGOUT.
+Plain TCP on 127.0.0.1 - point EMAIL_HOST/EMAIL_PORT at it with EMAIL_USE_SSL=false.
+
+    with FakeImapServer() as server:
+        server.add_message("Sent", make_message(subject="[## 1 ##] ..."))
+        ...  # settings.email_port = server.port
+
+An optional per-round-trip `latency` (seconds) makes the server behave like a
+remote one, so batching shows up in benchmarks; `drop_on_fetch` simulates a
+connection lost mid-sync, and `omit_on_fetch` UIDs are left out of FETCH
+responses (a message the server can't deliver).
+"""
+
+import re
+import socket
+import socketserver
+import threading
+import time
+from datetime import datetime
+from email.message import EmailMessage
+from email.utils import format_datetime, make_msgid, parsedate_to_datetime
+
+_TOKEN = re.compile(rb'\(|\)|"(?:[^"\\]|\\.)*"|[^\s()]+')
+_HEADER_FIELDS = re.compile(rb"HEADER\.FIELDS \(([^)]*)\)", re.IGNORECASE)
+
+
+def make_message(subject, body="", message_id=None, date=None, sender="tickets@kots.world",
+                 to="tenant@example.com", attachment_size=0) -> bytes:
+    """Raw RFC 822 bytes for a test email, optionally with a PDF attachment."""
+    msg = EmailMessage()
+    msg["Subject"] = subject
+    msg["From"] = sender
+    msg["To"] = to
+    msg["Date"] = format_datetime(date or datetime.now().astimezone())
+    msg["Message-ID"] = message_id or make_msgid(domain="kots.world")
+    msg.set_content(body or subject)
+    if attachment_size:
+        msg.add_attachment(b"%PDF-1.4\n" + b"0" * attachment_size, maintype="application",
+                           subtype="pdf", filename="document.pdf")
+    return msg.as_bytes().replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+
+
+class _Folder:
+    def __init__(self, uidvalidity):
+        self.uidvalidity = uidvalidity
+        self.messages = []  # [(uid, raw bytes)]
+        self.next_uid = 1
+
+
+class FakeImapServer:
+    def __init__(self, latency: float = 0.0, uidvalidity: int = 1):
+        self.latency = latency
+        self.uidvalidity = uidvalidity
+        self.folders = {}
+        self.commands = []  # every command received, for assertions
+        self.drop_on_fetch = 0  # close the connection on the next N FETCH commands
+        self.omit_on_fetch = set()  # UIDs left out of FETCH responses
+        self.capabilities = b"IMAP4rev1 IDLE"  # drop IDLE to mimic a server without it
+        self._lock = threading.Lock()
+        self._idlers = set()
+
+    # --- mailbox content -------------------------------------------------
+
+    def add_message(self, folder: str, raw: bytes) -> int:
+        """Append a message and wake any IDLE session. Returns its UID."""
+        with self._lock:
+            box = self.folders.setdefault(folder, _Folder(self.uidvalidity))
+            uid = box.next_uid
+            box.next_uid += 1
+            box.messages.append((uid, raw))
+            count = len(box.messages)
+            idlers = [h for h in self._idlers if h.selected == folder]
+        for handler in idlers:
+            handler.reported = count
+            handler.notify(b"* %d EXISTS\r\n" % count)
+        return uid
+
+    def disconnect_idlers(self):
+        """Drop every connection that is currently in IDLE (simulates a network cut)."""
+        with self._lock:
+            idlers = list(self._idlers)
+        for handler in idlers:
+            handler.request.shutdown(socket.SHUT_RDWR)
+
+    def reset_uidvalidity(self, folder: str, uidvalidity: int):
+        """Simulate the server renumbering a folder."""
+        with self._lock:
+            self.folders[folder].uidvalidity = uidvalidity
+
+    # --- server lifecycle ----------------------------------------------
+
+    def start(self):
+        server = self
+
+        class Handler(_ImapHandler):
+            fake = server
+
+        self._tcp = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self._tcp.daemon_threads = True
+        self.port = self._tcp.server_address[1]
+        self._thread = threading.Thread(target=self._tcp.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._tcp.shutdown()
+        self._tcp.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _ImapHandler(socketserver.StreamRequestHandler):
+    fake: FakeImapServer = None
+
+    def setup(self):
+        super().setup()
+        self.selected = None
+        self.reported = 0  # EXISTS count this session has been told about
+        self._write_lock = threading.Lock()
+
+    def notify(self, data: bytes):
+        with self._write_lock:
+            try:
+                self.wfile.write(data)
+                self.wfile.flush()
+            except OSError:
+                pass
+
+    def send(self, data: bytes):
+        with self._write_lock:
+            self.wfile.write(data)
+            self.wfile.flush()
+
+    def handle(self):
+        self.send(b"* OK [CAPABILITY %s] Fake IMAP ready\r\n" % self.fake.capabilities)
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if self.fake.latency:
+                time.sleep(self.fake.latency)
+            parts = line.rstrip(b"\r\n").split(b" ", 2)
+            if len(parts) < 2:
+                continue
+            tag, command = parts[0], parts[1].upper()
+            args = parts[2] if len(parts) > 2 else b""
+            self.fake.commands.append((command + b" " + args).strip().decode(errors="replace"))
+            use_uid = command == b"UID"
+            if use_uid:
+                command, _, args = args.partition(b" ")
+                command = command.upper()
+            handler = getattr(self, "cmd_" + command.decode().lower(), None)
+            if handler is None:
+                self.send(tag + b" BAD unknown command\r\n")
+                continue
+            if handler(tag, args, use_uid) is False:
+                return
+
+    # --- commands --------------------------------------------------------
+
+    def cmd_capability(self, tag, args, use_uid):
+        self.send(b"* CAPABILITY %s\r\n" % self.fake.capabilities + tag + b" OK CAPABILITY completed\r\n")
+
+    def cmd_noop(self, tag, args, use_uid):
+        count = len(self._messages())
+        untagged = b"* %d EXISTS\r\n" % count if self.selected and count != self.reported else b""
+        self.reported = count
+        self.send(untagged + tag + b" OK NOOP completed\r\n")
+
+    def cmd_login(self, tag, args, use_uid):
+        self.send(tag + b" OK LOGIN completed\r\n")
+
+    def cmd_logout(self, tag, args, use_uid):
+        self.send(b"* BYE logging out\r\n" + tag + b" OK LOGOUT completed\r\n")
+        return False
+
+    def cmd_close(self, tag, args, use_uid):
+        self.selected = None
+        self.send(tag + b" OK CLOSE completed\r\n")
+
+    def cmd_select(self, tag, args, use_uid):
+        name = args.decode().strip().strip('"')
+        box = self.fake.folders.get(name)
+        if box is None:
+            self.send(tag + b" NO no such mailbox\r\n")
+            return
+        self.selected = name
+        self.reported = len(box.messages)
+        self.send(
+            b"* %d EXISTS\r\n* 0 RECENT\r\n* OK [UIDVALIDITY %d] UIDs valid\r\n* OK [UIDNEXT %d]\r\n"
+            % (len(box.messages), box.uidvalidity, box.next_uid)
+            + tag + b" OK [READ-WRITE] SELECT completed\r\n"
+        )
+
+    cmd_examine = cmd_select
+
+    def cmd_idle(self, tag, args, use_uid):
+        self.send(b"+ idling\r\n")
+        with self.fake._lock:
+            self.fake._idlers.add(self)
+            count = len(self._messages())
+        if count != self.reported:
+            self.reported = count
+            self.notify(b"* %d EXISTS\r\n" % count)
+        try:
+            line = self.rfile.readline()
+        finally:
+            with self.fake._lock:
+                self.fake._idlers.discard(self)
+        if not line:
+            return False
+        self.send(tag + b" OK IDLE terminated\r\n")
+
+    def _messages(self):
+        return self.fake.folders[self.selected].messages if self.selected else []
+
+    def cmd_search(self, tag, args, use_uid):
+        messages = self._messages()
+        tokens = _TOKEN.findall(args)
+        if tokens and tokens[0].upper() == b"CHARSET":
+            tokens = tokens[2:]
+        predicate = _parse_search(tokens, len(messages), messages[-1][0] if messages else 0)
+        hits = [uid if use_uid else seq for seq, (uid, raw) in enumerate(messages, 1) if predicate(seq, uid, raw)]
+        self.send(b"* SEARCH" + b"".join(b" %d" % n for n in hits) + b"\r\n" + tag + b" OK SEARCH completed\r\n")
+
+    def cmd_fetch(self, tag, args, use_uid):
+        if self.fake.drop_on_fetch > 0:
+            self.fake.drop_on_fetch -= 1
+            return False
+        messages = self._messages()
+        id_set, _, items = args.partition(b" ")
+        items_upper = items.upper()
+        max_id = messages[-1][0] if use_uid and messages else len(messages)
+        wanted = _parse_set(id_set, max_id)
+        out = []
+        for seq, (uid, raw) in enumerate(messages, 1):
+            if (uid if use_uid else seq) not in wanted or uid in self.fake.omit_on_fetch:
+                continue
+            if b"HEADER.FIELDS" in items_upper:
+                fields = _HEADER_FIELDS.search(items).group(1).split()
+                section, payload = b"BODY[HEADER.FIELDS (%s)]" % b" ".join(fields), _header_fields(raw, fields)
+            elif b"RFC822" in items_upper:
+                section, payload = b"RFC822", raw
+            else:
+                section, payload = b"BODY[]", raw
+            prefix = b"UID %d " % uid if use_uid or b"UID" in items_upper.split(b"[")[0] else b""
+            out.append(b"* %d FETCH (%s%s {%d}\r\n" % (seq, prefix, section, len(payload)) + payload + b")\r\n")
+        self.send(b"".join(out) + tag + b" OK FETCH completed\r\n")
+
+
+def _header_fields(raw: bytes, fields) -> bytes:
+    """The requested header lines (with continuations) plus the blank separator."""
+    wanted = {f.upper() for f in fields}
+    head = raw.split(b"\r\n\r\n", 1)[0]
+    kept, keep = [], False
+    for line in head.split(b"\r\n"):
+        if line[:1] in (b" ", b"\t"):
+            if keep:
+                kept.append(line)
+            continue
+        keep = line.split(b":", 1)[0].strip().upper() in wanted
+        if keep:
+            kept.append(line)
+    return b"\r\n".join(kept) + b"\r\n\r\n"
+
+
+def _parse_set(text: bytes, max_id: int) -> set:
+    ids = set()
+    for part in text.split(b","):
+        if b":" in part:
+            lo, hi = part.split(b":")
+            lo = max_id if lo == b"*" else int(lo)
+            hi = max_id if hi == b"*" else int(hi)
+            ids.update(range(min(lo, hi), max(lo, hi) + 1))
+        else:
+            ids.add(max_id if part == b"*" else int(part))
+    return ids
+
+
+def _header(raw: bytes, name: bytes) -> str:
+    value = _header_fields(raw, [name]).split(b":", 1)
+    return value[1].decode(errors="replace").replace("\r\n", "").strip() if len(value) > 1 else ""
+
+
+def _parse_search(tokens, message_count, max_uid):
+    """Search key tokens -> predicate(seq, uid, raw). Consecutive keys are ANDed."""
+    pos = 0
+
+    def key():
+        nonlocal pos
+        token = tokens[pos]
+        pos += 1
+        upper = token.upper()
+        if token == b"(":
+            parts = []
+            while tokens[pos] != b")":
+                parts.append(key())
+            pos += 1
+            return lambda *m: all(p(*m) for p in parts)
+        if upper == b"ALL":
+            return lambda *m: True
+        if upper == b"OR":
+            left, right = key(), key()
+            return lambda *m: left(*m) or right(*m)
+        if upper == b"NOT":
+            inner = key()
+            return lambda *m: not inner(*m)
+        if upper == b"UID":
+            uids = _parse_set(tokens[pos], max_uid)
+            pos += 1
+            return lambda seq, uid, raw: uid in uids
+        if upper == b"SUBJECT":
+            needle = tokens[pos].strip(b'"').decode().lower()
+            pos += 1
+            return lambda seq, uid, raw: needle in _header(raw, b"SUBJECT").lower()
+        if upper == b"SINCE":
+            since = datetime.strptime(tokens[pos].strip(b'"').decode(), "%d-%b-%Y").date()
+            pos += 1
+            return lambda seq, uid, raw: parsedate_to_datetime(_header(raw, b"DATE")).date() >= since
+        if upper[:1].isdigit() or upper[:1] == b"*":
+            seqs = _parse_set(token, message_count)
+            return lambda seq, uid, raw: seq in seqs
+        raise ValueError(f"unsupported search key {token!r}")
+
+    parts = []
+    while pos < len(tokens):
+        parts.append(key())
+    return lambda *m: all(p(*m) for p in parts)
@@ -5,6 +5,15 @@ from urllib.parse import quote_plus
 from typing import Optional
 
 
+def _to_async_url(url: str) -> str:
+    """Swap the sync driver for its asyncio counterpart (asyncpg / aiosqlite)."""
+    if url.startswith("sqlite"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    scheme, rest = url.split("://", 1)
+    # asyncpg takes ssl=<mode> instead of libpq's sslmode=<mode>
+    return f"postgresql+asyncpg://{rest.replace('sslmode=', 'ssl=')}"
+
+
 class Settings(BaseSettings):
     """Application settings loaded from environment variables"""
     
@@ -17,11 +26,37 @@ class Settings(BaseSettings):
     # Database connection URL - can be provided in .env or constructed
     database_url: Optional[str] = None
 
+    # Async (asyncpg) URL for routes using AsyncSession - derived from database_url if not set
+    async_database_url: Optional[str] = None
+    # Optional read replica (e.g. the Aurora reader endpoint) for read-only routes
+    read_database_url: Optional[str] = None
+    async_read_database_url: Optional[str] = None
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    # Sessions /api/home opens at once to load its sections, across all requests;
+    # keep well below db_pool_size + db_max_overflow so other routes still get connections
+    home_section_concurrency: int = 4
+
     # Email (IMAP) Configuration
     email_host: str = "imappro.zoho.in"
     email_port: int = 993
     email_user: str = "jayasuriyaa.e@quantaops.com"
     email_password: str = ""
+    # Plain-TCP IMAP is only for local stand-ins (benchmarks/fake_imap.py)
+    email_use_ssl: bool = True
+    # UIDs per IMAP FETCH in the email syncs: header-only fetches, and full
+    # messages (each full chunk is held in memory while it is processed)
+    imap_header_chunk_size: int = 200
+    imap_body_chunk_size: int = 20
+    # Ticket sync: IMAP IDLE pushes new Sent mail as it arrives. The poll runs
+    # every ticket_sync_poll_minutes while no IDLE connection is live (IDLE off,
+    # unsupported, or reconnecting), and only as a safety net while one is
+    ticket_sync_idle_enabled: bool = True
+    ticket_sync_poll_minutes: int = 3
+    ticket_sync_idle_fallback_minutes: int = 15
+    # Servers drop IDLE after 30 minutes; lost connections retry with backoff
+    imap_idle_renew_minutes: int = 29
+    imap_idle_max_backoff_seconds: int = 300
 
     # SMTP Configuration (for sending emails)
     smtp_host: str = "smtppro.zoho.in"
@@ -35,6 +70,10 @@ class Settings(BaseSettings):
     my_aws_region: str = "us-east-1"
     my_aws_bucket_name: str = ""
 
+    # Presigned S3 URLs are reused until they are this close to expiring
+    presigned_url_cache_size: int = 10000
+    presigned_url_refresh_margin_seconds: int = 300
+
     # CORS Configuration
     cors_origins: list[str] = [
         "http://localhost:4200", 
@@ -48,12 +87,64 @@ class Settings(BaseSettings):
     cookie_samesite: str = "lax"
     
     jwt_secret: str = "your_super_secret_key_change_this" # Fallback, should be in .env
+
+    # Operational endpoints (metrics, property-wide parking snapshots) need the
+    # X-Ops-Key header to match this; left empty they are refused for everyone
+    ops_api_key: str = ""
+
+    # Verified session token cache (entries expire at the token's exp claim)
+    token_cache_size: int = 10000
+
+    # Phone -> booking codes ownership index; a miss is re-checked on the primary before a 403,
+    # so the TTL only bounds how long a booking removed outside this app keeps granting access
+    booking_ownership_cache_size: int = 10000
+    booking_ownership_ttl_seconds: int = 300
+
+    # Booking code -> flat/dummy code, tenant phone and status (services/booking_resolver.py)
+    booking_resolver_cache_size: int = 10000
+    booking_resolver_ttl_seconds: int = 300
+
+    # Flat (WiFi, max occupancy) and KYC data cache (services/data_cache.py).
+    # Backend is "memory" (per-process) or "redis" (shared; needs the redis package)
+    data_cache_backend: str = "memory"
+    data_cache_redis_url: str = "redis://localhost:6379/0"
+    flat_cache_size: int = 5000
+    flat_cache_ttl_seconds: int = 3600
+    kyc_cache_size: int = 10000
+    kyc_cache_ttl_seconds: int = 3600
+
+    # In-memory per-property parking waiting list (services/parking_queue.py);
+    # off = one indexed COUNT per status check
+    parking_waiting_index_enabled: bool = False
+    parking_waiting_index_ttl_seconds: int = 60
+
+    # Per-property parking snapshot cache (services/parking_snapshot.py); reservations
+    # expiring within the window count as "expiring"
+    parking_snapshot_cache_size: int = 2000
+    parking_snapshot_ttl_seconds: int = 60
+    parking_expiring_window_hours: int = 48
+
+    # SSO tokens are reused until they are this close to their 7-day expiry
+    sso_token_cache_size: int = 10000
+    sso_token_refresh_window_seconds: int = 86400
+
+    # Background job that marks Pending referrals as Successful once the referee books
+    referral_reconcile_interval_minutes: int = 5
+
+    # SQL instrumentation: statements slower than this go to the slow-query log;
+    # the per-route summary keeps this many recent requests per route
+    slow_query_threshold_ms: float = 200.0
+    route_metrics_window: int = 500
     
     @model_validator(mode='after')
     def assemble_database_url(self) -> 'Settings':
         if not self.database_url:
             encoded_password = quote_plus(self.db_password)
             self.database_url = f"postgresql://{self.db_user}:{encoded_password}@{self.db_host}:{self.db_port}/{self.db_name}?sslmode=require"
+        if not self.async_database_url:
+            self.async_database_url = _to_async_url(self.database_url)
+        if self.read_database_url and not self.async_read_database_url:
+            self.async_read_database_url = _to_async_url(self.read_database_url)
         return self
 
     model_config = SettingsConfigDict(
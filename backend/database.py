@@ -1,24 +1,101 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, Insert, Update, Delete
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
 from config import get_settings
+from services.query_metrics import instrument_engine
 
 settings = get_settings()
 
+
+def _engine_options(url: str) -> dict:
+    """Pool settings for Postgres; SQLite (local stand-in) uses SQLAlchemy's defaults."""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_pre_ping": True,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+    }
+
+
+def _create_engine(url: str):
+    return create_engine(
+        url,
+        connect_args={
+            "sslmode": "disable" if "localhost" in url else "require"
+        } if url.startswith("postgresql") else {},
+        **_engine_options(url)
+    )
+
+
+def _create_async_engine(url: str):
+    return create_async_engine(
+        url,
+        connect_args={
+            "ssl": False if "localhost" in url else "require"
+        } if url.startswith("postgresql") else {},
+        **_engine_options(url)
+    )
+
+
 # Create SQLAlchemy engine
-engine = create_engine(
-    settings.database_url,
-    connect_args={
-        "sslmode": "disable" if "localhost" in settings.database_url else "require"
-    },
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10
-)
+engine = _create_engine(settings.database_url)
+
+# Async engine for routes that use AsyncSession (no thread pool hop per request)
+async_engine = _create_async_engine(settings.async_database_url)
+
+# Read replica engines - fall back to the primary when no replica is configured
+if settings.read_database_url:
+    read_engine = _create_engine(settings.read_database_url)
+    async_read_engine = _create_async_engine(settings.async_read_database_url)
+else:
+    read_engine = engine
+    async_read_engine = async_engine
+
+
+# Per-request statement count / DB time (see services/query_metrics.py)
+for _engine in {engine, read_engine}:
+    instrument_engine(_engine)
+for _engine in {async_engine, async_read_engine}:
+    instrument_engine(_engine.sync_engine)
+
+
+class RoutingSession(Session):
+    """
+    Session for read-only routes: statements go to the replica until the
+    session writes anything, after which it sticks to the primary so reads
+    that follow a write see it.
+    """
+
+    def __init__(self, primary=None, replica=None, **kw):
+        super().__init__(**kw)
+        self.primary = primary
+        self.replica = replica
+        self.stick_to_primary = False
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kw):
+        # An explicit bind_arguments={"bind": ...} (e.g. session.primary) wins
+        if bind is not None:
+            return bind
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.stick_to_primary = True
+        return self.primary if self.stick_to_primary else self.replica
 
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+ReadSessionLocal = sessionmaker(
+    class_=RoutingSession, primary=engine, replica=read_engine,
+    autocommit=False, autoflush=False
+)
+AsyncReadSessionLocal = async_sessionmaker(
+    class_=AsyncSession, sync_session_class=RoutingSession,
+    primary=async_engine.sync_engine, replica=async_read_engine.sync_engine,
+    autoflush=False, expire_on_commit=False
+)
 
 # Base class for models
 Base = declarative_base()
@@ -31,3 +108,32 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Async counterpart of get_db for `async def` routes"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db():
+    """Like get_db, but reads go to the read replica (if configured)"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    """Async counterpart of get_read_db"""
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+def get_async_read_sessionmaker():
+    """
+    Session factory for routes that run several reads concurrently - an
+    AsyncSession can't be shared between tasks, so each opens its own
+    """
+    return AsyncReadSessionLocal
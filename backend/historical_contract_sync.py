@@ -15,6 +15,7 @@ from database import SessionLocal
 from config import get_settings
 from models.contract_document import ContractDocument
 from services.s3_service import S3Service
+from services.document_titles import clean_document_title
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -119,6 +120,7 @@ def process_booking_id(mail, booking_id, db, existing_msg_ids):
             tenant_email=_extract_email_address(msg.get("To", "")),
             document_category=category,
             document_title=subject,
+            display_title=clean_document_title(subject, booking_id),
             sign_url=sign_url,
             pdf_url=pdf_url,
             email_message_id=message_id,
@@ -1,8 +1,9 @@
-from fastapi import FastAPI, Depends, Response
+from fastapi import FastAPI, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 
 from contextlib import asynccontextmanager
+import time
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from database import get_db, SessionLocal
@@ -16,9 +17,15 @@ from routes.invoices import router as invoices_router
 from routes.wifi import router as wifi_router
 from routes.occupancy import router as occupancy_router
 from routes.notification import router as notification_router
+from routes.metrics import router as metrics_router
+from routes.home import router as home_router
+from routes.access_urls import router as access_urls_router
 from services.email_service import sync_sign_request_emails
 from services.ticket_email_sync import sync_ticket_emails
+from services.imap_idle import CoalescingRunner, ImapIdleWatcher
+from services.referral_sync import reconcile_pending_referrals
 from services.websocket_manager import manager
+from services.query_metrics import start_request, end_request, record_route, server_timing_header
 from fastapi import WebSocket, WebSocketDisconnect
 
 # Initialize scheduler
@@ -48,15 +55,43 @@ def run_ticket_sync_job():
     finally:
         db.close()
 
+# IDLE threads and the fallback poll share one runner so syncs never overlap
+ticket_sync_runner = CoalescingRunner(run_ticket_sync_job)
+
+def run_referral_reconcile_job():
+    """Background job to mark Pending referrals whose referee has booked"""
+    db = SessionLocal()
+    try:
+        reconcile_pending_referrals(db)
+    except Exception as e:
+        print(f"Error in referral reconcile job: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def set_ticket_poll_interval(idle_live: bool):
+    """Poll for tickets rarely while an IMAP IDLE connection is live, at the normal interval otherwise"""
+    minutes = settings.ticket_sync_idle_fallback_minutes if idle_live else settings.ticket_sync_poll_minutes
+    scheduler.reschedule_job("ticket_sync", trigger="interval", minutes=minutes)
+    print(f"Ticket sync poll every {minutes} minutes (IMAP IDLE {'live' if idle_live else 'down'})")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Start scheduler
     # scheduler.add_job(run_email_sync_job, "interval", minutes=2)
-    scheduler.add_job(run_ticket_sync_job, "interval", minutes=3)
+    # Polls at the normal interval until an IDLE connection is actually up
+    scheduler.add_job(ticket_sync_runner.run, "interval", minutes=settings.ticket_sync_poll_minutes, id="ticket_sync")
+    scheduler.add_job(run_referral_reconcile_job, "interval", minutes=settings.referral_reconcile_interval_minutes)
     scheduler.start()
-    print("Ticket sync scheduler started (every 3 minutes)")
+    print(f"Ticket sync scheduler started (every {settings.ticket_sync_poll_minutes} minutes)")
+    idle_watcher = None
+    if settings.ticket_sync_idle_enabled:
+        idle_watcher = ImapIdleWatcher(ticket_sync_runner.run, on_live_change=set_ticket_poll_interval)
+        idle_watcher.start()
     yield
-    # Shutdown: Stop scheduler
+    # Shutdown: Stop IDLE watcher and scheduler
+    if idle_watcher:
+        idle_watcher.stop()
     scheduler.shutdown()
 
 # Create FastAPI app
@@ -77,8 +112,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
+
+@app.middleware("http")
+async def sql_metrics_middleware(request: Request, call_next):
+    """Collect per-request SQL stats and report them in the Server-Timing header"""
+    token = start_request()
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        stats = end_request(token)
+    total_ms = (time.perf_counter() - started) * 1000
+
+    response.headers["Server-Timing"] = server_timing_header(total_ms, stats)
+    route = request.scope.get("route")
+    record_route(f"{request.method} {route.path if route else 'unmatched'}", total_ms, stats)
+    return response
+
 # Register routers
 app.include_router(bookings_router)
 app.include_router(tenant_router)
@@ -90,6 +143,9 @@ app.include_router(invoices_router)
 app.include_router(wifi_router)
 app.include_router(occupancy_router)
 app.include_router(notification_router)
+app.include_router(metrics_router)
+app.include_router(home_router)
+app.include_router(access_urls_router)
 
 
 @app.websocket("/ws/notifications/{booking_id}")
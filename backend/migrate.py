@@ -0,0 +1,59 @@
+"""
+Apply versioned schema migrations from migrations/ in order.
+
+    python migrate.py                 # apply pending migrations
+    python migrate.py --status        # list applied / pending
+    python migrate.py --check-plans   # EXPLAIN the hot queries, exit 1 on a seq scan
+
+Applied versions are recorded in the schema_migrations table.
+"""
+import sys
+
+from sqlalchemy import text
+
+from database import engine
+from migrations import discover_migrations
+from migrations.plan_check import check_plans
+
+
+def _applied_versions():
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version VARCHAR(4) PRIMARY KEY, name VARCHAR(200) NOT NULL, "
+            "applied_at TIMESTAMP NOT NULL DEFAULT now())"
+        ))
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def status():
+    applied = _applied_versions()
+    for version, name, _ in discover_migrations():
+        print(f"  [{'x' if version in applied else ' '}] {version}_{name}")
+
+
+def upgrade():
+    applied = _applied_versions()
+    pending = [m for m in discover_migrations() if m[0] not in applied]
+    if not pending:
+        print("Schema is up to date")
+        return
+
+    for version, name, module in pending:
+        print(f"Applying {version}_{name}...")
+        module.upgrade(engine)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"
+            ), {"version": version, "name": name})
+        print(f"  Applied {version}_{name}")
+
+
+if __name__ == "__main__":
+    if "--status" in sys.argv:
+        status()
+    elif "--check-plans" in sys.argv:
+        print("Checking hot query plans...")
+        sys.exit(0 if check_plans(engine) else 1)
+    else:
+        upgrade()
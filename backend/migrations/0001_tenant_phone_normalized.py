@@ -0,0 +1,77 @@
+"""
+Add flat_booking_orders.tenant_phone_normalized (last 10 digits of
+tenant_phone_number) so phone lookups are exact matches on a B-tree index
+instead of LIKE '%phone%' scans.
+
+  1. Add the column
+  2. Install a trigger that keeps it in sync for rows written by any system
+  3. Backfill existing rows in batches (short transactions, no long table lock)
+  4. Build the index CONCURRENTLY
+
+Every step is idempotent, so a partially applied run can simply be re-run.
+"""
+import time
+
+from sqlalchemy import text
+
+from migrations import create_indexes_concurrently
+
+# Same rule as services.phone_utils.normalize_phone
+NORMALIZE_SQL = "NULLIF(RIGHT(regexp_replace(COALESCE({col}, ''), '\\D', '', 'g'), 10), '')"
+
+BATCH_SIZE = 5000
+
+DDL = [
+    "ALTER TABLE flat_booking_orders ADD COLUMN IF NOT EXISTS tenant_phone_normalized VARCHAR(10)",
+    f"""
+    CREATE OR REPLACE FUNCTION flat_booking_orders_normalize_phone() RETURNS trigger AS $$
+    BEGIN
+        NEW.tenant_phone_normalized := {NORMALIZE_SQL.format(col='NEW.tenant_phone_number')};
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS trg_flat_booking_orders_normalize_phone ON flat_booking_orders",
+    """
+    CREATE TRIGGER trg_flat_booking_orders_normalize_phone
+    BEFORE INSERT OR UPDATE OF tenant_phone_number ON flat_booking_orders
+    FOR EACH ROW EXECUTE FUNCTION flat_booking_orders_normalize_phone()
+    """,
+]
+
+BACKFILL = text(f"""
+    UPDATE flat_booking_orders
+    SET tenant_phone_normalized = {NORMALIZE_SQL.format(col='tenant_phone_number')}
+    WHERE id IN (
+        SELECT id FROM flat_booking_orders
+        WHERE id > :last_id
+        ORDER BY id
+        LIMIT :batch_size
+    )
+    RETURNING id
+""")
+
+
+def upgrade(engine):
+    with engine.begin() as conn:
+        for sql in DDL:
+            conn.execute(text(sql))
+    print("  Added column and sync trigger")
+
+    last_id = 0
+    total = 0
+    started = time.time()
+    while True:
+        with engine.begin() as conn:
+            ids = [row[0] for row in conn.execute(BACKFILL, {"last_id": last_id, "batch_size": BATCH_SIZE})]
+        if not ids:
+            break
+        last_id = max(ids)
+        total += len(ids)
+        print(f"  Backfilled {total} rows (last id {last_id})")
+    print(f"  Backfill done: {total} rows in {time.time() - started:.1f}s")
+
+    create_indexes_concurrently(engine, [
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_flat_booking_orders_tenant_phone_normalized "
+        "ON flat_booking_orders (tenant_phone_normalized)"
+    ])
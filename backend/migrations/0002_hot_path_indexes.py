@@ -0,0 +1,31 @@
+"""
+Indexes for the hot booking-scoped filters:
+  - tickets by booking, newest first (get_tickets_by_booking)
+  - booking lookups by flat_booking_order_code / dummy_order_code, covering the
+    columns the routes read so Postgres can answer with an index-only scan
+  - parking lock by flat reference, and the per-property waiting list
+"""
+from migrations import create_indexes_concurrently
+
+INDEXES = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tenant_service_tickets_booking_created "
+    "ON tenant_service_tickets (booking_id, created_at DESC)",
+
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_flat_booking_orders_order_code "
+    "ON flat_booking_orders (flat_booking_order_code) "
+    "INCLUDE (dummy_order_code, flat_id, tenant_phone_normalized, status)",
+
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_flat_booking_orders_dummy_code "
+    "ON flat_booking_orders (dummy_order_code) "
+    "INCLUDE (flat_booking_order_code, flat_id, tenant_phone_normalized, status)",
+
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_parking_locks_flat_reference "
+    "ON parking_locks (flat_customer_reference_id)",
+
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_parking_locks_waiting_list "
+    "ON parking_locks (property_id, parking_notify_me, id)",
+]
+
+
+def upgrade(engine):
+    create_indexes_concurrently(engine, INDEXES)
@@ -0,0 +1,31 @@
+"""
+Composite indexes for keyset pagination of the per-booking lists. Each one
+matches the page query's ORDER BY (sort DESC NULLS FIRST, id DESC), so a page
+is a bounded index range scan however long the booking's history is:
+  - notifications by (notification_date, id)
+  - tickets by (created_at, id) - supersedes the 0002 (booking_id, created_at) index
+  - invoices by (due_date, id)
+"""
+from sqlalchemy import text
+
+from migrations import create_indexes_concurrently
+
+INDEXES = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_notifications_booking_date_id "
+    "ON notifications (booking_id, notification_date DESC, id DESC)",
+
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tenant_service_tickets_booking_created_id "
+    "ON tenant_service_tickets (booking_id, created_at DESC, id DESC)",
+
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tenant_invoices_booking_due_id "
+    "ON tenant_invoices (booking_id, due_date DESC, id DESC)",
+]
+
+
+def upgrade(engine):
+    create_indexes_concurrently(engine, INDEXES)
+
+    # The new tickets index covers every query the old one served
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("DROP INDEX CONCURRENTLY IF EXISTS ix_tenant_service_tickets_booking_created"))
+    print("  Dropped ix_tenant_service_tickets_booking_created")
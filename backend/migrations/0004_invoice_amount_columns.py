@@ -0,0 +1,30 @@
+"""
+Numeric copies of tenant_invoices.total / balance (stored as VARCHAR by the
+invoice sync) as STORED generated columns, so totals can be aggregated in
+SQL. The first number in the text is used, with thousands separators
+removed ("Rs. 1,200.00" -> 1200.00); text without a number becomes NULL
+instead of failing the write.
+
+Adding a stored generated column rewrites the table once; tenant_invoices is
+small enough for that to be a short lock.
+"""
+from sqlalchemy import text
+
+# First number in the text (so a "Rs." prefix's dot is skipped), commas dropped
+AMOUNT_SQL = (
+    "NULLIF(replace(substring({col} from '-?[0-9][0-9,]*(?:\\.[0-9]+)?'), ',', ''), '')::numeric(14, 2)"
+)
+
+DDL = [
+    f"ALTER TABLE tenant_invoices ADD COLUMN IF NOT EXISTS total_amount NUMERIC(14, 2) "
+    f"GENERATED ALWAYS AS ({AMOUNT_SQL.format(col='total')}) STORED",
+    f"ALTER TABLE tenant_invoices ADD COLUMN IF NOT EXISTS balance_amount NUMERIC(14, 2) "
+    f"GENERATED ALWAYS AS ({AMOUNT_SQL.format(col='balance')}) STORED",
+]
+
+
+def upgrade(engine):
+    with engine.begin() as conn:
+        for sql in DDL:
+            conn.execute(text(sql))
+    print("  Added total_amount / balance_amount")
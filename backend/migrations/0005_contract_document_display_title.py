@@ -0,0 +1,29 @@
+"""
+Store the cleaned display title of each contract document at ingest time
+(services/document_titles.py) instead of re-deriving it on every view.
+
+  1. Add contract_documents.display_title (and updated_at, which the
+     backfill bumps - 0008 adds it where this already ran)
+  2. Backfill existing rows in batches (titles are cleaned in Python)
+  3. Index (booking_id, document_category, id) so the documents endpoint
+     reads one booking's rows already grouped by category
+"""
+from sqlalchemy import text
+
+from migrations import create_indexes_concurrently
+from services.document_titles import backfill_display_titles
+
+
+def upgrade(engine):
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE contract_documents ADD COLUMN IF NOT EXISTS display_title VARCHAR"))
+        conn.execute(text("ALTER TABLE contract_documents ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP"))
+    print("  Added display_title, updated_at")
+
+    backfill_display_titles(engine)
+
+    create_indexes_concurrently(engine, [
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_contract_documents_booking_category "
+        "ON contract_documents (booking_id, document_category, id) "
+        "INCLUDE (display_title, required_date, email_received_at)"
+    ])
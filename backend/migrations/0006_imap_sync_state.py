@@ -0,0 +1,24 @@
+"""
+imap_sync_state: per-folder UIDVALIDITY + last processed UID for the ticket
+and contract email syncs (replaces the .last_ticket_sync / .last_email_sync
+files, which only held a day-granularity SINCE date and were lost with the
+container). No backfill - the first run after deploy does one full rescan,
+which the syncs' own dedupe makes safe.
+"""
+from sqlalchemy import text
+
+
+def upgrade(engine):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS imap_sync_state (
+                sync_name VARCHAR(50) NOT NULL,
+                mailbox VARCHAR(255) NOT NULL,
+                folder VARCHAR(255) NOT NULL,
+                uidvalidity BIGINT NOT NULL,
+                last_uid BIGINT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP,
+                PRIMARY KEY (sync_name, mailbox, folder)
+            )
+        """))
+    print("  Created imap_sync_state")
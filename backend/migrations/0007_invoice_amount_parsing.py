@@ -0,0 +1,61 @@
+"""
+Re-create tenant_invoices.total_amount / balance_amount with the corrected
+amount expression from 0004. The first version stripped every character but
+digits, '.' and '-', so "Rs. 1,200.00" became ".1200.00" and the amount NULL,
+and the invoice summary under-reported the outstanding balance.
+
+A generated column's expression can't be changed in place (before Postgres
+17), so both columns are dropped and re-added in one ALTER TABLE - a single
+table rewrite, like 0004. Databases where 0004 already created them with the
+corrected expression (fresh installs) are detected from
+information_schema.columns and left alone, as is a re-run.
+Afterwards, rows whose text still has no parseable number are counted.
+"""
+from sqlalchemy import text
+
+# Same expression as 0004_invoice_amount_columns.AMOUNT_SQL
+AMOUNT_SQL = (
+    "NULLIF(replace(substring({col} from '-?[0-9][0-9,]*(?:\\.[0-9]+)?'), ',', ''), '')::numeric(14, 2)"
+)
+
+RECREATE = f"""
+    ALTER TABLE tenant_invoices
+        DROP COLUMN IF EXISTS total_amount,
+        DROP COLUMN IF EXISTS balance_amount,
+        ADD COLUMN total_amount NUMERIC(14, 2) GENERATED ALWAYS AS ({AMOUNT_SQL.format(col='total')}) STORED,
+        ADD COLUMN balance_amount NUMERIC(14, 2) GENERATED ALWAYS AS ({AMOUNT_SQL.format(col='balance')}) STORED
+"""
+
+# Pattern only the corrected expression contains, as Postgres stores it
+CURRENT_PATTERN = "[0-9][0-9,]*"
+
+GENERATED = text("""
+    SELECT column_name, generation_expression
+    FROM information_schema.columns
+    WHERE table_schema = current_schema() AND table_name = 'tenant_invoices'
+      AND column_name IN ('total_amount', 'balance_amount')
+""")
+
+UNPARSED = text("""
+    SELECT
+        count(*) FILTER (WHERE btrim(COALESCE(total, '')) <> '' AND total_amount IS NULL),
+        count(*) FILTER (WHERE btrim(COALESCE(balance, '')) <> '' AND balance_amount IS NULL)
+    FROM tenant_invoices
+""")
+
+
+def upgrade(engine):
+    with engine.begin() as conn:
+        expressions = dict(conn.execute(GENERATED).all())
+        current = len(expressions) == 2 and all(
+            CURRENT_PATTERN in (expr or "") for expr in expressions.values()
+        )
+        if not current:
+            conn.execute(text(RECREATE))
+        total_unparsed, balance_unparsed = conn.execute(UNPARSED).one()
+    if current:
+        print("  total_amount / balance_amount already use the corrected expression")
+    else:
+        print("  Re-created total_amount / balance_amount")
+    if total_unparsed or balance_unparsed:
+        print(f"  WARNING: amount text without a number: {total_unparsed} totals, {balance_unparsed} balances")
@@ -0,0 +1,13 @@
+"""
+Add contract_documents.updated_at for databases that applied 0005 before it
+created the column. The documents ETag includes max(updated_at), so rows
+rewritten in place (backfill_contract_titles.py --recompute) invalidate
+cached lists instead of answering 304 with stale titles. Existing rows stay NULL until they are next written.
+"""
+from sqlalchemy import text
+
+
+def upgrade(engine):
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE contract_documents ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP"))
+    print("  Added contract_documents.updated_at")
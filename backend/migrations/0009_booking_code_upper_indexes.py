@@ -0,0 +1,20 @@
+"""
+Expression indexes on upper(flat_booking_order_code) / upper(dummy_order_code)
+for BookingResolver, which matches codes case-insensitively (wifi used
+ILIKE before the resolver existed). Without them the lookup would still be
+correct but fall back to a sequential scan; codes stored in mixed case
+("K15a...") keep resolving.
+"""
+from migrations import create_indexes_concurrently
+
+INDEXES = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_flat_booking_orders_order_code_upper "
+    "ON flat_booking_orders (upper(flat_booking_order_code))",
+
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_flat_booking_orders_dummy_code_upper "
+    "ON flat_booking_orders (upper(dummy_order_code))",
+]
+
+
+def upgrade(engine):
+    create_indexes_concurrently(engine, INDEXES)
@@ -0,0 +1,55 @@
+"""
+Versioned schema migrations.
+
+Each NNNN_name.py module in this folder defines `upgrade(engine)`; the
+runner (migrate.py) applies pending modules in order and records them in
+the schema_migrations table. Write each step so it is safe to re-run.
+"""
+import importlib.util
+import os
+import re
+import time
+
+from sqlalchemy import text
+
+MIGRATIONS_DIR = os.path.dirname(__file__)
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d{4})_(\w+)\.py$")
+INDEX_NAME_PATTERN = re.compile(r"IF NOT EXISTS\s+(\w+)", re.IGNORECASE)
+
+
+def discover_migrations():
+    """Return [(version, name, module)] sorted by version."""
+    found = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if not match:
+            continue
+        spec = importlib.util.spec_from_file_location(
+            f"migrations.m{match.group(1)}", os.path.join(MIGRATIONS_DIR, filename)
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        found.append((match.group(1), match.group(2), module))
+    return found
+
+
+def create_indexes_concurrently(engine, statements):
+    """
+    Run CREATE INDEX CONCURRENTLY statements outside a transaction.
+    An index left INVALID by an earlier interrupted build is dropped and rebuilt
+    (IF NOT EXISTS alone would silently keep the broken one).
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for sql in statements:
+            index_name = INDEX_NAME_PATTERN.search(sql).group(1)
+            invalid = conn.execute(text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ), {"name": index_name}).first()
+            if invalid:
+                print(f"  Dropping invalid index {index_name}")
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+
+            started = time.time()
+            conn.execute(text(sql))
+            print(f"  Index {index_name} ready ({time.time() - started:.1f}s)")
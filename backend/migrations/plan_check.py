@@ -0,0 +1,92 @@
+"""
+EXPLAIN-based guard for the hot queries.
+
+Each query is planned with enable_seqscan off, so a plan that still contains
+a Seq Scan means no usable index exists (small tables would otherwise be
+seq-scanned legitimately and hide a missing index).
+"""
+import json
+
+from sqlalchemy import text
+
+# (name, SQL, sample params) - keep in step with the queries the routes run
+HOT_QUERIES = [
+    ("tickets page",
+     "SELECT * FROM tenant_service_tickets WHERE booking_id = :booking_id "
+     "AND (created_at < :after OR (created_at = :after AND id < :after_id)) "
+     "ORDER BY created_at DESC NULLS FIRST, id DESC LIMIT 51",
+     {"booking_id": "K00000000000", "after": "2025-01-01", "after_id": 0}),
+    ("booking by order code",
+     "SELECT dummy_order_code, flat_id FROM flat_booking_orders WHERE flat_booking_order_code = :code",
+     {"code": "K00000000000"}),
+    ("booking resolver (any case)",
+     "SELECT flat_booking_order_code, dummy_order_code, flat_id, tenant_phone_number, status "
+     "FROM flat_booking_orders WHERE upper(flat_booking_order_code) = :code OR upper(dummy_order_code) = :code "
+     "ORDER BY id",
+     {"code": "K00000000000"}),
+    ("booking by dummy code",
+     "SELECT flat_booking_order_code, flat_id FROM flat_booking_orders WHERE dummy_order_code = :code",
+     {"code": "D0000"}),
+    ("bookings by phone",
+     "SELECT flat_booking_order_code FROM flat_booking_orders WHERE tenant_phone_normalized = :phone",
+     {"phone": "9000000000"}),
+    ("parking lock by flat reference",
+     "SELECT * FROM parking_locks WHERE flat_customer_reference_id = :ref",
+     {"ref": "D0000"}),
+    ("parking waiting list",
+     "SELECT id FROM parking_locks WHERE property_id = :property_id AND parking_notify_me = true ORDER BY id",
+     {"property_id": 0}),
+    ("parking snapshot by property",
+     "SELECT property_id, count(*), max(total_available_parking_slots) FROM parking_locks "
+     "WHERE property_id IN (:p1, :p2) GROUP BY property_id",
+     {"p1": 0, "p2": 1}),
+    ("invoices page",
+     "SELECT * FROM tenant_invoices WHERE booking_id = :booking_id "
+     "AND (due_date < :after OR (due_date = :after AND id < :after_id)) "
+     "ORDER BY due_date DESC NULLS FIRST, id DESC LIMIT 51",
+     {"booking_id": "K00000000000", "after": "2025-01-01", "after_id": 0}),
+    ("notifications page",
+     "SELECT * FROM notifications WHERE booking_id = :booking_id "
+     "AND (notification_date < :after OR (notification_date = :after AND id < :after_id)) "
+     "ORDER BY notification_date DESC NULLS FIRST, id DESC LIMIT 51",
+     {"booking_id": "K00000000000", "after": "2025-01-01",
+      "after_id": "00000000-0000-0000-0000-000000000000"}),
+    ("contract documents by booking",
+     "SELECT id, document_category, display_title, document_title, required_date, sign_url, pdf_url, "
+     "email_received_at FROM contract_documents WHERE booking_id = :booking_id "
+     "AND (document_category = 'SIGN_REQUEST' OR (document_category IN ('SIGNED', 'CIR') AND pdf_url IS NOT NULL)) "
+     "ORDER BY document_category, id",
+     {"booking_id": "K00000000000"}),
+]
+
+
+def _seq_scans(plan_node):
+    """Yield relation names of every Seq Scan node in an EXPLAIN (FORMAT JSON) plan tree."""
+    if plan_node.get("Node Type") == "Seq Scan":
+        yield plan_node.get("Relation Name")
+    for child in plan_node.get("Plans", []):
+        yield from _seq_scans(child)
+
+
+def check_plans(engine) -> bool:
+    """Print a line per hot query; return False if any falls back to a sequential scan."""
+    ok = True
+    with engine.connect() as conn:
+        conn.execute(text("SET enable_seqscan = off"))
+        for name, sql, params in HOT_QUERIES:
+            try:
+                with conn.begin_nested():
+                    raw = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), params).scalar()
+            except Exception as e:
+                ok = False
+                print(f"  FAIL  {name}: {str(e).splitlines()[0]}")
+                continue
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+            seq = list(_seq_scans(plan))
+            if seq:
+                ok = False
+                print(f"  FAIL  {name}: sequential scan on {', '.join(seq)}")
+            else:
+                print(f"  ok    {name}: {plan['Node Type']}")
+        conn.rollback()
+    return ok
@@ -1,5 +1,7 @@
-from sqlalchemy import Column, String, Integer, Text, Date
+from sqlalchemy import Column, String, Integer, Text, Date, Index, func
+from sqlalchemy.orm import validates
 from database import Base
+from services.phone_utils import normalize_phone
 
 
 class FlatBookingOrder(Base):
@@ -11,6 +13,24 @@ class FlatBookingOrder(Base):
     dummy_order_code = Column(String)
     flat_id = Column(Integer)
     tenant_phone_number = Column(String)
+    # Last 10 digits of tenant_phone_number, kept in sync by a DB trigger (see migrations/0001_tenant_phone_normalized.py)
+    tenant_phone_normalized = Column(String(10), index=True)
     tenant_email = Column(String)
     status = Column(String)
 
+    # Covering indexes for booking-code lookups (migrations/0002_hot_path_indexes.py)
+    __table_args__ = (
+        Index("ix_flat_booking_orders_order_code", "flat_booking_order_code",
+              postgresql_include=["dummy_order_code", "flat_id", "tenant_phone_normalized", "status"]),
+        Index("ix_flat_booking_orders_dummy_code", "dummy_order_code",
+              postgresql_include=["flat_booking_order_code", "flat_id", "tenant_phone_normalized", "status"]),
+        # Case-insensitive lookups by BookingResolver (migrations/0009_booking_code_upper_indexes.py)
+        Index("ix_flat_booking_orders_order_code_upper", func.upper(flat_booking_order_code)),
+        Index("ix_flat_booking_orders_dummy_code_upper", func.upper(dummy_order_code)),
+    )
+
+    @validates("tenant_phone_number")
+    def _set_normalized_phone(self, key, value):
+        self.tenant_phone_normalized = normalize_phone(value) or None
+        return value
+
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, String, Integer, Date, DateTime
+from datetime import datetime
+
+from sqlalchemy import Column, String, Integer, Date, DateTime, Index
 from database import Base
 
 
@@ -11,6 +13,7 @@ class ContractDocument(Base):
     tenant_email = Column(String)
     document_category = Column(String, nullable=False)  # SIGN_REQUEST, SIGNED, CIR
     document_title = Column(String, nullable=False)
+    display_title = Column(String, nullable=True)        # Cleaned at ingest (services/document_titles.py)
     required_date = Column(Date, nullable=True)          # Only for SIGN_REQUEST
     sign_url = Column(String, nullable=True)             # Only for SIGN_REQUEST
     pdf_url = Column(String, nullable=True)              # Only for SIGNED / CIR
@@ -19,3 +22,10 @@ class ContractDocument(Base):
     email_from = Column(String, nullable=True)           # Sender email
     email_to = Column(String, nullable=True)             # Recipient email
     email_subject = Column(String, nullable=True)        # Full email subject
+    updated_at = Column(DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)  # ETag version
+
+    # Created by migrations/0005_contract_document_display_title.py
+    __table_args__ = (
+        Index("ix_contract_documents_booking_category", "booking_id", "document_category", "id",
+              postgresql_include=["display_title", "required_date", "email_received_at"]),
+    )
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from datetime import datetime
+from database import Base
+
+class ImapSyncState(Base):
+    """
+    Incremental sync checkpoint for one IMAP folder: the highest UID a sync job
+    has processed, valid only while the folder keeps the same UIDVALIDITY.
+    """
+    __tablename__ = "imap_sync_state"
+
+    sync_name = Column(String(50), primary_key=True)   # "tickets" / "contracts"
+    mailbox = Column(String(255), primary_key=True)    # IMAP login
+    folder = Column(String(255), primary_key=True)
+    uidvalidity = Column(BigInteger, nullable=False)
+    last_uid = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
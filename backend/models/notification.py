@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime
+from sqlalchemy import Column, String, Text, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from datetime import datetime
@@ -15,3 +15,8 @@ class Notification(Base):
     message = Column(Text) # Body of the notice
     icon = Column(String(50)) # Notification Icon
     created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Keyset pagination index (migrations/0003_keyset_pagination_indexes.py)
+    __table_args__ = (
+        Index("ix_notifications_booking_date_id", "booking_id", notification_date.desc(), id.desc()),
+    )
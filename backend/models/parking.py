@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Index
 from database import Base
 
 
@@ -21,3 +21,9 @@ class ParkingLock(Base):
     parking_slot_reserved = Column(Boolean)
     parking_reservation_expires_at = Column(DateTime)
     created_at = Column(DateTime)
+
+    # Created by migrations/0002_hot_path_indexes.py
+    __table_args__ = (
+        Index("ix_parking_locks_flat_reference", "flat_customer_reference_id"),
+        Index("ix_parking_locks_waiting_list", "property_id", "parking_notify_me", "id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Date, DateTime, Text
+from sqlalchemy import Column, String, Integer, Date, DateTime, Text, Index, Numeric, FetchedValue
 from database import Base
 
 
@@ -24,3 +24,12 @@ class TenantInvoice(Base):
     created_at = Column(DateTime)
     updated_at = Column(DateTime)
     pdf_url = Column(Text)
+    # Numeric total / balance, GENERATED by Postgres from the text columns
+    # (migrations/0004_invoice_amount_columns.py) - never written by the app
+    total_amount = Column(Numeric(14, 2), server_default=FetchedValue(), server_onupdate=FetchedValue())
+    balance_amount = Column(Numeric(14, 2), server_default=FetchedValue(), server_onupdate=FetchedValue())
+
+    # Keyset pagination index (migrations/0003_keyset_pagination_indexes.py)
+    __table_args__ = (
+        Index("ix_tenant_invoices_booking_due_id", "booking_id", due_date.desc(), id.desc()),
+    )
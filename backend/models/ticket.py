@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Numeric
+from sqlalchemy import Column, Integer, String, Text, DateTime, Numeric, Index
 from datetime import datetime
 from database import Base
 
@@ -22,3 +22,8 @@ class TenantServiceTicket(Base):
     charges_amount = Column(Numeric(10, 2))                   # Charges applicable to pay
     charges_description = Column(Text)                        # Charges Description
     created_at = Column(DateTime, default=datetime.utcnow)    # Ticket Creation Date
+
+    # Keyset pagination index (migrations/0003_keyset_pagination_indexes.py)
+    __table_args__ = (
+        Index("ix_tenant_service_tickets_booking_created_id", "booking_id", created_at.desc(), id.desc()),
+    )
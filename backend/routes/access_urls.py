@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_async_read_db
+from models.contract_document import ContractDocument
+from models.tenant_invoice import TenantInvoice
+from schemas.access_url import AccessUrlsRequest, AccessUrlsResponse, MAX_ACCESS_URL_BATCH
+from services.auth_middleware import verify_booking_access
+from services.s3_service import S3Service, s3_key_from_url
+
+router = APIRouter(prefix="/api", tags=["Access URLs"])
+
+ACCESS_URL_EXPIRATION = 3600
+
+
+@router.post("/access-urls", response_model=AccessUrlsResponse)
+async def get_access_urls(
+    body: AccessUrlsRequest,
+    booking_id: str = Query(..., description="Booking the documents and invoices belong to"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user_phone: str = Depends(verify_booking_access)
+):
+    """
+    Presigned URLs for many contract documents and invoice PDFs at once
+    (batch form of the per-item /access-url endpoints). All rows are loaded
+    in one query, scoped to the booking, and signed together.
+    """
+    document_ids = list(dict.fromkeys(body.document_ids))
+    invoice_ids = list(dict.fromkeys(body.invoice_ids))
+    if len(document_ids) + len(invoice_ids) > MAX_ACCESS_URL_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_ACCESS_URL_BATCH} IDs per request")
+
+    parts = []
+    if document_ids:
+        parts.append(select(literal("document").label("kind"), ContractDocument.id, ContractDocument.pdf_url).where(
+            ContractDocument.booking_id == booking_id,
+            ContractDocument.id.in_(document_ids),
+            ContractDocument.pdf_url.isnot(None)
+        ))
+    if invoice_ids:
+        parts.append(select(literal("invoice").label("kind"), TenantInvoice.id, TenantInvoice.pdf_url).where(
+            TenantInvoice.booking_id == booking_id,
+            TenantInvoice.id.in_(invoice_ids),
+            TenantInvoice.pdf_url.isnot(None)
+        ))
+
+    rows = []
+    if parts:
+        stmt = parts[0] if len(parts) == 1 else union_all(*parts)
+        rows = (await db.execute(stmt)).all()
+
+    keys = {(row.kind, row.id): s3_key_from_url(row.pdf_url) for row in rows if row.pdf_url}
+    signed = S3Service().generate_presigned_urls(keys.values(), ACCESS_URL_EXPIRATION) if keys else {}
+
+    urls = {"document": {}, "invoice": {}}
+    for (kind, item_id), s3_key in keys.items():
+        if signed.get(s3_key):
+            urls[kind][item_id] = signed[s3_key]
+
+    return AccessUrlsResponse(
+        success=True,
+        expires_in=ACCESS_URL_EXPIRATION,
+        documents=urls["document"],
+        invoices=urls["invoice"],
+        missing_document_ids=[i for i in document_ids if i not in urls["document"]],
+        missing_invoice_ids=[i for i in invoice_ids if i not in urls["invoice"]],
+    )
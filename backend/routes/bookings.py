@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, Query, Response, HTTPException
 from sqlalchemy.orm import Session
 
-from database import get_db
+from database import get_read_db
 from models.booking import FlatBookingOrder
 from schemas.booking import BookingInfo, BookingsResponse
-from services.auth_service import create_sso_token, create_session_token
+from services.auth_service import get_sso_token, create_session_token
 from services.auth_middleware import get_current_user_phone
+from services.phone_utils import normalize_phone
 
 router = APIRouter(prefix="/api", tags=["Bookings"])
 
@@ -14,7 +15,7 @@ router = APIRouter(prefix="/api", tags=["Bookings"])
 def get_bookings_by_phone(
     response: Response,
     phone: str = Query(..., description="Phone number to lookup bookings"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Fetch bookings by phone number from database.
@@ -23,16 +24,12 @@ def get_bookings_by_phone(
     - If phone number not found: returns error message
     """
     # Clean phone number (remove spaces, dashes, country code if present)
-    clean_phone = phone.strip().replace(" ", "").replace("-", "")
-    if clean_phone.startswith("+91"):
-        clean_phone = clean_phone[3:]
-    elif clean_phone.startswith("91") and len(clean_phone) > 10:
-        clean_phone = clean_phone[2:]
+    clean_phone = normalize_phone(phone)
     
-    # Query database for bookings with this phone number
+    # Query database for bookings with this phone number (exact match on the indexed column)
     bookings = db.query(FlatBookingOrder).filter(
-        FlatBookingOrder.tenant_phone_number == clean_phone
-    ).all()
+        FlatBookingOrder.tenant_phone_normalized == clean_phone
+    ).all() if clean_phone else []
     
     if not bookings:
         return BookingsResponse(
@@ -47,7 +44,7 @@ def get_bookings_by_phone(
         booking_code = booking.flat_booking_order_code
         if booking_code:
             # Generate SSO token for Site B
-            sso_token = create_sso_token(clean_phone, booking_code)
+            sso_token = get_sso_token(clean_phone, booking_code)
             
             booking_list.append(BookingInfo(
                 id=booking_code,
@@ -84,7 +81,7 @@ def get_bookings_by_phone(
 
 @router.get("/auth/me", response_model=BookingsResponse)
 def get_current_session(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     phone: str = Depends(get_current_user_phone)
 ):
     """
@@ -92,17 +89,17 @@ def get_current_session(
     Used by the frontend to restore state on refresh.
     """
     # Reuse code from get_bookings_by_phone but with the verified phone
-    clean_phone = "".join(filter(str.isdigit, phone))[-10:]
+    clean_phone = normalize_phone(phone)
     
     bookings = db.query(FlatBookingOrder).filter(
-        FlatBookingOrder.tenant_phone_number.contains(clean_phone)
-    ).all()
+        FlatBookingOrder.tenant_phone_normalized == clean_phone
+    ).all() if clean_phone else []
     
     booking_list = []
     for b in bookings:
         booking_code = b.flat_booking_order_code
         if booking_code:
-            sso_token = create_sso_token(clean_phone, booking_code)
+            sso_token = get_sso_token(clean_phone, booking_code)
             booking_list.append(BookingInfo(
                 id=booking_code,
                 displayName=f"Booking ID - {booking_code}",
@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.orm import Session
-from urllib.parse import urlparse
-import re
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db
+from database import get_db, get_read_db, get_async_read_db
 from models.contract_document import ContractDocument
 from schemas.contract_document import (
     ContractDocumentsResponse,
@@ -12,75 +12,63 @@ from schemas.contract_document import (
     CirDocumentItem
 )
 from services.email_service import sync_sign_request_emails
-from services.s3_service import S3Service
-from services.auth_middleware import get_current_user_phone
+from services.document_titles import clean_document_title
+from services.s3_service import S3Service, s3_key_from_url
+from services.auth_middleware import verify_booking_access
+from services.etag import conditional_etag
 
 router = APIRouter(prefix="/api", tags=["Contract Documents"])
 
 
 @router.get("/contract-documents", response_model=ContractDocumentsResponse)
-def get_contract_documents(
+async def get_contract_documents(
+    request: Request,
+    response: Response,
     booking_id: str = Query(..., description="Booking ID to fetch contract documents"),
-    db: Session = Depends(get_db),
-    current_user_phone: str = Depends(get_current_user_phone)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user_phone: str = Depends(verify_booking_access)
 ):
     """
     Fetch contract documents for a booking ID, grouped into 3 sections:
     - Sign Requests (SIGN_REQUEST)
     - Signed Documents (SIGNED)
     - CIR Documents (CIR)
+    Answers 304 when If-None-Match matches the current ETag.
     """
-    documents = db.query(ContractDocument).filter(
-        ContractDocument.booking_id == booking_id
-    ).all()
+    # Count + newest id catch inserts; updated_at catches rows rewritten in
+    # place (backfill_contract_titles.py)
+    not_modified = await conditional_etag(db, request, response, select(
+        func.count(), func.max(ContractDocument.id), func.max(ContractDocument.updated_at)
+    ).where(ContractDocument.booking_id == booking_id))
+    if not_modified:
+        return not_modified
+
+    # Only the listed columns, already grouped by category; SIGNED / CIR
+    # entries are only shown once their file exists
+    result = await db.execute(select(
+        ContractDocument.id,
+        ContractDocument.document_category,
+        ContractDocument.display_title,
+        ContractDocument.document_title,
+        ContractDocument.required_date,
+        ContractDocument.sign_url,
+        ContractDocument.pdf_url,
+        ContractDocument.email_received_at,
+    ).where(
+        ContractDocument.booking_id == booking_id,
+        or_(
+            ContractDocument.document_category == "SIGN_REQUEST",
+            and_(ContractDocument.document_category.in_(["SIGNED", "CIR"]), ContractDocument.pdf_url.isnot(None)),
+        )
+    ).order_by(ContractDocument.document_category, ContractDocument.id))
 
     sign_requests = []
     signed_documents = []
     cir_documents = []
 
-    def clean_title(title: str, booking_id: str) -> str:
-        """Clean up document title for display."""
-        if not title:
-            return "Document"
-        
-        # Remove common email prefixes/suffixes
-        t = title
-        for prefix in ["Fwd:", "Re:", "Document "]:
-            if t.startswith(prefix):
-                t = t[len(prefix):].strip()
-        
-        # Remove "has been completed" and everything after
-        if "has been completed" in t:
-            t = t.split("has been completed")[0].strip()
-
-        # Remove CIR-style suffixes: :: PART A :: <ID> :: Flat No. <flat>
-        # Remove ":: Flat No. ..." suffix
-        t = re.sub(r'::\s*Flat No\.?\s*\S+', '', t).strip()
-        
-        # Remove ":: PART A/B/C ::" etc.
-        t = re.sub(r'::\s*PART\s+[A-Z]\s*::', '::', t).strip()
-
-        # Remove booking ID from title if present
-        if booking_id and booking_id in t:
-             t = t.replace(booking_id, "").strip()
-
-        # Remove file extension if present .pdf_ or just .pdf
-        if ".pdf" in t:
-            t = t.split(".pdf")[0].strip()
-
-        # Clean up remaining :: separators and trailing chars
-        t = re.sub(r'::\s*$', '', t).strip()
-        t = re.sub(r'^\s*::\s*', '', t).strip()
-        t = re.sub(r'\s*::\s*::\s*', ' :: ', t).strip()
-
-        # Remove trailing underscores or special chars
-        t = t.strip("_").strip()
-
-        return t if t else "Document"
-
-    for doc in documents:
-        # Clean title
-        display_title = clean_title(doc.document_title, booking_id)
+    for doc in result.all():
+        # Rows ingested before display_title existed and not yet backfilled
+        display_title = doc.display_title or clean_document_title(doc.document_title, booking_id)
 
         if doc.document_category == "SIGN_REQUEST":
             sign_requests.append(SignRequestItem(
@@ -90,21 +78,19 @@ def get_contract_documents(
                 sign_url=doc.sign_url
             ))
         elif doc.document_category == "SIGNED":
-             if doc.pdf_url: # Only show if file exists
-                signed_documents.append(SignedDocumentItem(
-                    id=doc.id,
-                    document_title=display_title,
-                    pdf_url=doc.pdf_url,
-                    email_received_at=doc.email_received_at
-                ))
-        elif doc.document_category == "CIR":
-            if doc.pdf_url: # Only show if file exists
-                cir_documents.append(CirDocumentItem(
-                    id=doc.id,
-                    document_title=display_title,
-                    pdf_url=doc.pdf_url,
-                    email_received_at=doc.email_received_at
-                ))
+            signed_documents.append(SignedDocumentItem(
+                id=doc.id,
+                document_title=display_title,
+                pdf_url=doc.pdf_url,
+                email_received_at=doc.email_received_at
+            ))
+        else:
+            cir_documents.append(CirDocumentItem(
+                id=doc.id,
+                document_title=display_title,
+                pdf_url=doc.pdf_url,
+                email_received_at=doc.email_received_at
+            ))
 
     return ContractDocumentsResponse(
         success=True,
@@ -118,7 +104,7 @@ def get_contract_documents(
 @router.get("/contract-documents/{document_id}/access-url")
 def get_contract_document_access_url(
     document_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Generate a temporary signed URL to view/download a contract document.
@@ -130,19 +116,8 @@ def get_contract_document_access_url(
     if not doc.pdf_url:
         raise HTTPException(status_code=404, detail="Document file URL not found")
 
-    # Extract S3 Key from URL if needed
-    # The DB currently stores full URL: https://BUCKET.s3.REGION.amazonaws.com/KEY
-    # We need just the KEY to sign it.
-    
-    s3_key = doc.pdf_url
-    if s3_key.startswith("http"):
-         try:
-            parsed = urlparse(s3_key)
-            # path is "/contracts/..." -> strip leading slash
-            s3_key = parsed.path.lstrip('/')
-         except Exception:
-            # Fallback to using as is if parsing fails, though unlikely for valid URL
-            pass
+    # The DB stores the full URL; we need just the KEY to sign it.
+    s3_key = s3_key_from_url(doc.pdf_url)
 
     s3_service = S3Service()
     signed_url = s3_service.generate_presigned_url(s3_key)
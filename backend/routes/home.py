@@ -0,0 +1,169 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import Optional
+import asyncio
+import weakref
+
+from config import get_settings
+from database import get_async_read_db, get_async_read_sessionmaker
+from models.notification import Notification
+from models.parking import ParkingLock
+from models.ticket import TenantServiceTicket
+from schemas.home import HomeResponse, HomeKyc, HomeFlat
+from services.auth_middleware import verify_booking_access
+from services.booking_resolver import booking_resolver, ResolvedBooking
+from services.data_cache import get_flat_info_async, get_kyc_info_async
+from services.invoice_query import fetch_invoice_page
+from services.parking_queue import get_waiting_position_async
+from services.pagination import MAX_PAGE_SIZE
+from routes.occupancy import build_co_occupants
+from routes.parking import build_parking_status
+from routes.ticket import to_ticket_response
+
+router = APIRouter(prefix="/api", tags=["Home"])
+
+HOME_SECTIONS = ("kyc", "flat", "parking", "pending_invoices", "notifications", "open_tickets")
+
+# Pending invoices listed on the home card; pending_invoices_next_cursor says if there are more
+HOME_PENDING_INVOICES = MAX_PAGE_SIZE
+
+# Event loop -> semaphore capping the sessions every /api/home request together holds
+_section_slots = weakref.WeakKeyDictionary()
+
+
+def _section_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _section_slots.get(loop)
+    if semaphore is None:
+        semaphore = _section_slots[loop] = asyncio.Semaphore(get_settings().home_section_concurrency)
+    return semaphore
+
+
+def parse_include(include: Optional[str]) -> set:
+    """`include=kyc,flat` -> {"kyc", "flat"}; empty means every section."""
+    if not include:
+        return set(HOME_SECTIONS)
+    sections = {part.strip() for part in include.split(",") if part.strip()}
+    unknown = sections - set(HOME_SECTIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown section(s): {', '.join(sorted(unknown))}. Valid: {', '.join(HOME_SECTIONS)}"
+        )
+    return sections
+
+
+async def _load_kyc(db: AsyncSession, booking: ResolvedBooking):
+    kyc = await get_kyc_info_async(db, booking.flat_booking_order_code)
+    if not kyc:
+        return None
+    return HomeKyc(tenant_name=kyc["tenant_full_name"], co_occupants=build_co_occupants(kyc))
+
+
+async def _load_flat(db: AsyncSession, booking: ResolvedBooking):
+    if not booking.flat_id:
+        return None
+    flat = await get_flat_info_async(db, booking.flat_id)
+    if not flat:
+        return None
+    return HomeFlat(**flat)
+
+
+async def _load_parking(db: AsyncSession, booking: ResolvedBooking):
+    if not booking.dummy_order_code:
+        return None
+    result = await db.execute(select(ParkingLock).where(
+        ParkingLock.flat_customer_reference_id == booking.dummy_order_code
+    ))
+    parking = result.scalars().first()
+    if not parking:
+        return None
+
+    waiting_position = None
+    if parking.parking_notify_me:
+        waiting_position = await get_waiting_position_async(db, parking)
+    return build_parking_status(parking, waiting_position)
+
+
+async def _load_pending_invoices(db: AsyncSession, booking: ResolvedBooking):
+    """The first HOME_PENDING_INVOICES pending invoices and the cursor for the rest (None if that's all)."""
+    return await fetch_invoice_page(
+        db, booking.flat_booking_order_code, "pending", booking.dummy_order_code, None, HOME_PENDING_INVOICES
+    )
+
+
+async def _load_notifications(db: AsyncSession, booking: ResolvedBooking, limit: int):
+    result = await db.execute(select(Notification).where(
+        Notification.booking_id == booking.flat_booking_order_code
+    ).order_by(Notification.notification_date.desc()).limit(limit))
+    return result.scalars().all()
+
+
+async def _load_open_tickets(db: AsyncSession, booking: ResolvedBooking):
+    result = await db.execute(select(TenantServiceTicket).where(
+        TenantServiceTicket.booking_id == booking.flat_booking_order_code,
+        # != alone is never true for NULL, and the ticket list shows NULL-status tickets
+        or_(TenantServiceTicket.status.is_(None), TenantServiceTicket.status != "Closed")
+    ).order_by(TenantServiceTicket.created_at.desc()))
+    return [to_ticket_response(t) for t in result.scalars().all()]
+
+
+@router.get("/home", response_model=HomeResponse)
+async def get_home(
+    booking_id: str = Query(..., description="Flat booking order code"),
+    include: Optional[str] = Query(None, description=f"Comma-separated sections to return ({', '.join(HOME_SECTIONS)}); default all"),
+    notifications_limit: int = Query(5, ge=1, le=50, description="How many of the latest notifications to return"),
+    db: AsyncSession = Depends(get_async_read_db),
+    session_factory: async_sessionmaker = Depends(get_async_read_sessionmaker),
+    current_user_phone: str = Depends(verify_booking_access)
+):
+    """
+    Aggregate of the home screen cards (tenant/KYC, WiFi and occupancy,
+    parking, pending invoices, latest notifications, open tickets).
+
+    The booking is resolved once; the selected sections are then loaded
+    concurrently, each on its own session. At most home_section_concurrency
+    of those sessions are open at a time across all requests, so a burst of
+    home requests can't take the whole connection pool from other routes.
+    """
+    sections = parse_include(include)
+
+    booking = await booking_resolver.resolve_async(db, booking_id)
+    if not booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
+
+    loaders = {
+        "kyc": lambda s: _load_kyc(s, booking),
+        "flat": lambda s: _load_flat(s, booking),
+        "parking": lambda s: _load_parking(s, booking),
+        "pending_invoices": lambda s: _load_pending_invoices(s, booking),
+        "notifications": lambda s: _load_notifications(s, booking, notifications_limit),
+        "open_tickets": lambda s: _load_open_tickets(s, booking),
+    }
+
+    # The request's own session is done; hand its connection back before fanning out
+    await db.rollback()
+
+    semaphore = _section_semaphore()
+
+    async def run(name):
+        async with semaphore:
+            async with session_factory() as session:
+                return await loaders[name](session)
+
+    selected = [name for name in HOME_SECTIONS if name in sections]
+    values = dict(zip(selected, await asyncio.gather(*(run(name) for name in selected))))
+
+    pending_invoices_next_cursor = None
+    if "pending_invoices" in values:
+        values["pending_invoices"], pending_invoices_next_cursor = values["pending_invoices"]
+
+    return HomeResponse(
+        success=True,
+        booking_id=booking.flat_booking_order_code,
+        dummy_order_code=booking.dummy_order_code,
+        pending_invoices_next_cursor=pending_invoices_next_cursor,
+        message=None,
+        **values
+    )
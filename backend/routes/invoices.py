@@ -1,161 +1,114 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from urllib.parse import urlparse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 import logging
 
-from database import get_db
+from database import get_read_db, get_async_read_db
 from models.tenant_invoice import TenantInvoice
-from models.booking import FlatBookingOrder
-from schemas.tenant_invoice import InvoiceListResponse, InvoiceItem
-from services.s3_service import S3Service
-from services.auth_middleware import get_current_user_phone
+from schemas.tenant_invoice import InvoiceListResponse, InvoiceSummaryResponse
+from services.s3_service import S3Service, s3_key_from_url
+from services.auth_middleware import verify_booking_access
+from services.booking_resolver import booking_resolver
+from services.etag import conditional_etag
+from services.invoice_query import fetch_invoice_page, fetch_invoice_summary, invoice_version_query
+from services.pagination import MAX_PAGE_SIZE, page_limit
 
 router = APIRouter(prefix="/api", tags=["Invoices"])
 logger = logging.getLogger(__name__)
 
 
-@router.get("/invoices", response_model=InvoiceListResponse)
-def get_invoices(
-    booking_id: str = Query(..., description="Booking ID to fetch invoices for"),
-    db: Session = Depends(get_db),
-    current_user_phone: str = Depends(get_current_user_phone)
-):
-    """
-    Fetch all invoices for a booking ID from the tenant_invoices table,
-    ordered by due_date descending (most recent first).
-    """
-    invoices = db.query(TenantInvoice).filter(
-        TenantInvoice.booking_id == booking_id
-    ).order_by(desc(TenantInvoice.due_date)).all()
+async def _invoice_view(request: Request, response: Response, db: AsyncSession, booking_id: str,
+                        view: str, cursor: Optional[str], limit: Optional[int]):
+    """Shared body of the three list endpoints (see services/invoice_query.py)."""
+    not_modified = await conditional_etag(db, request, response, invoice_version_query(booking_id, view))
+    if not_modified:
+        return not_modified
 
     # Fetch dummy_order_code for the booking_id
-    booking_order = db.query(FlatBookingOrder).filter(
-        FlatBookingOrder.flat_booking_order_code == booking_id
-    ).first()
+    booking_order = await booking_resolver.resolve_async(db, booking_id)
     dummy_order_code = booking_order.dummy_order_code if booking_order else None
 
-    items = []
-    for inv in invoices:
-        items.append(InvoiceItem(
-            id=inv.id,
-            booking_id=inv.booking_id,
-            invoice_date=inv.invoice_date,
-            invoice_number=inv.invoice_number,
-            customer_name=inv.customer_name,
-            total=inv.total,
-            due_date=inv.due_date,
-            balance=inv.balance,
-            status=inv.status,
-            pdf_url=inv.pdf_url,
-            dummy_order_code=dummy_order_code,
-            created_at=inv.created_at,
-            updated_at=inv.updated_at
-        ))
+    items, next_cursor = await fetch_invoice_page(
+        db, booking_id, view, dummy_order_code, cursor, page_limit(cursor, limit)
+    )
 
     return InvoiceListResponse(
         success=True,
         invoices=items,
+        next_cursor=next_cursor,
         message=None
     )
 
 
+@router.get("/invoices", response_model=InvoiceListResponse)
+async def get_invoices(
+    request: Request,
+    response: Response,
+    booking_id: str = Query(..., description="Booking ID to fetch invoices for"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size (omit with cursor for the whole list)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user_phone: str = Depends(verify_booking_access)
+):
+    """
+    Fetch all invoices for a booking ID from the tenant_invoices table,
+    ordered by due_date descending (most recent first); paged when `limit` is given.
+    """
+    return await _invoice_view(request, response, db, booking_id, "all", cursor, limit)
+
+
 @router.get("/invoices/pending", response_model=InvoiceListResponse)
-def get_pending_invoices(
+async def get_pending_invoices(
+    request: Request,
+    response: Response,
     booking_id: str = Query(..., description="Booking ID to fetch pending invoices for"),
-    db: Session = Depends(get_db),
-    current_user_phone: str = Depends(get_current_user_phone)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size (omit with cursor for the whole list)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user_phone: str = Depends(verify_booking_access)
 ):
     """
     Fetch invoices with status 'Sent' or 'Overdue' for a booking ID.
     These are the invoices the tenant needs to pay.
     """
-    invoices = db.query(TenantInvoice).filter(
-        TenantInvoice.booking_id == booking_id,
-        TenantInvoice.status.in_(["Sent", "Overdue"])
-    ).order_by(desc(TenantInvoice.due_date)).all()
-
-    # Fetch dummy_order_code for the booking_id
-    booking_order = db.query(FlatBookingOrder).filter(
-        FlatBookingOrder.flat_booking_order_code == booking_id
-    ).first()
-    dummy_order_code = booking_order.dummy_order_code if booking_order else None
-
-    items = []
-    for inv in invoices:
-        items.append(InvoiceItem(
-            id=inv.id,
-            booking_id=inv.booking_id,
-            invoice_date=inv.invoice_date,
-            invoice_number=inv.invoice_number,
-            customer_name=inv.customer_name,
-            total=inv.total,
-            due_date=inv.due_date,
-            balance=inv.balance,
-            status=inv.status,
-            pdf_url=inv.pdf_url,
-            dummy_order_code=dummy_order_code,
-            created_at=inv.created_at,
-            updated_at=inv.updated_at
-        ))
-
-    return InvoiceListResponse(
-        success=True,
-        invoices=items,
-        message=None
-    )
+    return await _invoice_view(request, response, db, booking_id, "pending", cursor, limit)
 
 
 @router.get("/invoices/paid", response_model=InvoiceListResponse)
-def get_paid_invoices(
+async def get_paid_invoices(
+    request: Request,
+    response: Response,
     booking_id: str = Query(..., description="Booking ID to fetch paid invoices for"),
-    db: Session = Depends(get_db),
-    current_user_phone: str = Depends(get_current_user_phone)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size (omit with cursor for the whole list)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user_phone: str = Depends(verify_booking_access)
 ):
     """
     Fetch invoices with status 'Paid' for a booking ID.
     These appear in Payment History.
     """
-    invoices = db.query(TenantInvoice).filter(
-        TenantInvoice.booking_id == booking_id,
-        TenantInvoice.status == "Paid"
-    ).order_by(desc(TenantInvoice.due_date)).all()
-
-    # Fetch dummy_order_code for the booking_id
-    booking_order = db.query(FlatBookingOrder).filter(
-        FlatBookingOrder.flat_booking_order_code == booking_id
-    ).first()
-    dummy_order_code = booking_order.dummy_order_code if booking_order else None
+    return await _invoice_view(request, response, db, booking_id, "paid", cursor, limit)
 
-    items = []
-    for inv in invoices:
-        items.append(InvoiceItem(
-            id=inv.id,
-            booking_id=inv.booking_id,
-            invoice_date=inv.invoice_date,
-            invoice_number=inv.invoice_number,
-            customer_name=inv.customer_name,
-            total=inv.total,
-            due_date=inv.due_date,
-            balance=inv.balance,
-            status=inv.status,
-            pdf_url=inv.pdf_url,
-            dummy_order_code=dummy_order_code,
-            created_at=inv.created_at,
-            updated_at=inv.updated_at
-        ))
 
-    return InvoiceListResponse(
-        success=True,
-        invoices=items,
-        message=None
-    )
+@router.get("/invoices/summary", response_model=InvoiceSummaryResponse)
+async def get_invoice_summary(
+    booking_id: str = Query(..., description="Booking ID to summarise invoices for"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user_phone: str = Depends(verify_booking_access)
+):
+    """
+    Outstanding balance (sum of pending balances), overdue count and next
+    due date for a booking, aggregated in SQL.
+    """
+    return await fetch_invoice_summary(db, booking_id)
 
 
 @router.get("/invoices/{invoice_id}/access-url")
 def get_invoice_access_url(
     invoice_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Generate a temporary presigned URL for viewing/downloading an invoice PDF.
@@ -168,13 +121,7 @@ def get_invoice_access_url(
         raise HTTPException(status_code=404, detail="Invoice PDF not available")
 
     # Extract S3 key from full URL
-    s3_key = invoice.pdf_url
-    if s3_key.startswith("http"):
-        try:
-            parsed = urlparse(s3_key)
-            s3_key = parsed.path.lstrip('/')
-        except Exception:
-            pass
+    s3_key = s3_key_from_url(invoice.pdf_url)
 
     s3_service = S3Service()
     signed_url = s3_service.generate_presigned_url(s3_key)
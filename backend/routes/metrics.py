@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends
+
+from services.auth_middleware import verify_ops_access
+from services.auth_service import get_token_cache_stats, get_sso_cache_stats
+from services.booking_ownership import get_ownership_cache_stats
+from services.booking_resolver import booking_resolver
+from services.data_cache import data_cache
+from services.parking_queue import waiting_index
+from services.parking_snapshot import get_snapshot_cache_stats
+from services.s3_service import get_s3_stats
+from services.query_metrics import get_route_summary
+
+# Route inventory, latencies and cache sizes are for operators, not tenants
+router = APIRouter(prefix="/api/metrics", tags=["Metrics"], dependencies=[Depends(verify_ops_access)])
+
+
+@router.get("/cache")
+def get_cache_metrics():
+    """
+    Hit/miss counters for the in-process caches.
+    """
+    return {
+        "success": True,
+        "token_cache": get_token_cache_stats(),
+        "booking_ownership": get_ownership_cache_stats(),
+        "booking_resolver": booking_resolver.stats(),
+        "data_cache": data_cache.stats(),
+        "parking_waiting_index": waiting_index.stats(),
+        "parking_snapshots": get_snapshot_cache_stats(),
+        "s3": get_s3_stats(),
+        "sso_tokens": get_sso_cache_stats(),
+    }
+
+
+@router.get("/routes")
+def get_route_metrics():
+    """
+    Rolling per-route summary of SQL statement counts, DB time and total time.
+    """
+    return {
+        "success": True,
+        "routes": get_route_summary(),
+    }
@@ -1,30 +1,50 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from uuid import UUID
-from database import get_db
+from database import get_async_read_db
 from models.notification import Notification
 from schemas.notification import NotificationListResponse
-from services.auth_middleware import get_current_user_phone
+from services.auth_middleware import verify_booking_access
+from services.etag import conditional_etag
+from services.pagination import paginate, page_rows, page_limit, MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/api/notifications", tags=["Notifications"])
 
 @router.get("", response_model=NotificationListResponse)
-def get_notifications(
+async def get_notifications(
+    request: Request,
+    response: Response,
     booking_id: str = Query(..., description="Booking ID to fetch notifications for"),
-    db: Session = Depends(get_db),
-    current_user_phone: str = Depends(get_current_user_phone)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size (omit with cursor for the whole list)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user_phone: str = Depends(verify_booking_access)
 ):
     """
-    Fetch all notifications for a specific booking.
+    Fetch notifications for a specific booking, newest first. All of them
+    unless `limit` is given; then one page at a time (pass next_cursor back
+    as `cursor` for the next page).
+    Answers 304 when If-None-Match matches the current ETag.
     """
-    notifications = db.query(Notification).filter(
-        Notification.booking_id == booking_id
-    ).order_by(Notification.notification_date.desc()).all()
+    not_modified = await conditional_etag(db, request, response, select(
+        func.count(), func.max(Notification.notification_date), func.max(Notification.created_at)
+    ).where(Notification.booking_id == booking_id))
+    if not_modified:
+        return not_modified
+
+    limit = page_limit(cursor, limit)
+    result = await db.execute(paginate(
+        select(Notification).where(Notification.booking_id == booking_id),
+        Notification.notification_date, Notification.id, cursor, limit
+    ))
+    notifications, next_cursor = page_rows(result.scalars().all(), "notification_date", limit)
     
     return NotificationListResponse(
         success=True,
-        notifications=notifications
+        notifications=notifications,
+        next_cursor=next_cursor
     )
 
 # Note: is_read is not present in the current DB table structure
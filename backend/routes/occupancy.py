@@ -1,27 +1,41 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
-from database import get_db
-from models.booking import FlatBookingOrder
-from models.flat import Flat
-from models.kyc import KycDetails
+from database import get_read_db
 from schemas.occupancy import OccupancyResponse, CoOccupant
-from services.auth_middleware import get_current_user_phone
+from services.auth_middleware import verify_booking_access
+from services.booking_resolver import booking_resolver
+from services.data_cache import get_flat_info, get_kyc_info
 
 router = APIRouter(prefix="/api", tags=["Occupancy"])
 
+
+def build_co_occupants(kyc: dict) -> list:
+    """Co-occupants listed on the cached KYC record (co1..co4)."""
+    co_occupants = []
+    if kyc:
+        # Check co1_name to co4_name as per screenshot
+        for i in range(1, 5):
+            name = kyc.get(f"co{i}_name")
+            phone = kyc.get(f"co{i}_phone")
+            if name:
+                co_occupants.append(CoOccupant(
+                    name=name,
+                    phone=phone or "N/A"
+                ))
+    return co_occupants
+
+
 @router.get("/occupancy", response_model=OccupancyResponse)
 def get_occupancy_details(
     booking_id: str = Query(..., description="Booking ID to fetch occupancy details"),
-    db: Session = Depends(get_db),
-    current_user_phone: str = Depends(get_current_user_phone)
+    db: Session = Depends(get_read_db),
+    current_user_phone: str = Depends(verify_booking_access)
 ):
     """
     Fetch max occupancy and co-occupants for a booking.
     """
     # 1. Get booking to find flat_id
-    booking = db.query(FlatBookingOrder).filter(
-        FlatBookingOrder.flat_booking_order_code == booking_id
-    ).first()
+    booking = booking_resolver.resolve(db, booking_id)
     
     if not booking:
         return OccupancyResponse(
@@ -32,29 +46,15 @@ def get_occupancy_details(
     # 2. Get flat to find max_occupancy
     max_occ = "N/A"
     if booking.flat_id:
-        flat = db.query(Flat).filter(Flat.id == booking.flat_id).first()
+        flat = get_flat_info(db, booking.flat_id)
         if flat:
-            max_occ = flat.max_occupancy or "N/A"
+            max_occ = flat["max_occupancy"] or "N/A"
             
     # 3. Get co-occupants from kyc_details
-    kyc = db.query(KycDetails).filter(
-        KycDetails.booking_id == booking_id
-    ).first()
+    kyc = get_kyc_info(db, booking_id)
     
-    co_occupants = []
-    if kyc:
-        # Check co1_name to co4_name as per screenshot
-        for i in range(1, 5):
-            name = getattr(kyc, f"co{i}_name", None)
-            phone = getattr(kyc, f"co{i}_phone", None)
-            if name:
-                co_occupants.append(CoOccupant(
-                    name=name,
-                    phone=phone or "N/A"
-                ))
-                
     return OccupancyResponse(
         success=True,
         max_occupancy=max_occ,
-        co_occupants=co_occupants
+        co_occupants=build_co_occupants(kyc)
     )
@@ -1,23 +1,52 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import asc
 import logging
 
-from database import get_db
-from models.booking import FlatBookingOrder
+from database import get_read_db
 from models.parking import ParkingLock
-from schemas.parking import ParkingStatusResponse, ParkingDetails
-from services.auth_middleware import get_current_user_phone
+from schemas.parking import ParkingStatusResponse, ParkingDetails, ParkingSnapshotsResponse
+from services.auth_middleware import verify_booking_access, verify_ops_access
+from services.booking_resolver import booking_resolver
+from services.parking_queue import get_waiting_position
+from services.parking_snapshot import get_parking_snapshots
 
 router = APIRouter(prefix="/api", tags=["Parking"])
 logger = logging.getLogger(__name__)
 
+MAX_SNAPSHOT_PROPERTIES = 200
+
+
+def build_parking_status(parking: ParkingLock, waiting_position: int = None) -> ParkingStatusResponse:
+    """Status response for a parking lock; waiting_position is only used for waiting-list entries."""
+    if parking.parking_notify_me:
+        return ParkingStatusResponse(
+            success=True,
+            is_in_waiting_list=True,
+            waiting_list_number=waiting_position,
+            property_id=parking.property_id,
+            message=f"You are in waiting list No. {waiting_position}"
+        )
+
+    return ParkingStatusResponse(
+        success=True,
+        is_in_waiting_list=False,
+        property_id=parking.property_id,
+        parking_details=ParkingDetails(
+            parking_slot_reserved=parking.parking_slot_reserved or False,
+            total_available_parking_slots=parking.total_available_parking_slots or 0,
+            total_paid_parking_slots=parking.total_paid_parking_slots or 0,
+            reserved_parking_slots=parking.reserved_parking_slots or 0,
+            status=parking.status or ""
+        ),
+        message="Parking subscription is active"
+    )
+
 
 @router.get("/parking-status", response_model=ParkingStatusResponse)
 def get_parking_status(
     booking_id: str = Query(..., description="Flat booking order code"),
-    db: Session = Depends(get_db),
-    current_user_phone: str = Depends(get_current_user_phone)
+    db: Session = Depends(get_read_db),
+    current_user_phone: str = Depends(verify_booking_access)
 ):
     """
     Get parking status for a booking.
@@ -28,9 +57,7 @@ def get_parking_status(
     4. If parking_notify_me is False -> subscription is active
     """
     # Step 1: Find the booking and get flat_dummy_code
-    booking = db.query(FlatBookingOrder).filter(
-        FlatBookingOrder.flat_booking_order_code == booking_id
-    ).first()
+    booking = booking_resolver.resolve(db, booking_id)
 
     if not booking:
         return ParkingStatusResponse(
@@ -58,39 +85,40 @@ def get_parking_status(
 
     # Step 3: Check parking_notify_me
     if parking.parking_notify_me:
-        # User is in waiting list - calculate position within property
-        waiting_list = db.query(ParkingLock).filter(
-            ParkingLock.property_id == parking.property_id,
-            ParkingLock.parking_notify_me == True
-        ).order_by(asc(ParkingLock.id)).all()
-
-        # Find this user's position in the waiting list
-        waiting_position = 1
-        for i, entry in enumerate(waiting_list):
-            if entry.id == parking.id:
-                waiting_position = i + 1
-                break
+        # User is in waiting list - position within property (entries with a lower id are ahead)
+        waiting_position = get_waiting_position(db, parking)
 
-        return ParkingStatusResponse(
-            success=True,
-            is_in_waiting_list=True,
-            waiting_list_number=waiting_position,
-            property_id=parking.property_id,
-            message=f"You are in waiting list No. {waiting_position}"
-        )
+        return build_parking_status(parking, waiting_position)
     else:
         # Step 4: Subscription is active
-        return ParkingStatusResponse(
-            success=True,
-            is_in_waiting_list=False,
-            property_id=parking.property_id,
-            parking_details=ParkingDetails(
-                parking_slot_reserved=parking.parking_slot_reserved or False,
-                total_available_parking_slots=parking.total_available_parking_slots or 0,
-                total_paid_parking_slots=parking.total_paid_parking_slots or 0,
-                reserved_parking_slots=parking.reserved_parking_slots or 0,
-                status=parking.status or ""
-            ),
-            message="Parking subscription is active"
-        )
+        return build_parking_status(parking)
+
+
+@router.get("/parking/snapshots", response_model=ParkingSnapshotsResponse,
+            dependencies=[Depends(verify_ops_access)])
+def get_parking_snapshots_bulk(
+    property_ids: str = Query(..., description=f"Comma-separated property ids (up to {MAX_SNAPSHOT_PROPERTIES})"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Property-wide parking snapshot (capacity, paid, reserved, waiting-list
+    length, reservations expiring soon) for many properties at once - an ops
+    dashboard view across tenants, so it needs the ops key, not a tenant session.
+    Served from cache; misses are computed together in one query.
+    """
+    try:
+        ids = [int(part) for part in property_ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="property_ids must be comma-separated integers")
+    if not ids:
+        raise HTTPException(status_code=400, detail="No property_ids given")
+    if len(ids) > MAX_SNAPSHOT_PROPERTIES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SNAPSHOT_PROPERTIES} properties per request")
 
+    snapshots = get_parking_snapshots(db, ids)
+    return ParkingSnapshotsResponse(
+        success=True,
+        snapshots=[snapshots[pid] for pid in dict.fromkeys(ids) if pid in snapshots],
+        missing_property_ids=[pid for pid in dict.fromkeys(ids) if pid not in snapshots],
+        message=None
+    )
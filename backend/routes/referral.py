@@ -10,9 +10,8 @@ import os
 
 from database import get_db
 from models.referral import ReferralCode, Referral
-from models.booking import FlatBookingOrder
 from schemas.referral import ReferralInviteRequest, ReferralResponse, DashboardResponse, ReferralStats, ReferralItem
-from services.auth_middleware import get_current_user_phone
+from services.auth_middleware import verify_booking_access
 
 router = APIRouter(prefix="/api/referrals", tags=["Referral"])
 
@@ -62,7 +61,7 @@ def invite_friend(
     invite: ReferralInviteRequest,
     booking_id: str = Query(..., description="Referrer's Booking ID"),
     db: Session = Depends(get_db),
-    current_user_phone: str = Depends(get_current_user_phone)
+    current_user_phone: str = Depends(verify_booking_access)
 ):
     """
     Record a manual invite (Pending status) with the referral code attached
@@ -115,46 +114,24 @@ def invite_friend(
 def get_dashboard(
     booking_id: str = Query(..., description="User's Booking ID"),
     db: Session = Depends(get_db),
-    current_user_phone: str = Depends(get_current_user_phone)
+    current_user_phone: str = Depends(verify_booking_access)
 ):
     print(f"DEBUG: get_dashboard called with booking_id={booking_id}")
     try:
         """
         Get referral stats and list.
-        Also syncs 'Pending' referrals with actual bookings.
+        Pending referrals are reconciled with bookings by the scheduled
+        job in main.py, so this endpoint only reads.
         """
-        # 1. Sync Pending Referrals
-        pending_referrals = db.query(Referral).filter(
-            Referral.referrer_booking_id == booking_id,
-            Referral.status == "Pending"
-        ).all()
-        
-        for ref in pending_referrals:
-            booked_user = db.query(FlatBookingOrder).filter(
-                FlatBookingOrder.tenant_phone_number.contains(ref.referee_phone),
-                FlatBookingOrder.flat_booking_order_code.isnot(None),
-                FlatBookingOrder.flat_booking_order_code != ""
-            ).first()
-            
-            if booked_user:
-                ref.status = "Successful"
-                ref.booking_id = booked_user.flat_booking_order_code
-                ref.updated_at = datetime.utcnow()
-                db.add(ref)
-                
-        if pending_referrals:
-            db.commit()
-            
-        # 2. Get Stats
-        total_invites = db.query(Referral).filter(Referral.referrer_booking_id == booking_id).count()
-        successful_invites = db.query(Referral).filter(
-            Referral.referrer_booking_id == booking_id, 
-            Referral.status == "Successful"
-        ).count()
-        pending_invites = db.query(Referral).filter(
-            Referral.referrer_booking_id == booking_id, 
-            Referral.status == "Pending"
-        ).count()
+        # 1. Get List
+        referrals_list = db.query(Referral).filter(
+            Referral.referrer_booking_id == booking_id
+        ).order_by(Referral.created_at.desc()).all()
+
+        # 2. Get Stats (counted from the list instead of separate COUNT queries)
+        total_invites = len(referrals_list)
+        successful_invites = sum(1 for r in referrals_list if r.status == "Successful")
+        pending_invites = sum(1 for r in referrals_list if r.status == "Pending")
         
         total_earned = successful_invites * REWARD_AMOUNT
         
@@ -162,11 +139,6 @@ def get_dashboard(
         my_code = get_or_create_referral_code(db, booking_id)
         referral_link = f"https://kotsworld.com/register?ref={my_code}" 
         
-        # 4. Get List
-        referrals_list = db.query(Referral).filter(
-            Referral.referrer_booking_id == booking_id
-        ).order_by(Referral.created_at.desc()).all()
-        
         return DashboardResponse(
             success=True,
             stats=ReferralStats(
@@ -1,26 +1,24 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db
-from models.kyc import KycDetails
+from database import get_async_read_db
 from schemas.booking import TenantDetailsResponse
-from services.auth_middleware import get_current_user_phone
+from services.auth_middleware import verify_booking_access
+from services.data_cache import get_kyc_info_async
 
 router = APIRouter(prefix="/api", tags=["Tenant"])
 
 
 @router.get("/tenant-details", response_model=TenantDetailsResponse)
-def get_tenant_details(
+async def get_tenant_details(
     booking_id: str = Query(..., description="Booking ID to fetch tenant details"),
-    db: Session = Depends(get_db),
-    current_user_phone: str = Depends(get_current_user_phone)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user_phone: str = Depends(verify_booking_access)
 ):
     """
     Fetch tenant name from kyc_details table by booking_id.
     """
-    kyc = db.query(KycDetails).filter(
-        KycDetails.booking_id == booking_id
-    ).first()
+    kyc = await get_kyc_info_async(db, booking_id)
     
     if not kyc:
         return TenantDetailsResponse(
@@ -33,6 +31,6 @@ def get_tenant_details(
     return TenantDetailsResponse(
         success=True,
         bookingId=booking_id,
-        tenantName=kyc.tenant_full_name,
+        tenantName=kyc["tenant_full_name"],
         message=None
     )
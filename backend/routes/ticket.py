@@ -1,14 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from pydantic import BaseModel
 from typing import Optional, List
-from sqlalchemy.orm import Session
+from sqlalchemy import String, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 import httpx
 import logging
 
-from database import get_db
+from database import get_async_db, get_async_read_db
 from models.ticket import TenantServiceTicket
 from models.notification import Notification
-from services.auth_middleware import get_current_user_phone
+from services.auth_middleware import get_current_user_phone, verify_booking_access, check_booking_access
+from services.etag import conditional_etag
+from services.pagination import paginate, page_rows, page_limit, MAX_PAGE_SIZE
 from datetime import datetime
 
 from services.websocket_manager import manager
@@ -49,41 +52,70 @@ class TicketResponse(BaseModel):
         from_attributes = True
 
 
+def to_ticket_response(t: TenantServiceTicket) -> TicketResponse:
+    return TicketResponse(
+        id=t.id,
+        ticket_number=t.ticket_number,
+        booking_id=t.booking_id,
+        classification=t.classification,
+        category=t.category,
+        issue_description=t.issue_description,
+        status=t.status,
+        final_resolution_message=t.final_resolution_message,
+        final_resolution_at=t.final_resolution_at.isoformat() if t.final_resolution_at else None,
+        created_at=t.created_at.isoformat() if t.created_at else None,
+    )
+
+
 @router.get("/{booking_id}", response_model=List[TicketResponse])
-def get_tickets_by_booking(
+async def get_tickets_by_booking(
     booking_id: str, 
-    db: Session = Depends(get_db),
-    current_user_phone: str = Depends(get_current_user_phone)
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size (omit with cursor for the whole list)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user_phone: str = Depends(verify_booking_access)
 ):
-    """Fetch all tickets for a given booking ID."""
-    tickets = db.query(TenantServiceTicket).filter(
-        TenantServiceTicket.booking_id == booking_id
-    ).order_by(TenantServiceTicket.created_at.desc()).all()
-
-    result = []
-    for t in tickets:
-        result.append(TicketResponse(
-            id=t.id,
-            ticket_number=t.ticket_number,
-            booking_id=t.booking_id,
-            classification=t.classification,
-            category=t.category,
-            issue_description=t.issue_description,
-            status=t.status,
-            final_resolution_message=t.final_resolution_message,
-            final_resolution_at=t.final_resolution_at.isoformat() if t.final_resolution_at else None,
-            created_at=t.created_at.isoformat() if t.created_at else None,
-        ))
-    return result
+    """
+    Fetch tickets for a given booking ID, newest first - all of them unless
+    `limit` is given. The body stays a plain list; the cursor for the next
+    page is returned in the X-Next-Cursor header. 304 when If-None-Match matches.
+    """
+    # Every ticket's id:status is folded in, so a status changed anywhere (the
+    # email closure job, other systems writing the table) moves the version;
+    # final_resolution_at covers a resolution rewritten without a status change
+    not_modified = await conditional_etag(db, request, response, select(
+        func.count(), func.max(TenantServiceTicket.created_at),
+        func.max(TenantServiceTicket.final_resolution_at), func.count(TenantServiceTicket.final_resolution_at),
+        func.aggregate_strings(
+            cast(TenantServiceTicket.id, String) + ":" + func.coalesce(TenantServiceTicket.status, ""), ","
+        )
+    ).where(TenantServiceTicket.booking_id == booking_id))
+    if not_modified:
+        return not_modified
+
+    limit = page_limit(cursor, limit)
+    rows = await db.execute(paginate(
+        select(TenantServiceTicket).where(TenantServiceTicket.booking_id == booking_id),
+        TenantServiceTicket.created_at, TenantServiceTicket.id, cursor, limit
+    ))
+    tickets, next_cursor = page_rows(rows.scalars().all(), "created_at", limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return [to_ticket_response(t) for t in tickets]
 
 
 @router.post("/raise")
 async def raise_ticket(
     payload: TicketPayload,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_phone: str = Depends(get_current_user_phone)
 ):
     """Proxy endpoint to forward ticket to webhook and log it."""
+    await check_booking_access(db, current_user_phone, payload.booking_id)
+
     payload_dict = payload.dict()
     
     # Overwrite the phone from the payload with the verified phone from the cookie
@@ -160,7 +192,7 @@ async def raise_ticket(
             notification_date=datetime.utcnow()
         )
         db.add(notif)
-        db.commit()
+        await db.commit()
             
     except Exception as e:
         print(f"DEBUG: Error in notification logic: {e}")
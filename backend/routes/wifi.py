@@ -1,29 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from database import get_db
-from models.booking import FlatBookingOrder
-from models.flat import Flat
+from database import get_read_db
 from schemas.wifi import WifiResponse
-from services.auth_middleware import get_current_user_phone
+from services.auth_middleware import verify_booking_access
+from services.booking_resolver import booking_resolver
+from services.data_cache import get_flat_info
 
 router = APIRouter(prefix="/api/wifi", tags=["wifi"])
 
 @router.get("", response_model=WifiResponse)
 def get_wifi_credentials(
     booking_id: str = Query(..., description="Booking ID or Flat Booking Order Code"),
-    db: Session = Depends(get_db),
-    current_user_phone: str = Depends(get_current_user_phone)
+    db: Session = Depends(get_read_db),
+    current_user_phone: str = Depends(verify_booking_access)
 ):
-    # 1. Look up the booking to get the flat_id
-    booking = db.query(FlatBookingOrder).filter(
-        FlatBookingOrder.flat_booking_order_code.ilike(booking_id)
-    ).first()
-    
-    if not booking:
-        # Try dummy_order_code as fallback if needed, but primary is flat_booking_order_code
-        booking = db.query(FlatBookingOrder).filter(
-            FlatBookingOrder.dummy_order_code.ilike(booking_id)
-        ).first()
+    # 1. Look up the booking to get the flat_id (flat_booking_order_code, dummy_order_code as fallback)
+    booking = booking_resolver.resolve(db, booking_id)
         
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
@@ -32,13 +24,13 @@ def get_wifi_credentials(
         raise HTTPException(status_code=400, detail="Booking has no associated flat")
         
     # 2. Look up the flat to get WiFi credentials
-    flat = db.query(Flat).filter(Flat.id == booking.flat_id).first()
+    flat = get_flat_info(db, booking.flat_id)
     
     if not flat:
         raise HTTPException(status_code=404, detail="Flat not found")
         
     return WifiResponse(
         success=True,
-        wifi_id=flat.wifi_id,
-        wifi_password=flat.wifi_password
+        wifi_id=flat["wifi_id"],
+        wifi_password=flat["wifi_password"]
     )
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List
+
+# Upper bound on IDs per batch request (documents + invoices)
+MAX_ACCESS_URL_BATCH = 200
+
+
+class AccessUrlsRequest(BaseModel):
+    """Contract document and invoice IDs to sign in one call"""
+    document_ids: List[int] = Field(default_factory=list)
+    invoice_ids: List[int] = Field(default_factory=list)
+
+
+class AccessUrlsResponse(BaseModel):
+    """
+    Presigned URLs keyed by ID. IDs that are not in the booking, have no
+    PDF, or could not be signed are listed under missing_*.
+    """
+    success: bool
+    expires_in: int
+    documents: Dict[int, str] = {}
+    invoices: Dict[int, str] = {}
+    missing_document_ids: List[int] = []
+    missing_invoice_ids: List[int] = []
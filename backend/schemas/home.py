@@ -0,0 +1,40 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+from schemas.notification import NotificationResponse
+from schemas.occupancy import CoOccupant
+from schemas.parking import ParkingStatusResponse
+from schemas.tenant_invoice import InvoiceItem
+from routes.ticket import TicketResponse
+
+
+class HomeKyc(BaseModel):
+    """Tenant name and co-occupants from kyc_details"""
+    tenant_name: Optional[str] = None
+    co_occupants: List[CoOccupant] = []
+
+
+class HomeFlat(BaseModel):
+    """WiFi credentials and occupancy limit from flats"""
+    wifi_id: Optional[str] = None
+    wifi_password: Optional[str] = None
+    max_occupancy: Optional[str] = None
+
+
+class HomeResponse(BaseModel):
+    """
+    Everything the home screen needs in one round trip. Sections left out
+    via `include=` (or with no data) are null.
+    """
+    success: bool
+    booking_id: str
+    dummy_order_code: Optional[str] = None
+    kyc: Optional[HomeKyc] = None
+    flat: Optional[HomeFlat] = None
+    parking: Optional[ParkingStatusResponse] = None
+    pending_invoices: Optional[List[InvoiceItem]] = None
+    # Set when there are more pending invoices than listed: next_cursor for /api/invoices/pending
+    pending_invoices_next_cursor: Optional[str] = None
+    notifications: Optional[List[NotificationResponse]] = None
+    open_tickets: Optional[List[TicketResponse]] = None
+    message: Optional[str] = None
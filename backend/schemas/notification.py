@@ -18,4 +18,5 @@ class NotificationResponse(BaseModel):
 class NotificationListResponse(BaseModel):
     success: bool
     notifications: List[NotificationResponse]
+    next_cursor: Optional[str] = None
     message: Optional[str] = None
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
+from datetime import datetime
 
 
 class ParkingDetails(BaseModel):
@@ -26,3 +27,25 @@ class ParkingRequestResponse(BaseModel):
     success: bool
     message: str
 
+
+
+class ParkingSnapshot(BaseModel):
+    """Property-wide parking figures (see services/parking_snapshot.py)"""
+    property_id: int
+    flats: int = 0
+    capacity: int = 0
+    paid: int = 0
+    reserved: int = 0
+    reserved_flats: int = 0
+    available: int = 0
+    waiting_list_length: int = 0
+    expiring_reservations: int = 0
+    computed_at: Optional[datetime] = None
+
+
+class ParkingSnapshotsResponse(BaseModel):
+    """Response schema for the bulk property snapshot endpoint"""
+    success: bool
+    snapshots: List[ParkingSnapshot] = []
+    missing_property_ids: List[int] = []
+    message: Optional[str] = None
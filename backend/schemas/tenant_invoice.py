@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import date, datetime
+from decimal import Decimal
 
 
 class InvoiceItem(BaseModel):
@@ -27,4 +28,16 @@ class InvoiceListResponse(BaseModel):
     """Response wrapper for invoice list"""
     success: bool
     invoices: List[InvoiceItem] = []
+    next_cursor: Optional[str] = None
+    message: Optional[str] = None
+
+
+class InvoiceSummaryResponse(BaseModel):
+    """Totals for the invoices card, computed in SQL (see services/invoice_query.py)"""
+    success: bool
+    booking_id: str
+    pending_count: int = 0
+    outstanding_balance: Decimal = Decimal("0")
+    overdue_count: int = 0
+    next_due_date: Optional[date] = None
     message: Optional[str] = None
@@ -1,7 +1,14 @@
+import hmac
+
 from fastapi import Request, HTTPException, Depends
-from services.auth_service import verify_token
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import get_settings
+from database import get_async_read_db
+from services.auth_service import verify_token_cached
+from services.booking_ownership import owns_booking
 
-def get_current_user_phone(request: Request):
+async def get_current_user_phone(request: Request):
     """
     Dependency to get the current user's phone from:
     1. session_token cookie (preferred)
@@ -19,8 +26,40 @@ def get_current_user_phone(request: Request):
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    payload = verify_token(token)
+    payload = verify_token_cached(token)
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid or expired session")
     
     return payload.get("phone")
+
+
+async def check_booking_access(db: AsyncSession, phone: str, booking_id: str):
+    """Raise 403 if the booking is not registered to the given phone."""
+    if not await owns_booking(db, phone, booking_id):
+        raise HTTPException(status_code=403, detail="Booking does not belong to current user")
+
+
+async def verify_booking_access(
+    booking_id: str,
+    db: AsyncSession = Depends(get_async_read_db),
+    phone: str = Depends(get_current_user_phone)
+):
+    """
+    Dependency for booking-scoped routes. Reads `booking_id` from the path or
+    query string, checks it against the cached ownership index and returns
+    the current user's phone (drop-in replacement for get_current_user_phone).
+    """
+    await check_booking_access(db, phone, booking_id)
+    return phone
+
+
+async def verify_ops_access(request: Request):
+    """
+    Dependency for operational endpoints (dashboards, metrics) that aren't
+    scoped to one tenant: the X-Ops-Key header must match settings.ops_api_key.
+    Tenant sessions don't grant access.
+    """
+    expected = get_settings().ops_api_key
+    provided = request.headers.get("X-Ops-Key", "")
+    if not expected or not hmac.compare_digest(provided.encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Operations access required")
@@ -1,6 +1,18 @@
 import jwt
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 from config import get_settings
+from services.ttl_cache import TTLCache
+
+# Verified token payloads keyed by SHA-256 of the token; each entry expires at the token's exp
+_verified_tokens = TTLCache(maxsize=get_settings().token_cache_size)
+
+# Issued SSO tokens keyed by (phone, booking_id); each entry expires one refresh window before the token
+_sso_tokens = TTLCache(maxsize=get_settings().sso_token_cache_size)
+_sso_stats = {"signed": 0, "reused": 0, "signing_seconds": 0.0}
+
+SSO_TOKEN_LIFETIME = timedelta(days=7)
 
 def create_sso_token(phone: str, booking_id: str) -> str:
     """
@@ -10,7 +22,7 @@ def create_sso_token(phone: str, booking_id: str) -> str:
     settings = get_settings()
     
     # Set expiration to 7 days from now
-    exp = datetime.now(timezone.utc) + timedelta(days=7)
+    exp = datetime.now(timezone.utc) + SSO_TOKEN_LIFETIME
     
     payload = {
         "phone": phone,
@@ -21,6 +33,27 @@ def create_sso_token(phone: str, booking_id: str) -> str:
     token = jwt.encode(payload, settings.jwt_secret, algorithm="HS256")
     return token
 
+def get_sso_token(phone: str, booking_id: str) -> str:
+    """
+    Returns a cached SSO token for (phone, booking_id) if it is not yet within
+    the refresh window of its expiry; otherwise signs a new one.
+    """
+    key = (phone, booking_id)
+    token = _sso_tokens.get(key)
+    if token is not None:
+        _sso_stats["reused"] += 1
+        return token
+
+    issued_at = time.time()
+    started = time.perf_counter()
+    token = create_sso_token(phone, booking_id)
+    _sso_stats["signing_seconds"] += time.perf_counter() - started
+    _sso_stats["signed"] += 1
+
+    refresh_window = get_settings().sso_token_refresh_window_seconds
+    _sso_tokens.set(key, token, expires_at=issued_at + SSO_TOKEN_LIFETIME.total_seconds() - refresh_window)
+    return token
+
 def create_session_token(phone: str) -> str:
     """
     Creates a signed JWT for internal Site A session.
@@ -52,3 +85,38 @@ def verify_token(token: str):
         return None
     except jwt.InvalidTokenError:
         return None
+
+
+def verify_token_cached(token: str):
+    """
+    Same as verify_token, but remembers successfully verified tokens until
+    their exp so repeat requests skip the signature check and claim parsing.
+    Invalid tokens are not cached.
+    """
+    digest = hashlib.sha256(token.encode()).hexdigest()
+    payload = _verified_tokens.get(digest)
+    if payload is not None:
+        return payload
+
+    payload = verify_token(token)
+    if payload and payload.get("exp"):
+        _verified_tokens.set(digest, payload, expires_at=payload["exp"])
+    return payload
+
+
+def get_token_cache_stats() -> dict:
+    """Hit/miss counters for the verified token cache."""
+    return _verified_tokens.stats()
+
+
+def get_sso_cache_stats() -> dict:
+    """SSO token reuse counters, with the signing time saved by reuse (estimated from the average signing cost)."""
+    signed = _sso_stats["signed"]
+    avg_sign_ms = (_sso_stats["signing_seconds"] / signed * 1000) if signed else 0.0
+    return {
+        **_sso_tokens.stats(),
+        "tokens_signed": signed,
+        "tokens_reused": _sso_stats["reused"],
+        "avg_sign_ms": round(avg_sign_ms, 4),
+        "signing_ms_saved": round(avg_sign_ms * _sso_stats["reused"], 2),
+    }
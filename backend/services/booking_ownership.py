@@ -0,0 +1,108 @@
+"""
+Phone -> booking codes ownership index.
+Lets booking-scoped routes check that the requested booking belongs to the
+logged-in tenant without an extra flat_booking_orders query per request.
+"""
+
+import logging
+from typing import FrozenSet
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import get_settings
+from models.booking import FlatBookingOrder
+from services.phone_utils import normalize_phone
+from services.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Normalized phone -> frozenset of upper-cased booking codes (flat and dummy codes)
+_ownership_index = TTLCache(
+    maxsize=settings.booking_ownership_cache_size,
+    ttl=settings.booking_ownership_ttl_seconds
+)
+
+
+async def _load_booking_codes(db: AsyncSession, key: str, from_primary: bool = False) -> FrozenSet[str]:
+    """Booking codes registered to a normalized phone, optionally read from the primary."""
+    if not key:
+        return frozenset()
+    # A read-only (RoutingSession) session reads from the replica unless told otherwise
+    primary = getattr(db.sync_session, "primary", None)
+    bind_arguments = {"bind": primary} if from_primary and primary is not None else None
+    result = await db.execute(select(
+        FlatBookingOrder.flat_booking_order_code,
+        FlatBookingOrder.dummy_order_code
+    ).where(
+        FlatBookingOrder.tenant_phone_normalized == key
+    ), bind_arguments=bind_arguments)
+    return frozenset(
+        code.strip().upper()
+        for row in result.all()
+        for code in (row.flat_booking_order_code, row.dummy_order_code)
+        if code and code.strip()
+    )
+
+
+async def get_owned_booking_codes(db: AsyncSession, phone: str) -> FrozenSet[str]:
+    """
+    Return every booking code (flat_booking_order_code and dummy_order_code)
+    registered to this phone. Results are cached per phone; a phone with no
+    bookings isn't cached, so its first booking shows up straight away.
+    """
+    key = normalize_phone(phone)
+    codes = _ownership_index.get(key)
+    if codes is not None:
+        return codes
+
+    codes = await _load_booking_codes(db, key)
+    if codes:
+        _ownership_index.set(key, codes)
+    return codes
+
+
+async def owns_booking(db: AsyncSession, phone: str, booking_id: str) -> bool:
+    """
+    O(1) membership check against the cached index. A miss may just be a
+    booking the index (or a lagging replica) hasn't seen yet, so it is
+    checked once against the primary before access is denied.
+    """
+    if not booking_id:
+        return False
+    booking_id = booking_id.strip().upper()
+    if booking_id in await get_owned_booking_codes(db, phone):
+        return True
+
+    key = normalize_phone(phone)
+    codes = await _load_booking_codes(db, key, from_primary=True)
+    if codes:
+        _ownership_index.set(key, codes)
+    return booking_id in codes
+
+
+def invalidate_booking_ownership(phone: str = None):
+    """Drop one phone's entry, or the whole index when no phone is given."""
+    if phone is None:
+        _ownership_index.clear()
+    else:
+        _ownership_index.pop(normalize_phone(phone))
+
+
+def get_ownership_cache_stats() -> dict:
+    return _ownership_index.stats()
+
+
+# Keep the index in step with writes made through this app's ORM session.
+# New bookings written by other systems are found by owns_booking's primary
+# re-check; bookings they remove or move stop counting when the TTL runs out.
+@event.listens_for(FlatBookingOrder, "after_insert")
+@event.listens_for(FlatBookingOrder, "after_update")
+@event.listens_for(FlatBookingOrder, "after_delete")
+def _invalidate_on_booking_change(mapper, connection, target):
+    history = inspect(target).attrs.tenant_phone_number.history
+    for phone in [target.tenant_phone_number, *(history.deleted or ())]:
+        if phone:
+            invalidate_booking_ownership(phone)
@@ -0,0 +1,122 @@
+"""
+Booking code -> (flat_id, dummy_order_code, tenant phone, status).
+
+Most booking-scoped routes start by looking the booking up in
+flat_booking_orders. BookingResolver answers that from an in-process
+LRU+TTL cache so the lookup only reaches the database on a miss.
+"""
+
+import logging
+from typing import NamedTuple, Optional
+
+from sqlalchemy import event, func, inspect, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from config import get_settings
+from models.booking import FlatBookingOrder
+from services.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+class ResolvedBooking(NamedTuple):
+    """The flat_booking_orders columns the routes need (same names as the model)."""
+    flat_booking_order_code: Optional[str]
+    dummy_order_code: Optional[str]
+    flat_id: Optional[int]
+    tenant_phone_number: Optional[str]
+    status: Optional[str]
+
+
+def _cache_key(booking_code: str) -> str:
+    return booking_code.strip().upper()
+
+
+class BookingResolver:
+    """
+    Resolves a booking code (flat_booking_order_code, or dummy_order_code as
+    a fallback, case-insensitive) to a ResolvedBooking. Unknown codes are
+    not cached, so a booking created later is found on the next request.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def _statement(self, booking_code: str):
+        # upper(code) = KEY matches any stored casing (like the ILIKE it
+        # replaces) and is served by the upper() expression indexes (migrations/0009)
+        key = _cache_key(booking_code)
+        return select(
+            FlatBookingOrder.flat_booking_order_code,
+            FlatBookingOrder.dummy_order_code,
+            FlatBookingOrder.flat_id,
+            FlatBookingOrder.tenant_phone_number,
+            FlatBookingOrder.status,
+        ).where(or_(
+            func.upper(FlatBookingOrder.flat_booking_order_code) == key,
+            func.upper(FlatBookingOrder.dummy_order_code) == key,
+        )).order_by(FlatBookingOrder.id)
+
+    def _pick(self, booking_code: str, rows) -> Optional[ResolvedBooking]:
+        """Prefer a flat_booking_order_code match over a dummy_order_code one."""
+        key = _cache_key(booking_code)
+        match = next((row for row in rows if (row.flat_booking_order_code or "").upper() == key), None)
+        if match is None and rows:
+            match = rows[0]
+        if match is None:
+            return None
+        resolved = ResolvedBooking(*match)
+        self._cache.set(key, resolved)
+        return resolved
+
+    def resolve(self, db: Session, booking_code: str) -> Optional[ResolvedBooking]:
+        if not booking_code or not booking_code.strip():
+            return None
+        cached = self._cache.get(_cache_key(booking_code))
+        if cached is not None:
+            return cached
+        rows = db.execute(self._statement(booking_code)).all()
+        return self._pick(booking_code, rows)
+
+    async def resolve_async(self, db: AsyncSession, booking_code: str) -> Optional[ResolvedBooking]:
+        if not booking_code or not booking_code.strip():
+            return None
+        cached = self._cache.get(_cache_key(booking_code))
+        if cached is not None:
+            return cached
+        rows = (await db.execute(self._statement(booking_code))).all()
+        return self._pick(booking_code, rows)
+
+    def invalidate(self, booking_code: str = None):
+        """Drop one booking code, or every entry when no code is given."""
+        if booking_code is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(_cache_key(booking_code))
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+booking_resolver = BookingResolver(
+    maxsize=settings.booking_resolver_cache_size,
+    ttl=settings.booking_resolver_ttl_seconds
+)
+
+
+# Entries can be cached under either code, so drop both (old and new values)
+# whenever a booking is written through this app's ORM session. Rows changed
+# by other systems are picked up when the TTL runs out.
+@event.listens_for(FlatBookingOrder, "after_insert")
+@event.listens_for(FlatBookingOrder, "after_update")
+@event.listens_for(FlatBookingOrder, "after_delete")
+def _invalidate_on_booking_change(mapper, connection, target):
+    state = inspect(target)
+    for attr in ("flat_booking_order_code", "dummy_order_code"):
+        history = state.attrs[attr].history
+        for code in [getattr(target, attr), *(history.deleted or ())]:
+            if code:
+                booking_resolver.invalidate(code)
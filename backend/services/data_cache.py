@@ -0,0 +1,286 @@
+"""
+Cache for slowly-changing reference data (flat WiFi/occupancy, KYC).
+
+Values are plain JSON-able dicts so they can live in-process (default) or in
+Redis (`data_cache_backend = "redis"`). Each entity has its own TTL and size
+bound, concurrent misses for the same key share a single load (stampede
+protection), and writes through the ORM invalidate the affected entries.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from config import get_settings
+from models.flat import Flat
+from models.kyc import KycDetails
+from services.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+class MemoryBackend:
+    """One TTLCache per entity, so each entity gets its own size bound."""
+
+    def __init__(self, sizes: dict):
+        self._caches = {entity: TTLCache(maxsize=size) for entity, size in sizes.items()}
+
+    def get(self, entity: str, key: str) -> Optional[Any]:
+        return self._caches[entity].get(key)
+
+    def set(self, entity: str, key: str, value: Any, ttl: float):
+        self._caches[entity].set(key, value, ttl=ttl)
+
+    def delete(self, entity: str, key: str):
+        self._caches[entity].pop(key)
+
+    def clear(self, entity: str):
+        self._caches[entity].clear()
+
+    def stats(self, entity: str) -> dict:
+        stats = self._caches[entity].stats()
+        return {"size": stats["size"], "maxsize": stats["maxsize"], "evictions": stats["evictions"]}
+
+
+class RedisBackend:
+    """
+    Redis (or anything speaking its get/set/delete/scan_iter API). Size is
+    bounded by the server's maxmemory policy rather than per entity.
+    """
+
+    def __init__(self, url: str = None, client=None, prefix: str = "kots:data"):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("data_cache_backend=redis needs the 'redis' package (pip install redis)")
+            client = redis.Redis.from_url(url)
+        self._client = client
+        self._prefix = prefix
+
+    def _key(self, entity: str, key: str) -> str:
+        return f"{self._prefix}:{entity}:{key}"
+
+    def get(self, entity: str, key: str) -> Optional[Any]:
+        raw = self._client.get(self._key(entity, key))
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, entity: str, key: str, value: Any, ttl: float):
+        self._client.set(self._key(entity, key), json.dumps(value), ex=max(1, int(ttl)))
+
+    def delete(self, entity: str, key: str):
+        self._client.delete(self._key(entity, key))
+
+    def clear(self, entity: str):
+        keys = list(self._client.scan_iter(match=self._key(entity, "*")))
+        if keys:
+            self._client.delete(*keys)
+
+    def stats(self, entity: str) -> dict:
+        return {}
+
+
+class DataCache:
+    """
+    get_or_load / get_or_load_async return the cached value for
+    (entity, key) or call `loader` once - concurrent callers for the same
+    key wait for that load instead of querying the database themselves.
+    Loaders returning None are not cached.
+    """
+
+    def __init__(self, backend, ttls: dict):
+        self.backend = backend
+        self.ttls = ttls
+        self._counters = {entity: defaultdict(int) for entity in ttls}
+        self._counter_lock = threading.Lock()
+        self._locks_guard = threading.Lock()
+        self._locks = {}
+        self._async_locks = {}
+
+    def _count(self, entity: str, name: str):
+        with self._counter_lock:
+            self._counters[entity][name] += 1
+
+    def _lookup(self, entity: str, key: str) -> Optional[Any]:
+        try:
+            return self.backend.get(entity, key)
+        except Exception as e:
+            # A cache outage should cost a DB query, not the request
+            logger.warning(f"Data cache get failed for {entity}:{key}: {e}")
+            return None
+
+    def _store(self, entity: str, key: str, value: Any):
+        try:
+            self.backend.set(entity, key, value, self.ttls[entity])
+        except Exception as e:
+            logger.warning(f"Data cache set failed for {entity}:{key}: {e}")
+
+    def _key_lock(self, entity: str, key: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((entity, key), threading.Lock())
+
+    def _async_key_lock(self, entity: str, key: str) -> asyncio.Lock:
+        with self._locks_guard:
+            return self._async_locks.setdefault((entity, key), asyncio.Lock())
+
+    def _release_lock(self, locks: dict, entity: str, key: str, lock):
+        with self._locks_guard:
+            if locks.get((entity, key)) is lock:
+                del locks[(entity, key)]
+
+    def get_or_load(self, entity: str, key: str, loader: Callable[[], Optional[Any]]) -> Optional[Any]:
+        value = self._lookup(entity, key)
+        if value is not None:
+            self._count(entity, "hits")
+            return value
+
+        lock = self._key_lock(entity, key)
+        try:
+            with lock:
+                # Another thread may have loaded it while we waited
+                value = self._lookup(entity, key)
+                if value is not None:
+                    self._count(entity, "hits")
+                    return value
+                self._count(entity, "misses")
+                value = loader()
+                if value is not None:
+                    self._store(entity, key, value)
+                return value
+        finally:
+            self._release_lock(self._locks, entity, key, lock)
+
+    async def get_or_load_async(self, entity: str, key: str,
+                                loader: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        value = self._lookup(entity, key)
+        if value is not None:
+            self._count(entity, "hits")
+            return value
+
+        lock = self._async_key_lock(entity, key)
+        try:
+            async with lock:
+                value = self._lookup(entity, key)
+                if value is not None:
+                    self._count(entity, "hits")
+                    return value
+                self._count(entity, "misses")
+                value = await loader()
+                if value is not None:
+                    self._store(entity, key, value)
+                return value
+        finally:
+            self._release_lock(self._async_locks, entity, key, lock)
+
+    def invalidate(self, entity: str, key: str = None):
+        """Drop one key, or every cached value of the entity when no key is given."""
+        try:
+            if key is None:
+                self.backend.clear(entity)
+            else:
+                self.backend.delete(entity, key)
+        except Exception as e:
+            logger.warning(f"Data cache invalidate failed for {entity}:{key}: {e}")
+        self._count(entity, "invalidations")
+
+    def stats(self) -> dict:
+        result = {}
+        for entity in self.ttls:
+            with self._counter_lock:
+                counters = dict(self._counters[entity])
+            hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+            total = hits + misses
+            result[entity] = {
+                "ttl_seconds": self.ttls[entity],
+                "hits": hits,
+                "misses": misses,
+                "invalidations": counters.get("invalidations", 0),
+                "hit_ratio": round(hits / total, 4) if total else 0.0,
+                **self.backend.stats(entity),
+            }
+        return result
+
+
+FLAT = "flat"
+KYC = "kyc"
+
+_ttls = {FLAT: settings.flat_cache_ttl_seconds, KYC: settings.kyc_cache_ttl_seconds}
+
+if settings.data_cache_backend == "redis":
+    _backend = RedisBackend(url=settings.data_cache_redis_url)
+else:
+    _backend = MemoryBackend({FLAT: settings.flat_cache_size, KYC: settings.kyc_cache_size})
+
+data_cache = DataCache(_backend, _ttls)
+
+
+KYC_COLUMNS = ["tenant_full_name"] + [f"co{i}_{field}" for i in range(1, 5) for field in ("name", "phone")]
+
+
+def _flat_to_dict(flat: Optional[Flat]) -> Optional[dict]:
+    if flat is None:
+        return None
+    return {"wifi_id": flat.wifi_id, "wifi_password": flat.wifi_password, "max_occupancy": flat.max_occupancy}
+
+
+def _kyc_to_dict(kyc: Optional[KycDetails]) -> Optional[dict]:
+    if kyc is None:
+        return None
+    return {column: getattr(kyc, column) for column in KYC_COLUMNS}
+
+
+def get_flat_info(db: Session, flat_id: int) -> Optional[dict]:
+    """{wifi_id, wifi_password, max_occupancy} for a flat, or None if it doesn't exist."""
+    return data_cache.get_or_load(
+        FLAT, str(flat_id),
+        lambda: _flat_to_dict(db.query(Flat).filter(Flat.id == flat_id).first())
+    )
+
+
+async def get_flat_info_async(db: AsyncSession, flat_id: int) -> Optional[dict]:
+    async def load():
+        result = await db.execute(select(Flat).where(Flat.id == flat_id))
+        return _flat_to_dict(result.scalars().first())
+    return await data_cache.get_or_load_async(FLAT, str(flat_id), load)
+
+
+def get_kyc_info(db: Session, booking_id: str) -> Optional[dict]:
+    """Tenant name and co1..co4 name/phone from kyc_details, or None."""
+    return data_cache.get_or_load(
+        KYC, booking_id,
+        lambda: _kyc_to_dict(db.query(KycDetails).filter(KycDetails.booking_id == booking_id).first())
+    )
+
+
+async def get_kyc_info_async(db: AsyncSession, booking_id: str) -> Optional[dict]:
+    async def load():
+        result = await db.execute(select(KycDetails).where(KycDetails.booking_id == booking_id))
+        return _kyc_to_dict(result.scalars().first())
+    return await data_cache.get_or_load_async(KYC, booking_id, load)
+
+
+# Flat / KYC rows written through this app's ORM drop their cached copy.
+# Rows changed by other systems are picked up when the TTL runs out.
+@event.listens_for(Flat, "after_insert")
+@event.listens_for(Flat, "after_update")
+@event.listens_for(Flat, "after_delete")
+def _invalidate_flat(mapper, connection, target):
+    if target.id is not None:
+        data_cache.invalidate(FLAT, str(target.id))
+
+
+@event.listens_for(KycDetails, "after_insert")
+@event.listens_for(KycDetails, "after_update")
+@event.listens_for(KycDetails, "after_delete")
+def _invalidate_kyc(mapper, connection, target):
+    if target.booking_id is not None:
+        data_cache.invalidate(KYC, target.booking_id)
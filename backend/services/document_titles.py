@@ -0,0 +1,100 @@
+"""
+Display titles for contract documents.
+
+Titles are cleaned once when a document is ingested (email_service /
+historical_contract_sync) and stored in contract_documents.display_title,
+so the documents endpoint only reads them. backfill_display_titles() fills
+rows ingested before the column existed (see backfill_contract_titles.py).
+"""
+
+import re
+import time
+from typing import Optional
+
+from sqlalchemy import text
+
+_FLAT_NO_SUFFIX = re.compile(r'::\s*Flat No\.?\s*\S+')
+_PART_MARKER = re.compile(r'::\s*PART\s+[A-Z]\s*::')
+_TRAILING_SEPARATOR = re.compile(r'::\s*$')
+_LEADING_SEPARATOR = re.compile(r'^\s*::\s*')
+_DOUBLE_SEPARATOR = re.compile(r'\s*::\s*::\s*')
+
+
+def clean_document_title(title: str, booking_id: str) -> str:
+    """Clean up document title for display."""
+    if not title:
+        return "Document"
+
+    # Remove common email prefixes/suffixes
+    t = title
+    for prefix in ["Fwd:", "Re:", "Document "]:
+        if t.startswith(prefix):
+            t = t[len(prefix):].strip()
+
+    # Remove "has been completed" and everything after
+    if "has been completed" in t:
+        t = t.split("has been completed")[0].strip()
+
+    # Remove CIR-style suffixes: :: PART A :: <ID> :: Flat No. <flat>
+    # Remove ":: Flat No. ..." suffix
+    t = _FLAT_NO_SUFFIX.sub('', t).strip()
+
+    # Remove ":: PART A/B/C ::" etc.
+    t = _PART_MARKER.sub('::', t).strip()
+
+    # Remove booking ID from title if present
+    if booking_id and booking_id in t:
+        t = t.replace(booking_id, "").strip()
+
+    # Remove file extension if present .pdf_ or just .pdf
+    if ".pdf" in t:
+        t = t.split(".pdf")[0].strip()
+
+    # Clean up remaining :: separators and trailing chars
+    t = _TRAILING_SEPARATOR.sub('', t).strip()
+    t = _LEADING_SEPARATOR.sub('', t).strip()
+    t = _DOUBLE_SEPARATOR.sub(' :: ', t).strip()
+
+    # Remove trailing underscores or special chars
+    t = t.strip("_").strip()
+
+    return t if t else "Document"
+
+
+def backfill_display_titles(engine, batch_size: int = 1000, recompute: bool = False) -> int:
+    """
+    Fill display_title in id order, one short transaction per batch. With
+    recompute=True every row is rewritten, e.g. after the cleaning rules
+    change. Each write bumps updated_at, which moves the documents ETag.
+    Returns the number of rows updated.
+    """
+    where = "" if recompute else "AND display_title IS NULL"
+    select_batch = text(
+        f"SELECT id, booking_id, document_title FROM contract_documents "
+        f"WHERE id > :last_id {where} ORDER BY id LIMIT :batch_size"
+    )
+    update_row = text(
+        "UPDATE contract_documents SET display_title = :display_title, updated_at = CURRENT_TIMESTAMP "
+        "WHERE id = :id"
+    )
+
+    last_id = 0
+    total = 0
+    started = time.time()
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(select_batch, {"last_id": last_id, "batch_size": batch_size}).all()
+            if not rows:
+                break
+            conn.execute(update_row, [
+                {
+                    "id": row.id,
+                    "display_title": clean_document_title(row.document_title, row.booking_id),
+                }
+                for row in rows
+            ])
+        last_id = rows[-1].id
+        total += len(rows)
+        print(f"  Backfilled {total} titles (last id {last_id})")
+    print(f"  Title backfill done: {total} rows in {time.time() - started:.1f}s")
+    return total
@@ -1,18 +1,13 @@
 """
 Email service to fetch Zoho Sign emails via IMAP from hello@kots.world (or current user),
 extract booking IDs, and store as SIGN_REQUEST, SIGNED, or CIR contract documents.
-Only processes new emails since the last sync.
+Only processes emails above each folder's UID checkpoint (imap_sync_state).
 """
 
 import imaplib
 import email
-from email import policy
 import re
-import ssl
 import logging
-import os
-import json
-from datetime import datetime, timedelta
 from email.utils import parsedate_to_datetime
 from typing import Optional, List
 
@@ -21,6 +16,11 @@ from sqlalchemy.orm import Session
 from config import get_settings
 from models.contract_document import ContractDocument
 from services.s3_service import S3Service
+from services.document_titles import clean_document_title
+from services.imap_fetch import (
+    CONNECTION_ERRORS, SENT_FOLDERS, connect_imap, iter_headers, iter_messages, search_new_uids, select_folder
+)
+from services.imap_checkpoints import get_last_uid, next_checkpoint, save_checkpoint
 
 logger = logging.getLogger(__name__)
 
@@ -39,30 +39,8 @@ CIR_SUBJECT_PREFIXES = [
     'second bedroom pictures ::',
 ]
 
-# File to persist last sync date
-LAST_SYNC_FILE = os.path.join(os.path.dirname(__file__), '..', '.last_email_sync')
-
-
-def _get_last_sync_date() -> Optional[str]:
-    """Get the last sync date in DD-Mon-YYYY format for IMAP SINCE query."""
-    try:
-        if os.path.exists(LAST_SYNC_FILE):
-            with open(LAST_SYNC_FILE, 'r') as f:
-                data = json.load(f)
-                return data.get('last_sync_date')
-    except Exception as e:
-        logger.warning(f"Could not read last sync file: {e}")
-    return None
-
-
-def _save_last_sync_date():
-    """Save today's date as the last sync date."""
-    try:
-        today = datetime.now().strftime('%d-%b-%Y')
-        with open(LAST_SYNC_FILE, 'w') as f:
-            json.dump({'last_sync_date': today, 'updated_at': datetime.now().isoformat()}, f)
-    except Exception as e:
-        logger.warning(f"Could not save last sync file: {e}")
+# imap_sync_state.sync_name for this job's folder checkpoints
+SYNC_NAME = "contracts"
 
 
 def _extract_booking_id(text: str) -> Optional[str]:
@@ -142,26 +120,33 @@ def _upload_pdf_attachment(msg, booking_id: str, category: str) -> Optional[str]
     return None
 
 
-def _connect_imap(settings):
-    """Create a fresh IMAP connection."""
-    mail = imaplib.IMAP4_SSL(settings.email_host, settings.email_port)
-    mail.login(settings.email_user, settings.email_password)
-    return mail
-
-
-def _process_single_email(mail, eid, existing_msg_ids, existing_titles, db, stats):
+def _may_need_full_email(headers, existing_msg_ids, existing_titles, stats) -> bool:
     """
-    Fetch and process a single email. Returns True if successful, False on error.
-    Raises ssl.SSLError or imaplib.IMAP4.abort if the connection is broken.
+    Header-only pre-check: False when the email can already be skipped by
+    Message-ID, by its subject (no category can match) or by booking+subject.
+    Only emails that pass get downloaded in full.
     """
-    status, msg_data = mail.fetch(eid, "(RFC822)")
-    if status != "OK":
-        stats["errors"] += 1
-        return True  # non-fatal, connection still OK
+    message_id = (headers.get("Message-ID", "") or "").strip()
+    if message_id and message_id in existing_msg_ids:
+        stats["skipped"] += 1
+        return False
+
+    subject = headers.get("Subject", "") or ""
+    subject_lower = subject.lower()
+    if not (_is_cir_subject(subject_lower) or "has been completed" in subject_lower or "request" in subject_lower):
+        return False  # Not a relevant category, whatever the body says
+
+    booking_id = _extract_booking_id(subject)
+    if booking_id and f"{booking_id}||{subject.strip()}" in existing_titles:
+        stats["skipped"] += 1
+        return False
+    return True
 
-    raw_email = msg_data[0][1]
-    msg = email.message_from_bytes(raw_email, policy=policy.default)
 
+def _process_single_email(msg, existing_msg_ids, existing_titles, db, stats):
+    """
+    Process a single (fully downloaded) email. Returns True if successful, False on error.
+    """
     message_id = msg.get("Message-ID", "").strip()
     if message_id and message_id in existing_msg_ids:
         stats["skipped"] += 1
@@ -246,6 +231,7 @@ def _process_single_email(mail, eid, existing_msg_ids, existing_titles, db, stat
         tenant_email=to_email,
         document_category=category,
         document_title=subject,
+        display_title=clean_document_title(subject, booking_id),
         sign_url=sign_url,
         pdf_url=pdf_url,
         email_message_id=message_id,
@@ -267,20 +253,25 @@ def sync_sign_request_emails(db: Session) -> dict:
     """
     Connect to IMAP, read Sent folder,
     extract booking IDs and store as SIGN_REQUEST, SIGNED, or CIR documents.
-    Only processes new emails since the last sync.
+    Only processes emails above each folder's UID checkpoint.
     Skips duplicates using email_message_id.
     Handles SSL errors by reconnecting.
     """
     settings = get_settings()
-    stats = {"fetched": 0, "new": 0, "skipped": 0, "errors": 0}
+    stats = {"fetched": 0, "new": 0, "skipped": 0, "errors": 0, "bytes_received": 0, "bytes_sent": 0}
+
+    def reconnect():
+        """New connection on the folder being scanned (for iter_headers / iter_messages)."""
+        nonlocal mail
+        logger.warning(f"IMAP connection lost in {folder_name}, reconnecting")
+        stats["errors"] += 1
+        mail = connect_imap(settings, stats)
+        select_folder(mail, folder_name)
+        return mail
 
     try:
-        mail = _connect_imap(settings)
+        mail = connect_imap(settings, stats)
 
-        # Folders to search: Sent
-        folders_to_search = ['"Sent"', '"Sent Items"', '"[Gmail]/Sent Mail"', 'Sent']
-        processed_folders = set()
-        
         # Get existing message IDs and titles from DB to avoid duplicates
         existing_msg_ids = set()
         existing_titles = set()
@@ -295,67 +286,54 @@ def sync_sign_request_emails(db: Session) -> dict:
             if record.booking_id and record.document_title:
                 existing_titles.add(f"{record.booking_id}||{record.document_title.strip()}")
 
-        # Get last sync date for incremental processing
-        last_sync_date = _get_last_sync_date()
-        if last_sync_date:
-            search_criteria = f'(SINCE {last_sync_date})'
-            logger.info(f"Incremental sync: fetching emails since {last_sync_date}")
-        else:
-            search_criteria = "ALL"
-            logger.info("First sync: fetching all emails")
-
-        for folder_name in folders_to_search:
+        for folder_name in SENT_FOLDERS:
             try:
-                if folder_name in processed_folders:
+                uidvalidity = select_folder(mail, folder_name)
+                if uidvalidity is None:
                     continue
-                
-                status, _ = mail.select(folder_name)
-                if status != "OK":
-                    continue
-                
-                processed_folders.add(folder_name)
-                logger.info(f"Scanning folder: {folder_name}")
 
-                status, data = mail.search(None, search_criteria)
-                if status != "OK" or not data[0]:
-                    logger.info(f"No emails found in {folder_name}")
-                    continue
+                last_uid = get_last_uid(db, SYNC_NAME, settings.email_user, folder_name, uidvalidity)
+                logger.info(f"Scanning folder: {folder_name} (UIDs after {last_uid})")
 
-                email_ids = data[0].split()
+                email_ids = search_new_uids(mail, last_uid)
                 if not email_ids:
+                    logger.info(f"No new emails in {folder_name}")
                     continue
-                    
+
                 logger.info(f"Found {len(email_ids)} emails in {folder_name}")
                 stats["fetched"] += len(email_ids)
                 
                 # Process newest first
-                email_ids = email_ids[::-1]
-
-                for eid in email_ids:
-                    try:
-                        _process_single_email(mail, eid, existing_msg_ids, existing_titles, db, stats)
-                    except (ssl.SSLError, imaplib.IMAP4.abort, ConnectionError, OSError) as e:
-                        # Connection broken — reconnect and retry this email
-                        logger.warning(f"Connection error on email {eid}, reconnecting: {e}")
-                        stats["errors"] += 1
+                new_ids = email_ids[::-1]
+                failed = []  # retried next run: the checkpoint stays below them
+
+                try:
+                    # Headers first; full downloads only for emails that may be new
+                    new_ids = [
+                        eid for eid, headers in iter_headers(mail, new_ids, reconnect, missing=failed)
+                        if _may_need_full_email(headers, existing_msg_ids, existing_titles, stats)
+                    ]
+                    logger.info(f"{len(new_ids)} emails in {folder_name} need a full download")
+
+                    for eid, msg in iter_messages(mail, new_ids, reconnect, missing=failed):
                         try:
-                            mail = _connect_imap(settings)
-                            mail.select(folder_name)
-                            # Retry this email once
-                            try:
-                                _process_single_email(mail, eid, existing_msg_ids, existing_titles, db, stats)
-                            except Exception:
-                                logger.warning(f"Skipping email {eid} after reconnect retry")
-                                stats["errors"] += 1
-                        except Exception as reconnect_err:
-                            logger.error(f"Failed to reconnect: {reconnect_err}")
-                            # Commit what we have so far and bail
-                            db.commit()
-                            return {"error": f"Connection lost: {str(e)}", **stats}
-                    except Exception as e:
-                        logger.error(f"Error processing email {eid}: {e}")
-                        stats["errors"] += 1
-                        continue
+                            if not _process_single_email(msg, existing_msg_ids, existing_titles, db, stats):
+                                failed.append(eid)
+                        except Exception as e:
+                            logger.error(f"Error processing email {eid}: {e}")
+                            stats["errors"] += 1
+                            failed.append(eid)
+                            continue
+                except CONNECTION_ERRORS as e:
+                    logger.error(f"Failed to reconnect: {e}")
+                    # Commit what we have so far and bail
+                    db.commit()
+                    return {"error": f"Connection lost: {str(e)}", **stats}
+
+                last_uid = next_checkpoint(email_ids, failed)
+                if failed:
+                    logger.warning(f"{len(failed)} emails in {folder_name} failed; retrying from UID {last_uid + 1}")
+                save_checkpoint(db, SYNC_NAME, settings.email_user, folder_name, uidvalidity, last_uid)
 
             except Exception as e:
                 logger.error(f"Error accessing folder {folder_name}: {e}")
@@ -368,10 +346,7 @@ def sync_sign_request_emails(db: Session) -> dict:
             mail.logout()
         except Exception:
             pass
-        
-        # Save sync date for next run
-        _save_last_sync_date()
-        
+
         logger.info(f"Email sync complete: {stats}")
 
     except imaplib.IMAP4.error as e:
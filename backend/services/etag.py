@@ -0,0 +1,50 @@
+"""
+Conditional GET for the polled list endpoints.
+
+A route computes a cheap version tag for the booking's rows (row count plus
+the latest created/updated timestamps, one aggregate query), turns it into an
+ETag, and answers 304 Not Modified before loading or serializing the list
+when the client's If-None-Match still matches.
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def make_etag(request: Request, version) -> str:
+    """
+    Weak ETag over the route, its query string and the version row, so
+    different views / pages of the same booking never share a tag.
+    """
+    raw = f"{request.url.path}?{request.url.query}|{version!r}"
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:20]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if any of the client's If-None-Match tags (weak comparison) equals etag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+async def conditional_etag(db: AsyncSession, request: Request, response: Response,
+                           version_query) -> Optional[Response]:
+    """
+    Run `version_query` (a single-row aggregate), set ETag on `response`
+    and return a 304 response if the client already has this version,
+    otherwise None so the route builds the full body.
+    """
+    version = tuple((await db.execute(version_query)).one())
+    etag = make_etag(request, version)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return None
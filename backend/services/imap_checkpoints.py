@@ -0,0 +1,51 @@
+"""
+UID checkpoints for the IMAP sync jobs (imap_sync_state table).
+
+IMAP UIDs only grow within a folder, so "highest UID processed" is an exact
+high-water mark: the next run asks for UID n+1:* and sees only messages it
+has never processed. The mark is tied to the folder's UIDVALIDITY - when the
+server renumbers the folder the old mark means nothing, and the folder is
+rescanned from the start. A message that couldn't be fetched or processed
+holds the mark just below it, so the next run retries it (messages above it
+are read again and skipped as duplicates).
+"""
+
+import logging
+from typing import Iterable
+
+from sqlalchemy.orm import Session
+
+from models.imap_sync_state import ImapSyncState
+
+logger = logging.getLogger(__name__)
+
+
+def get_last_uid(db: Session, sync_name: str, mailbox: str, folder: str, uidvalidity: int) -> int:
+    """Highest UID already processed, or 0 (full rescan) without a usable checkpoint."""
+    state = db.get(ImapSyncState, (sync_name, mailbox, folder))
+    if state is None:
+        return 0
+    if state.uidvalidity != uidvalidity:
+        logger.warning(
+            f"{sync_name}: UIDVALIDITY of {folder} changed ({state.uidvalidity} -> {uidvalidity}), rescanning"
+        )
+        return 0
+    return state.last_uid
+
+
+def save_checkpoint(db: Session, sync_name: str, mailbox: str, folder: str, uidvalidity: int, last_uid: int):
+    """Record progress; committed together with the rows the run added."""
+    state = db.get(ImapSyncState, (sync_name, mailbox, folder))
+    if state is None:
+        state = ImapSyncState(sync_name=sync_name, mailbox=mailbox, folder=folder)
+        db.add(state)
+    state.uidvalidity = uidvalidity
+    state.last_uid = last_uid
+
+
+def next_checkpoint(uids: Iterable[bytes], failed: Iterable[bytes]) -> int:
+    """New high-water mark after a run over `uids`: the highest, or just below the first that failed."""
+    failed = [int(uid) for uid in failed]
+    if failed:
+        return min(failed) - 1
+    return max(int(uid) for uid in uids)
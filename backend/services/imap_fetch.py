@@ -0,0 +1,229 @@
+"""
+IMAP helpers shared by the ticket and contract email syncs.
+
+Both syncs decide from the Subject / Message-ID whether a message matters,
+and most messages in the Sent folders don't. So they first pull just those
+headers, and download full messages (with their PDF attachments) only for
+the ones that pass. Either way messages are fetched in chunks of UIDs - one
+UID FETCH round trip per chunk - and handed out one at a time from a
+generator, so memory stays bounded to a chunk however large the folder.
+The connection counts bytes in both directions so each run can report
+what it transferred.
+"""
+
+import email
+import imaplib
+import logging
+import re
+import ssl
+from email import policy
+from email.parser import BytesHeaderParser
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Errors after which the connection is unusable and must be re-opened
+CONNECTION_ERRORS = (ssl.SSLError, imaplib.IMAP4.abort, ConnectionError, OSError)
+
+# Headers the sync filters need - everything else waits for the full fetch
+HEADER_FIELDS = "SUBJECT MESSAGE-ID DATE FROM TO"
+HEADER_FETCH_ITEMS = f"(BODY.PEEK[HEADER.FIELDS ({HEADER_FIELDS})])"
+
+# Sent folder names across providers; the syncs scan whichever exist
+SENT_FOLDERS = ["Sent", "Sent Items", "[Gmail]/Sent Mail"]
+
+# "12 (UID 3456 BODY[HEADER.FIELDS (...)] {123}" -> sequence number and UID
+_FETCH_SEQ = re.compile(rb"^(\d+) \(")
+_FETCH_UID = re.compile(rb"UID (\d+)")
+
+_header_parser = BytesHeaderParser(policy=policy.default)
+
+
+class ImapFetchError(imaplib.IMAP4.error):
+    """A UID FETCH chunk came back non-OK, or without some of the messages asked for."""
+
+
+class _ByteCounter:
+    """Adds the bytes an imaplib connection reads and writes to a stats dict."""
+
+    def __init__(self, host, port, transfer: Optional[dict] = None):
+        self.transfer = transfer if transfer is not None else {}
+        self.transfer.setdefault("bytes_received", 0)
+        self.transfer.setdefault("bytes_sent", 0)
+        super().__init__(host, port)
+
+    def read(self, size):
+        data = super().read(size)
+        self.transfer["bytes_received"] += len(data)
+        return data
+
+    def readline(self):
+        line = super().readline()
+        self.transfer["bytes_received"] += len(line)
+        return line
+
+    def send(self, data):
+        self.transfer["bytes_sent"] += len(data)
+        super().send(data)
+
+
+class CountingIMAP4(_ByteCounter, imaplib.IMAP4):
+    pass
+
+
+class CountingIMAP4_SSL(_ByteCounter, imaplib.IMAP4_SSL):
+    pass
+
+
+def connect_imap(settings, transfer: Optional[dict] = None):
+    """
+    Create a fresh, logged-in IMAP connection. Bytes transferred are added to
+    `transfer["bytes_received"]` / `["bytes_sent"]` (pass the run's stats dict).
+    """
+    imap_class = CountingIMAP4_SSL if settings.email_use_ssl else CountingIMAP4
+    mail = imap_class(settings.email_host, settings.email_port, transfer)
+    mail.login(settings.email_user, settings.email_password)
+    return mail
+
+
+def select_folder(mail, folder: str) -> Optional[int]:
+    """SELECT a folder and return its UIDVALIDITY, or None if it can't be selected."""
+    status, _ = mail.select(f'"{folder}"')
+    if status != "OK":
+        return None
+    status, data = mail.response("UIDVALIDITY")
+    if not data or data[0] is None:
+        return None
+    return int(data[0])
+
+
+def any_of(*criteria: str) -> str:
+    """IMAP SEARCH keys ORed together: any_of(a, b, c) -> "OR OR a b c"."""
+    combined = criteria[0]
+    for key in criteria[1:]:
+        combined = f"OR {combined} {key}"
+    return combined
+
+
+def search_new_uids(mail, last_uid: int, criteria: str = "ALL") -> List[bytes]:
+    """
+    UIDs above `last_uid` that match `criteria`, oldest first
+    (UID SEARCH UID n:* <criteria>). Only messages never processed before
+    come back, and the server drops the ones `criteria` rules out.
+    """
+    status, data = mail.uid("SEARCH", None, f"UID {last_uid + 1}:*", criteria)
+    if status != "OK" or not data or not data[0]:
+        return []
+    # "n:*" always includes the folder's highest UID, even when it is below n
+    return [uid for uid in data[0].split() if int(uid) > last_uid]
+
+
+def parse_fetch_response(data) -> Dict[bytes, bytes]:
+    """
+    Map each message in a FETCH response to its literal payload. Keys are the
+    UID when the response carries one (UID FETCH), else the sequence number.
+    Servers put the UID before the literal ("3 (UID 88 BODY[] {25}") or after
+    it, in the bytes element that closes the message (b" UID 88)"); both work.
+    """
+    messages = {}
+    pending = None  # (sequence number, payload) whose UID may still follow
+    for item in data:
+        if isinstance(item, tuple):
+            if pending:
+                messages[pending[0]] = pending[1]
+                pending = None
+            prefix, payload = item
+            uid = _FETCH_UID.search(prefix)
+            if uid:
+                messages[uid.group(1)] = payload
+                continue
+            seq = _FETCH_SEQ.match(prefix)
+            if seq:
+                pending = (seq.group(1), payload)
+        elif pending and isinstance(item, bytes) and not _FETCH_SEQ.match(item):
+            uid = _FETCH_UID.search(item)
+            if uid:
+                messages[uid.group(1)] = pending[1]
+                pending = None
+    if pending:
+        messages[pending[0]] = pending[1]
+    return messages
+
+
+def uid_set(uids: Iterable[bytes]) -> str:
+    """Compact UID set for a command line: [1, 2, 3, 7, 9, 10] -> "1:3,7,9:10"."""
+    ranges = []
+    for uid in sorted({int(u) for u in uids}):
+        if ranges and uid == ranges[-1][1] + 1:
+            ranges[-1][1] = uid
+        else:
+            ranges.append([uid, uid])
+    return ",".join(str(lo) if lo == hi else f"{lo}:{hi}" for lo, hi in ranges)
+
+
+def iter_fetch(mail, uids: List[bytes], items: str, chunk_size: int,
+               reconnect: Optional[Callable] = None,
+               missing: Optional[List[bytes]] = None) -> Iterator[Tuple[bytes, bytes]]:
+    """
+    Yield (uid, payload) for `uids` in the order given, with one UID FETCH per
+    chunk of `chunk_size` UIDs - one round trip per chunk instead of per
+    message, and only the current chunk's response held in memory.
+    UIDs that don't come back - the chunk's FETCH was not OK, or the response
+    left them out - raise ImapFetchError, or with a `missing` list are
+    appended to it (and logged) so the caller can retry them later.
+    If the connection drops, `reconnect()` must return a new connection with
+    the folder selected; the chunk is then retried once.
+    """
+    for start in range(0, len(uids), chunk_size):
+        chunk = uids[start:start + chunk_size]
+        try:
+            status, data = mail.uid("FETCH", uid_set(chunk), items)
+        except CONNECTION_ERRORS:
+            if reconnect is None:
+                raise
+            mail = reconnect()
+            status, data = mail.uid("FETCH", uid_set(chunk), items)
+        if status != "OK":
+            _fetch_failed(chunk, f"UID FETCH returned {status} {data!r}", missing)
+            continue
+        payloads = parse_fetch_response(data)
+        del data
+        lost = []
+        for uid in chunk:
+            payload = payloads.pop(uid, None)
+            if payload is None:
+                lost.append(uid)
+            else:
+                yield uid, payload
+        if lost:
+            _fetch_failed(lost, "not in the UID FETCH response", missing)
+
+
+def _fetch_failed(uids: List[bytes], reason: str, missing: Optional[List[bytes]]):
+    if missing is None:
+        raise ImapFetchError(f"UIDs {uid_set(uids)} {reason}")
+    logger.warning(f"UIDs {uid_set(uids)} {reason}; left for the next run")
+    missing.extend(uids)
+
+
+def iter_headers(mail, uids: List[bytes], reconnect: Optional[Callable] = None,
+                 chunk_size: Optional[int] = None,
+                 missing: Optional[List[bytes]] = None) -> Iterator[Tuple[bytes, email.message.EmailMessage]]:
+    """
+    Subject, Message-ID, Date, From and To of each message (headers only).
+    PEEK leaves the \\Seen flag alone.
+    """
+    chunk_size = chunk_size or get_settings().imap_header_chunk_size
+    for uid, raw in iter_fetch(mail, uids, HEADER_FETCH_ITEMS, chunk_size, reconnect, missing):
+        yield uid, _header_parser.parsebytes(raw)
+
+
+def iter_messages(mail, uids: List[bytes], reconnect: Optional[Callable] = None,
+                  chunk_size: Optional[int] = None,
+                  missing: Optional[List[bytes]] = None) -> Iterator[Tuple[bytes, email.message.EmailMessage]]:
+    """Full messages (body and attachments), `imap_body_chunk_size` per FETCH."""
+    chunk_size = chunk_size or get_settings().imap_body_chunk_size
+    for uid, raw in iter_fetch(mail, uids, "(RFC822)", chunk_size, reconnect, missing):
+        yield uid, email.message_from_bytes(raw, policy=policy.default)
@@ -0,0 +1,248 @@
+"""
+IMAP IDLE push for the ticket email sync.
+
+One long-lived connection per monitored folder sits in IDLE; when the
+server announces new mail ("* n EXISTS") the watcher ends the IDLE and
+runs the sync job, so ticket confirmations and closures reach tenants
+within seconds instead of on the next 3-minute poll. Servers drop idle
+connections after 30 minutes, so IDLE is re-issued every
+`imap_idle_renew_minutes`. Lost connections are re-opened with
+exponential backoff, and every (re)connect runs the job once to catch
+up on anything that arrived while no one was listening. `on_live_change`
+is told whenever the watcher goes from no live IDLE connection to at
+least one and back (server without IDLE, missing folders, reconnect
+backoff), so the caller can poll at the normal rate in the meantime.
+
+imaplib (before Python 3.14) has no IDLE support, so IDLE is driven on the
+raw socket. imaplib reads through a buffered file, so whatever it has
+already read ahead is drained from that buffer first; normal commands
+(SELECT, NOOP, LOGOUT) keep working on the same connection afterwards.
+"""
+
+import imaplib
+import logging
+import select
+import ssl
+import threading
+import time
+from typing import Callable, List, Optional
+
+from config import get_settings
+from services.imap_fetch import CONNECTION_ERRORS, SENT_FOLDERS, connect_imap, select_folder
+
+logger = logging.getLogger(__name__)
+
+# How often a blocked wait checks whether the watcher is being stopped
+STOP_CHECK_SECONDS = 1.0
+
+
+class CoalescingRunner:
+    """
+    Runs a job in the calling thread, never two at once. A call made while
+    the job is running doesn't wait - it makes the running job go round once
+    more when it finishes, so mail that arrived mid-run is still picked up.
+    """
+
+    def __init__(self, job: Callable[[], None]):
+        self.job = job
+        self._lock = threading.Lock()
+        self._running = False
+        self._rerun = False
+
+    def run(self):
+        with self._lock:
+            if self._running:
+                self._rerun = True
+                return
+            self._running = True
+        while True:
+            with self._lock:
+                self._rerun = False
+            try:
+                self.job()
+            except Exception as e:
+                logger.error(f"Sync job failed: {e}")
+            with self._lock:
+                if not self._rerun:
+                    self._running = False
+                    return
+
+
+class ImapIdleWatcher:
+    """Background threads that IDLE on each monitored folder and call `on_new_mail`."""
+
+    def __init__(self, on_new_mail: Callable[[], None], folders: Optional[List[str]] = None,
+                 renew_seconds: Optional[float] = None, max_backoff_seconds: Optional[float] = None,
+                 on_live_change: Optional[Callable[[bool], None]] = None):
+        settings = get_settings()
+        self.on_new_mail = on_new_mail
+        self.on_live_change = on_live_change
+        self.folders = folders or SENT_FOLDERS
+        self.renew_seconds = renew_seconds or settings.imap_idle_renew_minutes * 60
+        self.max_backoff_seconds = max_backoff_seconds or settings.imap_idle_max_backoff_seconds
+        self._stop = threading.Event()
+        self._threads = []
+        self._live = set()  # folders with an IDLE connection up
+        self._live_lock = threading.Lock()
+
+    def start(self):
+        for folder in self.folders:
+            thread = threading.Thread(target=self._watch, args=(folder,), name=f"imap-idle-{folder}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    @property
+    def live(self) -> bool:
+        with self._live_lock:
+            return bool(self._live)
+
+    def _set_live(self, folder: str, live: bool):
+        with self._live_lock:
+            was_live = bool(self._live)
+            if live:
+                self._live.add(folder)
+            else:
+                self._live.discard(folder)
+            changed = was_live != bool(self._live)
+        if changed and self.on_live_change and not self._stop.is_set():
+            try:
+                self.on_live_change(not was_live)
+            except Exception as e:
+                logger.error(f"on_live_change failed: {e}")
+
+    # --- per-folder loop -------------------------------------------------
+
+    def _watch(self, folder: str):
+        settings = get_settings()
+        backoff = 1
+        while not self._stop.is_set():
+            mail = None
+            try:
+                mail = connect_imap(settings)
+                if "IDLE" not in mail.capabilities:
+                    logger.error("IMAP server does not support IDLE; ticket sync falls back to polling")
+                    return
+                if select_folder(mail, folder) is None:
+                    return  # folder doesn't exist on this server
+                logger.info(f"IMAP IDLE watching {folder}")
+                backoff = 1
+                self._set_live(folder, True)
+
+                # Catch up on whatever arrived while nobody was listening
+                self.on_new_mail()
+                while not self._stop.is_set():
+                    # NOOP first: mail that arrived while the job ran isn't announced by IDLE
+                    if self._changed_since_idle(mail) or self._idle(mail):
+                        self.on_new_mail()
+
+            except (imaplib.IMAP4.error, *CONNECTION_ERRORS) as e:
+                self._set_live(folder, False)
+                if self._stop.is_set():
+                    break
+                logger.warning(f"IMAP IDLE on {folder} lost its connection ({e}); retrying in {backoff}s")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff_seconds)
+            finally:
+                self._set_live(folder, False)
+                if mail is not None:
+                    try:
+                        mail.logout()
+                    except Exception:
+                        pass
+
+    def _idle(self, mail) -> bool:
+        """
+        One IDLE round. Returns True as soon as the server reports new
+        messages, False when it's time to renew (or the watcher is stopping).
+        """
+        tag = b"IDLE%d" % int(time.time() * 1000)
+        mail.send(tag + b" IDLE\r\n")
+        reader = _LineReader(mail.sock, self._stop, mail.file)
+
+        line = reader.read_line(timeout=30)
+        if line is None or not line.startswith(b"+"):
+            raise imaplib.IMAP4.abort(f"IDLE not accepted: {line!r}")
+
+        new_mail = False
+        deadline = time.monotonic() + self.renew_seconds
+        while not new_mail and not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            line = reader.read_line(timeout=remaining)
+            if line is not None and line.startswith(b"*") and line.upper().endswith(b" EXISTS"):
+                new_mail = True
+
+        mail.send(b"DONE\r\n")
+        while True:
+            line = reader.read_line(timeout=30)
+            if line is None:
+                raise imaplib.IMAP4.abort("no response to DONE")
+            if line.startswith(tag):
+                # Anything after the tagged reply was read off imaplib's socket; don't lose news of mail
+                return new_mail or b" EXISTS" in reader.buffer.upper()
+
+    def _changed_since_idle(self, mail) -> bool:
+        """NOOP between IDLE rounds: True if messages arrived since the last report."""
+        mail.untagged_responses.pop("EXISTS", None)
+        mail.noop()
+        return mail.untagged_responses.pop("EXISTS", None) is not None
+
+
+class _LineReader:
+    """
+    CRLF lines straight from the socket, waiting in short ticks so stop() is
+    noticed. Starts with whatever `file` (imaplib's buffered reader on the
+    same socket) has already read ahead, which the socket won't return again.
+    """
+
+    def __init__(self, sock, stop: threading.Event, file=None):
+        self.sock = sock
+        self.stop = stop
+        self.buffer = b""
+        if file is not None:
+            while True:
+                buffered = _peek_buffered(file, sock)
+                if not buffered:
+                    break
+                self.buffer += file.read(len(buffered))
+
+    def read_line(self, timeout: float) -> Optional[bytes]:
+        """Next line, or None if none arrived within `timeout` (or on stop)."""
+        deadline = time.monotonic() + timeout
+        while b"\r\n" not in self.buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self.stop.is_set():
+                return None
+            # Decrypted TLS data can be waiting without the socket being readable
+            pending = self.sock.pending() if hasattr(self.sock, "pending") else 0
+            if not pending:
+                readable, _, _ = select.select([self.sock], [], [], min(remaining, STOP_CHECK_SECONDS))
+                if not readable:
+                    continue
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                raise ConnectionError("IMAP server closed the connection")
+            self.buffer += chunk
+        line, self.buffer = self.buffer.split(b"\r\n", 1)
+        return line
+
+
+def _peek_buffered(file, sock) -> bytes:
+    """
+    Bytes `file` can hand out without blocking: its read-ahead buffer, or
+    (when that is empty) one non-blocking read of the socket.
+    """
+    timeout = sock.gettimeout()
+    sock.setblocking(False)
+    try:
+        return file.peek() or b""
+    except (BlockingIOError, ssl.SSLWantReadError):
+        return b""
+    finally:
+        sock.settimeout(timeout)
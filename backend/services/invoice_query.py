@@ -0,0 +1,103 @@
+"""
+One query engine behind the invoice views (/invoices, /invoices/pending,
+/invoices/paid, the home screen card) and /invoices/summary.
+
+Lists select only the columns InvoiceItem needs and page with the shared
+keyset helper. The summary aggregates the numeric balance_amount column
+(Postgres-generated from the String balance, see migrations/0004) so the
+client never has to download every invoice just to add them up.
+"""
+
+import logging
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.tenant_invoice import TenantInvoice
+from schemas.tenant_invoice import InvoiceItem, InvoiceSummaryResponse
+from services.pagination import paginate, page_rows
+
+logger = logging.getLogger(__name__)
+
+PENDING_STATUSES = ["Sent", "Overdue"]
+
+# view name -> extra filter on status (None = every invoice)
+INVOICE_VIEWS = {
+    "all": None,
+    "pending": TenantInvoice.status.in_(PENDING_STATUSES),
+    "paid": TenantInvoice.status == "Paid",
+}
+
+ITEM_COLUMNS = [
+    TenantInvoice.id,
+    TenantInvoice.booking_id,
+    TenantInvoice.invoice_date,
+    TenantInvoice.invoice_number,
+    TenantInvoice.customer_name,
+    TenantInvoice.total,
+    TenantInvoice.due_date,
+    TenantInvoice.balance,
+    TenantInvoice.status,
+    TenantInvoice.pdf_url,
+    TenantInvoice.created_at,
+    TenantInvoice.updated_at,
+]
+
+
+def view_filters(booking_id: str, view: str) -> list:
+    filters = [TenantInvoice.booking_id == booking_id]
+    if INVOICE_VIEWS[view] is not None:
+        filters.append(INVOICE_VIEWS[view])
+    return filters
+
+
+def invoice_version_query(booking_id: str, view: str):
+    """Count + latest created/updated timestamps for the ETag of an invoice view."""
+    return select(
+        func.count(), func.max(TenantInvoice.created_at), func.max(TenantInvoice.updated_at)
+    ).where(*view_filters(booking_id, view))
+
+
+async def fetch_invoice_page(db: AsyncSession, booking_id: str, view: str, dummy_order_code: Optional[str],
+                             cursor: Optional[str], limit: Optional[int]) -> Tuple[List[InvoiceItem], Optional[str]]:
+    """One page of a view (the whole view if `limit` is None), newest due date first, plus the next cursor."""
+    result = await db.execute(paginate(
+        select(*ITEM_COLUMNS).where(*view_filters(booking_id, view)),
+        TenantInvoice.due_date, TenantInvoice.id, cursor, limit
+    ))
+    rows, next_cursor = page_rows(result.all(), "due_date", limit)
+    items = [InvoiceItem(**row._mapping, dummy_order_code=dummy_order_code) for row in rows]
+    return items, next_cursor
+
+
+async def fetch_invoice_summary(db: AsyncSession, booking_id: str, today: date = None) -> InvoiceSummaryResponse:
+    """Outstanding balance, overdue count and next due date in one aggregate query."""
+    today = today or date.today()
+    is_pending = TenantInvoice.status.in_(PENDING_STATUSES)
+    is_overdue = TenantInvoice.status == "Overdue"
+    row = (await db.execute(select(
+        func.count(case((is_pending, 1))).label("pending_count"),
+        func.coalesce(func.sum(case((is_pending, TenantInvoice.balance_amount))), 0).label("outstanding_balance"),
+        func.count(case((is_pending & (is_overdue | (TenantInvoice.due_date < today)), 1))).label("overdue_count"),
+        func.min(case((is_pending & (TenantInvoice.due_date >= today), TenantInvoice.due_date))).label("next_due_date"),
+        # Pending balances whose text has no number - left out of outstanding_balance
+        func.count(case((
+            is_pending & TenantInvoice.balance_amount.is_(None)
+            & (func.trim(func.coalesce(TenantInvoice.balance, "")) != ""), 1
+        ))).label("unparsed_count"),
+    ).where(TenantInvoice.booking_id == booking_id))).one()
+
+    if row.unparsed_count:
+        logger.warning(f"Invoice summary for {booking_id}: {row.unparsed_count} pending balance(s) "
+                       f"not parseable as a number, left out of outstanding_balance")
+
+    return InvoiceSummaryResponse(
+        success=True,
+        booking_id=booking_id,
+        pending_count=row.pending_count,
+        outstanding_balance=row.outstanding_balance,
+        overdue_count=row.overdue_count,
+        next_due_date=row.next_due_date,
+    )
@@ -0,0 +1,98 @@
+"""
+Keyset (cursor) pagination for the per-booking list endpoints.
+
+Lists are ordered newest first by (sort column DESC NULLS FIRST, id DESC).
+A cursor is the (sort value, id) of the last row on the previous page,
+base64-encoded, so the next page is an index range scan that costs the
+same no matter how deep into the history the client is.
+
+Paging is opt-in: a request with neither `limit` nor `cursor` still gets the
+whole list, as before, so clients that don't follow next_cursor lose nothing.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _decode_value(column, value):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is UUID:
+        return UUID(value)
+    return python_type(value)
+
+
+def encode_cursor(sort_value, row_id) -> str:
+    raw = json.dumps([_encode_value(sort_value), _encode_value(row_id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_column, id_column) -> Tuple:
+    """Return (sort value, id) typed like the columns, or raise 400."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        return _decode_value(sort_column, sort_value), _decode_value(id_column, row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def page_limit(cursor: Optional[str], limit: Optional[int]) -> Optional[int]:
+    """Page size for a request: None (the whole list) unless the client asked to page."""
+    if limit is None and cursor:
+        return DEFAULT_PAGE_SIZE
+    return limit
+
+
+def paginate(stmt, sort_column, id_column, cursor: Optional[str], limit: Optional[int]):
+    """
+    Order `stmt` newest first and restrict it to the rows after `cursor`.
+    Fetches limit + 1 rows so page_rows() can tell whether there is a next page
+    (no LIMIT at all when `limit` is None).
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor, sort_column, id_column)
+        if sort_value is None:
+            # Inside the leading NULL block: the rest of it, then every non-NULL row
+            stmt = stmt.where(or_(
+                and_(sort_column.is_(None), id_column < row_id),
+                sort_column.isnot(None),
+            ))
+        else:
+            stmt = stmt.where(or_(
+                sort_column < sort_value,
+                and_(sort_column == sort_value, id_column < row_id),
+            ))
+    stmt = stmt.order_by(sort_column.desc().nulls_first(), id_column.desc())
+    return stmt if limit is None else stmt.limit(limit + 1)
+
+
+def page_rows(rows: List, sort_attr: str, limit: Optional[int]) -> Tuple[List, Optional[str]]:
+    """Trim the extra look-ahead row and build the cursor for the next page (None on the last page)."""
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_attr), last.id)
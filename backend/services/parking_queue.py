@@ -0,0 +1,137 @@
+"""
+Parking waiting-list position.
+
+The position of a waiting ParkingLock is the number of waiting entries for
+the same property with an id at or below its own - one COUNT answered from
+ix_parking_locks_waiting_list (property_id, parking_notify_me, id), instead
+of loading the whole queue.
+
+For read-heavy deployments `parking_waiting_index_enabled` keeps a sorted
+list of waiting ids per property in memory (loaded on first use, updated by
+ORM writes, reloaded after `parking_waiting_index_ttl_seconds` to pick up
+writes made by other systems) so a position lookup is a bisect.
+"""
+
+import bisect
+import threading
+import time
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from config import get_settings
+from models.parking import ParkingLock
+
+settings = get_settings()
+
+
+def waiting_position_query(parking: ParkingLock):
+    return select(func.count()).where(
+        ParkingLock.property_id == parking.property_id,
+        ParkingLock.parking_notify_me == True,
+        ParkingLock.id <= parking.id
+    )
+
+
+def waiting_ids_query(property_id: int):
+    return select(ParkingLock.id).where(
+        ParkingLock.property_id == property_id,
+        ParkingLock.parking_notify_me == True
+    ).order_by(ParkingLock.id)
+
+
+class WaitingListIndex:
+    """property_id -> sorted waiting ids, with a load timestamp per property."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._queues = {}
+        self._loaded_at = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+
+    def _fresh(self, property_id) -> bool:
+        loaded_at = self._loaded_at.get(property_id)
+        return loaded_at is not None and time.time() - loaded_at < self.ttl
+
+    def _store(self, property_id, ids):
+        with self._lock:
+            self._queues[property_id] = list(ids)
+            self._loaded_at[property_id] = time.time()
+            self.loads += 1
+
+    def _position(self, property_id, parking_id) -> int:
+        with self._lock:
+            queue = self._queues[property_id]
+            self.hits += 1
+            return bisect.bisect_right(queue, parking_id)
+
+    def position(self, db: Session, parking: ParkingLock) -> int:
+        if not self._fresh(parking.property_id):
+            self._store(parking.property_id, db.execute(waiting_ids_query(parking.property_id)).scalars())
+        return self._position(parking.property_id, parking.id)
+
+    async def position_async(self, db: AsyncSession, parking: ParkingLock) -> int:
+        if not self._fresh(parking.property_id):
+            result = await db.execute(waiting_ids_query(parking.property_id))
+            self._store(parking.property_id, result.scalars())
+        return self._position(parking.property_id, parking.id)
+
+    def apply_change(self, parking_id: int, old_property_ids, property_id, waiting: bool):
+        """Move one entry in the loaded queues (properties not loaded yet are left alone)."""
+        with self._lock:
+            for pid in {*old_property_ids, property_id}:
+                queue = self._queues.get(pid)
+                if queue is None:
+                    continue
+                i = bisect.bisect_left(queue, parking_id)
+                if i < len(queue) and queue[i] == parking_id:
+                    del queue[i]
+            if waiting and property_id in self._queues:
+                bisect.insort(self._queues[property_id], parking_id)
+
+    def clear(self):
+        with self._lock:
+            self._queues.clear()
+            self._loaded_at.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": settings.parking_waiting_index_enabled,
+                "properties": len(self._queues),
+                "entries": sum(len(q) for q in self._queues.values()),
+                "hits": self.hits,
+                "loads": self.loads,
+            }
+
+
+waiting_index = WaitingListIndex(ttl=settings.parking_waiting_index_ttl_seconds)
+
+
+def get_waiting_position(db: Session, parking: ParkingLock) -> int:
+    """1-based position of a waiting ParkingLock within its property's queue."""
+    if settings.parking_waiting_index_enabled:
+        return waiting_index.position(db, parking)
+    return db.execute(waiting_position_query(parking)).scalar()
+
+
+async def get_waiting_position_async(db: AsyncSession, parking: ParkingLock) -> int:
+    if settings.parking_waiting_index_enabled:
+        return await waiting_index.position_async(db, parking)
+    return await db.scalar(waiting_position_query(parking))
+
+
+@event.listens_for(ParkingLock, "after_insert")
+@event.listens_for(ParkingLock, "after_update")
+def _index_on_parking_change(mapper, connection, target):
+    history = inspect(target).attrs.property_id.history
+    waiting_index.apply_change(target.id, history.deleted or (), target.property_id,
+                               bool(target.parking_notify_me))
+
+
+@event.listens_for(ParkingLock, "after_delete")
+def _index_on_parking_delete(mapper, connection, target):
+    waiting_index.apply_change(target.id, (), target.property_id, False)
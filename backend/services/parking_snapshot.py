@@ -0,0 +1,101 @@
+"""
+Per-property parking snapshot: capacity, paid, reserved, waiting-list length
+and reservations expiring soon.
+
+The slot totals (total_available / total_paid / reserved_parking_slots) are
+property-wide figures repeated on every flat's ParkingLock row, so the
+snapshot takes their max; the rest are counts. One GROUP BY over the
+requested properties (property_id is the leading column of
+ix_parking_locks_waiting_list) fills the cache for every miss at once.
+ORM writes to parking_locks drop just the touched properties, and the short
+TTL covers rows written by other systems and the moving expiry window.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable
+
+from sqlalchemy import and_, case, event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from config import get_settings
+from models.parking import ParkingLock
+from schemas.parking import ParkingSnapshot
+from services.ttl_cache import TTLCache
+
+settings = get_settings()
+
+_snapshots = TTLCache(
+    maxsize=settings.parking_snapshot_cache_size,
+    ttl=settings.parking_snapshot_ttl_seconds
+)
+
+
+def _snapshot_query(property_ids, now: datetime):
+    expiring_before = now + timedelta(hours=settings.parking_expiring_window_hours)
+    return select(
+        ParkingLock.property_id,
+        func.count().label("flats"),
+        func.coalesce(func.max(ParkingLock.total_available_parking_slots), 0).label("capacity"),
+        func.coalesce(func.max(ParkingLock.total_paid_parking_slots), 0).label("paid"),
+        func.coalesce(func.max(ParkingLock.reserved_parking_slots), 0).label("reserved"),
+        func.count(case((ParkingLock.parking_slot_reserved == True, 1))).label("reserved_flats"),
+        func.count(case((ParkingLock.parking_notify_me == True, 1))).label("waiting"),
+        func.count(case((and_(
+            ParkingLock.parking_slot_reserved == True,
+            ParkingLock.parking_reservation_expires_at >= now,
+            ParkingLock.parking_reservation_expires_at < expiring_before,
+        ), 1))).label("expiring_reservations"),
+    ).where(ParkingLock.property_id.in_(property_ids)).group_by(ParkingLock.property_id)
+
+
+def get_parking_snapshots(db: Session, property_ids: Iterable[int]) -> Dict[int, ParkingSnapshot]:
+    """Snapshots for the given properties; unknown properties are left out."""
+    snapshots = {}
+    missing = []
+    for property_id in dict.fromkeys(property_ids):
+        cached = _snapshots.get(property_id)
+        if cached is not None:
+            snapshots[property_id] = cached
+        else:
+            missing.append(property_id)
+
+    if missing:
+        now = datetime.utcnow()
+        for row in db.execute(_snapshot_query(missing, now)):
+            snapshot = ParkingSnapshot(
+                property_id=row.property_id,
+                flats=row.flats,
+                capacity=row.capacity,
+                paid=row.paid,
+                reserved=row.reserved,
+                reserved_flats=row.reserved_flats,
+                available=max(row.capacity - row.paid - row.reserved, 0),
+                waiting_list_length=row.waiting,
+                expiring_reservations=row.expiring_reservations,
+                computed_at=now,
+            )
+            _snapshots.set(row.property_id, snapshot)
+            snapshots[row.property_id] = snapshot
+    return snapshots
+
+
+def invalidate_parking_snapshot(property_id: int = None):
+    """Drop one property's snapshot, or all of them when no id is given."""
+    if property_id is None:
+        _snapshots.clear()
+    else:
+        _snapshots.pop(property_id)
+
+
+def get_snapshot_cache_stats() -> dict:
+    return _snapshots.stats()
+
+
+@event.listens_for(ParkingLock, "after_insert")
+@event.listens_for(ParkingLock, "after_update")
+@event.listens_for(ParkingLock, "after_delete")
+def _invalidate_on_parking_change(mapper, connection, target):
+    history = inspect(target).attrs.property_id.history
+    for property_id in {target.property_id, *(history.deleted or ())}:
+        if property_id is not None:
+            invalidate_parking_snapshot(property_id)
@@ -0,0 +1,15 @@
+"""
+Phone number normalization shared by login, session restore and referral matching.
+"""
+
+
+def normalize_phone(phone: str) -> str:
+    """
+    Canonical 10-digit form used for lookups: digits only, country code
+    (+91 / 91 / leading 0) dropped by keeping the last 10 digits.
+    Returns "" when the input has no digits.
+
+    Must stay in step with the SQL expression in migrations/0001_tenant_phone_normalized.py.
+    """
+    digits = "".join(filter(str.isdigit, phone or ""))
+    return digits[-10:]
@@ -0,0 +1,126 @@
+"""
+Per-request SQL instrumentation.
+
+SQLAlchemy cursor hooks on both engines record statement count, total DB
+time and the slowest statement for the current request (tracked through a
+ContextVar set by the middleware in main.py). The start time lives on the
+statement's execution context, so a statement that raises leaves nothing
+behind on the pooled connection. Finished requests feed a rolling per-route
+summary (including the slowest statement seen), and statements over the
+configured threshold go to the slow-query log with their parameters redacted.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from config import get_settings
+
+logger = logging.getLogger("slow_query")
+
+settings = get_settings()
+
+# Stats dict for the request being served (None outside a request, e.g. scheduler jobs)
+_request_stats: ContextVar[Optional[dict]] = ContextVar("request_sql_stats", default=None)
+
+# "GET /api/invoices" -> recent samples of (total_ms, db_ms, statements, slowest_ms, slowest_sql)
+_route_samples = defaultdict(lambda: deque(maxlen=settings.route_metrics_window))
+_route_lock = threading.Lock()
+
+
+def start_request():
+    """Begin collecting stats for a request. Returns the token for end_request."""
+    return _request_stats.set({"statements": 0, "db_ms": 0.0, "slowest_ms": 0.0, "slowest_sql": None})
+
+
+def end_request(token) -> dict:
+    stats = _request_stats.get()
+    _request_stats.reset(token)
+    return stats
+
+
+def _redact(parameters) -> str:
+    """Keep the shape of the bound parameters, never their values."""
+    if isinstance(parameters, dict):
+        return str({key: "?" for key in parameters})
+    if isinstance(parameters, (list, tuple)):
+        return f"[{len(parameters)} params]"
+    return "[params]"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats["statements"] += 1
+        stats["db_ms"] += elapsed_ms
+        if elapsed_ms > stats["slowest_ms"]:
+            stats["slowest_ms"] = elapsed_ms
+            stats["slowest_sql"] = statement
+
+    if elapsed_ms >= settings.slow_query_threshold_ms:
+        logger.warning(f"Slow query ({elapsed_ms:.1f} ms): {' '.join(statement.split())} -- params {_redact(parameters)}")
+
+
+def instrument_engine(engine):
+    """Attach the cursor hooks to a (sync) Engine. For AsyncEngine pass engine.sync_engine."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def record_route(route_key: str, total_ms: float, stats: dict):
+    sample = (total_ms, stats["db_ms"], stats["statements"], stats["slowest_ms"], stats["slowest_sql"])
+    with _route_lock:
+        _route_samples[route_key].append(sample)
+
+
+def server_timing_header(total_ms: float, stats: dict) -> str:
+    return (
+        f'db;dur={stats["db_ms"]:.1f};desc="{stats["statements"]} queries", '
+        f'db-slowest;dur={stats["slowest_ms"]:.1f}, '
+        f'app;dur={total_ms:.1f}'
+    )
+
+
+def _percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def get_route_summary() -> dict:
+    """Rolling per-route summary over the last `route_metrics_window` requests."""
+    with _route_lock:
+        snapshot = {route: list(samples) for route, samples in _route_samples.items()}
+
+    summary = {}
+    for route, samples in sorted(snapshot.items()):
+        totals = [s[0] for s in samples]
+        db_times = [s[1] for s in samples]
+        statements = [s[2] for s in samples]
+        slowest = max(samples, key=lambda s: s[3])
+        summary[route] = {
+            "requests": len(samples),
+            "avg_statements": round(sum(statements) / len(samples), 2),
+            "max_statements": max(statements),
+            "avg_db_ms": round(sum(db_times) / len(samples), 2),
+            "p95_db_ms": round(_percentile(db_times, 0.95), 2),
+            "avg_total_ms": round(sum(totals) / len(samples), 2),
+            "p95_total_ms": round(_percentile(totals, 0.95), 2),
+            "slowest_statement_ms": round(slowest[3], 2),
+            "slowest_sql": " ".join(slowest[4].split()) if slowest[4] else None,
+        }
+    return summary
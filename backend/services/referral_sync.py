@@ -0,0 +1,61 @@
+"""
+Reconciles 'Pending' referrals with actual bookings.
+A referral becomes 'Successful' once a booking exists for the referee's phone.
+Runs as a scheduled job (see main.py) so the dashboard GET stays read-only.
+"""
+
+import logging
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from models.booking import FlatBookingOrder
+from models.referral import Referral
+from services.phone_utils import normalize_phone
+
+logger = logging.getLogger(__name__)
+
+
+def reconcile_pending_referrals(db: Session, referrer_booking_id: Optional[str] = None) -> dict:
+    """
+    Match every pending referral (optionally for one referrer) against
+    bookings in a single query on the normalized phone column.
+    """
+    stats = {"pending": 0, "matched": 0}
+
+    query = db.query(Referral).filter(Referral.status == "Pending")
+    if referrer_booking_id:
+        query = query.filter(Referral.referrer_booking_id == referrer_booking_id)
+    pending_referrals = query.all()
+    stats["pending"] = len(pending_referrals)
+
+    phones = {normalize_phone(ref.referee_phone) for ref in pending_referrals}
+    phones.discard("")
+    if not phones:
+        return stats
+
+    # Oldest booking per phone wins
+    booked = db.query(
+        FlatBookingOrder.tenant_phone_normalized,
+        FlatBookingOrder.flat_booking_order_code
+    ).filter(
+        FlatBookingOrder.tenant_phone_normalized.in_(phones),
+        FlatBookingOrder.flat_booking_order_code.isnot(None),
+        FlatBookingOrder.flat_booking_order_code != ""
+    ).order_by(FlatBookingOrder.id.desc()).all()
+    booking_by_phone = {row.tenant_phone_normalized: row.flat_booking_order_code for row in booked}
+
+    now = datetime.utcnow()
+    for ref in pending_referrals:
+        booking_code = booking_by_phone.get(normalize_phone(ref.referee_phone))
+        if booking_code:
+            ref.status = "Successful"
+            ref.booking_id = booking_code
+            ref.updated_at = now
+            stats["matched"] += 1
+
+    if stats["matched"]:
+        db.commit()
+        logger.info(f"Referral reconciliation: {stats}")
+    return stats
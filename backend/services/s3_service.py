@@ -1,21 +1,147 @@
 
 import boto3
 from botocore.exceptions import ClientError
+import hashlib
+import hmac
 import logging
-import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+from urllib.parse import quote, urlparse
 from config import get_settings
+from services.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+settings = get_settings()
+
+# One boto3 client per process: building it resolves credentials and loads the
+# botocore service model, which costs tens of milliseconds. Clients are thread-safe.
+_client = None
+_client_lock = threading.Lock()
+
+# object key -> (expiration, presigned URL), reused until a safety margin before it expires.
+# A re-uploaded object keeps its key, so a cached URL serves the new content too.
+_presigned_urls = TTLCache(maxsize=settings.presigned_url_cache_size)
+
+# (access key, date, region) -> SigV4 signing key. The key only changes with the UTC
+# date, so the four chained HMACs are derived once a day instead of once per URL.
+_signing_keys = TTLCache(maxsize=8)
+
+_stats_lock = threading.Lock()
+_s3_stats = {
+    "clients_created": 0,
+    "client_init_ms": 0.0,
+    "urls_signed": 0,
+    "urls_reused": 0,
+    "sign_ms_total": 0.0,
+    "signing_keys_derived": 0,
+}
+
+
+def get_s3_client():
+    """The process-wide S3 client, created on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                started = time.perf_counter()
+                _client = boto3.client(
+                    's3',
+                    aws_access_key_id=settings.my_aws_access_key_id,
+                    aws_secret_access_key=settings.my_aws_secret_access_key,
+                    region_name=settings.my_aws_region
+                )
+                with _stats_lock:
+                    _s3_stats["clients_created"] += 1
+                    _s3_stats["client_init_ms"] += (time.perf_counter() - started) * 1000
+    return _client
+
+
+def get_s3_stats() -> dict:
+    """Client construction and signing counters for the metrics endpoint."""
+    with _stats_lock:
+        stats = dict(_s3_stats)
+    signed = stats["urls_signed"]
+    stats["avg_sign_ms"] = round(stats["sign_ms_total"] / signed, 3) if signed else 0.0
+    stats["client_init_ms"] = round(stats["client_init_ms"], 2)
+    stats["sign_ms_total"] = round(stats["sign_ms_total"], 2)
+    stats["url_cache"] = _presigned_urls.stats()
+    return stats
+
+
+def s3_key_from_url(pdf_url: str) -> str:
+    """
+    Object key for a stored PDF URL. The DB keeps the full
+    https://BUCKET.s3.REGION.amazonaws.com/KEY form; bare keys pass through.
+    """
+    if pdf_url.startswith("http"):
+        try:
+            # path is "/contracts/..." -> strip leading slash
+            return urlparse(pdf_url).path.lstrip('/')
+        except Exception:
+            pass
+    return pdf_url
+
+
+def _hmac(key: bytes, msg: str) -> bytes:
+    return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
+
+
+def _signing_key(secret_key: str, access_key: str, date_stamp: str, region: str) -> bytes:
+    cache_key = (access_key, date_stamp, region)
+    key = _signing_keys.get(cache_key)
+    if key is None:
+        key = _hmac(("AWS4" + secret_key).encode("utf-8"), date_stamp)
+        for part in (region, "s3", "aws4_request"):
+            key = _hmac(key, part)
+        _signing_keys.set(cache_key, key)
+        with _stats_lock:
+            _s3_stats["signing_keys_derived"] += 1
+    return key
+
+
+def presign_get_urls(bucket: str, object_names: Iterable[str], expiration: int,
+                     signed_at: Optional[datetime] = None) -> Dict[str, str]:
+    """
+    SigV4 query-string presigning for GET (same URLs boto3 builds with
+    signature_version="s3v4"), done locally for a whole batch: one
+    timestamp and one cached signing key, then a single HMAC per object.
+    """
+    signed_at = signed_at or datetime.now(timezone.utc)
+    amz_date = signed_at.strftime("%Y%m%dT%H%M%SZ")
+    date_stamp = amz_date[:8]
+    region = settings.my_aws_region
+    access_key = settings.my_aws_access_key_id
+    scope = f"{date_stamp}/{region}/s3/aws4_request"
+    signing_key = _signing_key(settings.my_aws_secret_access_key, access_key, date_stamp, region)
+
+    # us-east-1 uses the global endpoint, like boto3
+    host = f"{bucket}.s3.amazonaws.com" if region == "us-east-1" else f"{bucket}.s3.{region}.amazonaws.com"
+    query = "&".join(f"{name}={quote(value, safe='-_.~')}" for name, value in (
+        ("X-Amz-Algorithm", "AWS4-HMAC-SHA256"),
+        ("X-Amz-Credential", f"{access_key}/{scope}"),
+        ("X-Amz-Date", amz_date),
+        ("X-Amz-Expires", str(expiration)),
+        ("X-Amz-SignedHeaders", "host"),
+    ))
+
+    urls = {}
+    for object_name in object_names:
+        path = "/" + quote(object_name, safe="/-_.~")
+        canonical_request = f"GET\n{path}\n{query}\nhost:{host}\n\nhost\nUNSIGNED-PAYLOAD"
+        string_to_sign = (f"AWS4-HMAC-SHA256\n{amz_date}\n{scope}\n"
+                          f"{hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()}")
+        signature = hmac.new(signing_key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+        urls[object_name] = f"https://{host}{path}?{query}&X-Amz-Signature={signature}"
+    return urls
+
+
 class S3Service:
     def __init__(self):
-        self.settings = get_settings()
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=self.settings.my_aws_access_key_id,
-            aws_secret_access_key=self.settings.my_aws_secret_access_key,
-            region_name=self.settings.my_aws_region
-        )
+        self.settings = settings
+        self.s3_client = get_s3_client()
         self.bucket_name = self.settings.my_aws_bucket_name
 
     def upload_file(self, file_content, object_name, content_type="application/pdf"):
@@ -42,17 +168,46 @@ class S3Service:
             return None
 
     def generate_presigned_url(self, object_name, expiration=3600):
-        """Generate a presigned URL to share an S3 object"""
+        """
+        Generate a presigned URL to share an S3 object.
+        A URL signed earlier is returned again until it is within
+        `presigned_url_refresh_margin_seconds` of expiring.
+        """
+        return self.generate_presigned_urls([object_name], expiration).get(object_name)
+
+    def generate_presigned_urls(self, object_names, expiration=3600):
+        """
+        Presigned GET URLs for several objects, as {object_name: url}.
+        Cached URLs are reused; the rest are signed together (see presign_get_urls).
+        """
         if not self.bucket_name:
             logger.error("MY_AWS_BUCKET_NAME is not set")
-            return None
+            return {}
 
-        try:
-            response = self.s3_client.generate_presigned_url('get_object',
-                                                             Params={'Bucket': self.bucket_name,
-                                                                     'Key': object_name},
-                                                             ExpiresIn=expiration)
-            return response
-        except ClientError as e:
-            logger.error(f"S3 Presigned URL Error: {e}")
-            return None
+        urls = {}
+        to_sign = []
+        for object_name in dict.fromkeys(object_names):
+            cached = _presigned_urls.get(object_name)
+            if cached is not None and cached[0] == expiration:
+                urls[object_name] = cached[1]
+            else:
+                to_sign.append(object_name)
+        if urls:
+            with _stats_lock:
+                _s3_stats["urls_reused"] += len(urls)
+        if not to_sign:
+            return urls
+
+        signed_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        signed = presign_get_urls(self.bucket_name, to_sign, expiration, signed_at)
+        with _stats_lock:
+            _s3_stats["urls_signed"] += len(signed)
+            _s3_stats["sign_ms_total"] += (time.perf_counter() - started) * 1000
+
+        reuse_until = signed_at.timestamp() + expiration - self.settings.presigned_url_refresh_margin_seconds
+        for object_name, url in signed.items():
+            if reuse_until > signed_at.timestamp():
+                _presigned_urls.set(object_name, (expiration, url), expires_at=reuse_until)
+            urls[object_name] = url
+        return urls
@@ -10,13 +10,8 @@ Email subject format:
 """
 
 import imaplib
-import email
-from email import policy
 import re
-import ssl
 import logging
-import os
-import json
 from datetime import datetime
 from email.utils import parsedate_to_datetime
 from typing import Optional
@@ -27,6 +22,11 @@ from config import get_settings
 from models.ticket import TenantServiceTicket
 from models.notification import Notification
 from services.websocket_manager import manager
+from services.imap_fetch import (
+    CONNECTION_ERRORS, SENT_FOLDERS, any_of, connect_imap, iter_headers, iter_messages, search_new_uids,
+    select_folder
+)
+from services.imap_checkpoints import get_last_uid, next_checkpoint, save_checkpoint
 
 logger = logging.getLogger(__name__)
 
@@ -42,30 +42,13 @@ ISSUE_CLOSED_PATTERN = re.compile(r'Issue\s+Closed', re.IGNORECASE)
 # Regex to extract booking ID: K followed by alphanumeric (8-20 chars)
 BOOKING_ID_PATTERN = re.compile(r'(K[0-9A-Z]{8,20})')
 
-# File to persist last ticket sync date
-LAST_TICKET_SYNC_FILE = os.path.join(os.path.dirname(__file__), '..', '.last_ticket_sync')
+# Server-side prefilters for the patterns above (IMAP SUBJECT is a
+# case-insensitive substring match); the regexes still decide per message
+TICKET_SEARCH = 'SUBJECT "##"'
+CLOSURE_SEARCH = 'SUBJECT "Issue Closed"'
 
-
-def _get_last_ticket_sync_date() -> Optional[str]:
-    """Get the last sync date in DD-Mon-YYYY format for IMAP SINCE query."""
-    try:
-        if os.path.exists(LAST_TICKET_SYNC_FILE):
-            with open(LAST_TICKET_SYNC_FILE, 'r') as f:
-                data = json.load(f)
-                return data.get('last_sync_date')
-    except Exception as e:
-        logger.warning(f"Could not read last ticket sync file: {e}")
-    return None
-
-
-def _save_last_ticket_sync_date():
-    """Save today's date as the last sync date."""
-    try:
-        today = datetime.now().strftime('%d-%b-%Y')
-        with open(LAST_TICKET_SYNC_FILE, 'w') as f:
-            json.dump({'last_sync_date': today, 'updated_at': datetime.now().isoformat()}, f)
-    except Exception as e:
-        logger.warning(f"Could not save last ticket sync file: {e}")
+# imap_sync_state.sync_name for this job's folder checkpoints
+SYNC_NAME = "tickets"
 
 
 def _extract_ticket_number(subject: str) -> Optional[str]:
@@ -118,27 +101,12 @@ def _parse_subject(subject: str) -> dict:
     return result
 
 
-def _connect_imap(settings):
-    """Create a fresh IMAP connection."""
-    mail = imaplib.IMAP4_SSL(settings.email_host, settings.email_port)
-    mail.login(settings.email_user, settings.email_password)
-    return mail
-
-
-def _process_ticket_email(mail, eid, existing_ticket_nos, db, stats):
+def _process_ticket_email(headers, existing_ticket_nos, db, stats):
     """
-    Fetch and process a single ticket email.
-    Returns True if successful, False on error.
+    Process a single ticket email. Everything needed is in the Subject, so
+    this works on the fetched headers alone - the body is never downloaded.
     """
-    status, msg_data = mail.fetch(eid, "(RFC822)")
-    if status != "OK":
-        stats["errors"] += 1
-        return True
-
-    raw_email = msg_data[0][1]
-    msg = email.message_from_bytes(raw_email, policy=policy.default)
-
-    subject = msg.get("Subject", "") or ""
+    subject = headers.get("Subject", "") or ""
 
     # Only process emails that have a ticket number pattern ## NUMBER ##
     ticket_number = _extract_ticket_number(subject)
@@ -208,28 +176,23 @@ def _process_ticket_email(mail, eid, existing_ticket_nos, db, stats):
     return True
 
 
-def _process_closure_email(mail, eid, db, closure_stats):
+def _find_closure_ticket(headers, db, closure_stats):
     """
-    Check if an email is an 'Issue Closed' notification.
-    If so, find the ticket in DB and mark it as Closed.
+    Check if an email is an 'Issue Closed' notification for a ticket that is
+    still open, from its headers. Returns (ticket, ticket_number) or None -
+    only then is the full message (for the resolution text) downloaded.
     """
-    status, msg_data = mail.fetch(eid, "(RFC822)")
-    if status != "OK":
-        return True
-
-    raw_email = msg_data[0][1]
-    msg = email.message_from_bytes(raw_email, policy=policy.default)
-    subject = msg.get("Subject", "") or ""
+    subject = headers.get("Subject", "") or ""
 
     # Only process emails with "Issue Closed" in subject
     if not ISSUE_CLOSED_PATTERN.search(subject):
-        return True
+        return None
 
     # Extract ticket number from "Ticket no XXXXX"
     match = CLOSURE_TICKET_PATTERN.search(subject)
     if not match:
         print(f"  [CLOSE-SKIP] No ticket number in: {subject[:80]}")
-        return True
+        return None
 
     ticket_number = match.group(1)
 
@@ -240,12 +203,24 @@ def _process_closure_email(mail, eid, db, closure_stats):
 
     if not ticket:
         print(f"  [CLOSE-SKIP] Ticket #{ticket_number} not found in DB")
-        return True
+        return None
+
+    if ticket.status == 'Closed':
+        closure_stats['already_closed'] += 1
+        return None
+
+    return ticket, ticket_number
 
+
+def _process_closure_email(msg, ticket, ticket_number, db, closure_stats):
+    """Mark the ticket Closed with the resolution text from the full email."""
+    # An earlier email in this run may have closed it already
     if ticket.status == 'Closed':
         closure_stats['already_closed'] += 1
         return True
 
+    subject = msg.get("Subject", "") or ""
+
     # Extract the email body text
     body = ""
     if msg.is_multipart():
@@ -323,22 +298,28 @@ def sync_ticket_emails(db: Session) -> dict:
     """
     Connect to IMAP, read Sent folder for ticket emails,
     extract ticket numbers from subjects, and store in tenant_service_tickets.
-    Only processes new emails since the last sync.
-    Skips duplicates using email_message_id.
+    Closure emails ("Issue Closed - Ticket no N") mark tickets Closed.
+    Each folder is scanned once for both: the server only returns messages
+    above the folder's UID checkpoint (imap_sync_state) whose subject looks
+    like either kind, and each header is routed to the matching handler.
+    Skips duplicates by ticket number.
     """
     settings = get_settings()
-    stats = {"fetched": 0, "new": 0, "skipped": 0, "errors": 0}
+    stats = {"fetched": 0, "new": 0, "skipped": 0, "errors": 0, "bytes_received": 0, "bytes_sent": 0}
     closure_stats = {"fetched": 0, "closed": 0, "already_closed": 0}
+    search_criteria = any_of(TICKET_SEARCH, CLOSURE_SEARCH)
 
-    try:
-        mail = _connect_imap(settings)
+    def reconnect():
+        """New connection on the folder being scanned (for iter_headers / iter_messages)."""
+        nonlocal mail
+        logger.warning(f"IMAP connection lost in {folder_name}, reconnecting")
+        stats["errors"] += 1
+        mail = connect_imap(settings, stats)
+        select_folder(mail, folder_name)
+        return mail
 
-        # =============================================
-        # PHASE 1: Scan Sent folder for NEW tickets
-        # =============================================
-        print("  --- Phase 1: New Ticket Detection (Sent folder) ---")
-        folders_to_search = ['"Sent"', '"Sent Items"', '"[Gmail]/Sent Mail"', 'Sent']
-        processed_folders = set()
+    try:
+        mail = connect_imap(settings, stats)
 
         # Get existing ticket numbers from DB to avoid duplicates
         existing_ticket_nos = set()
@@ -350,128 +331,86 @@ def sync_ticket_emails(db: Session) -> dict:
                 existing_ticket_nos.add(record.ticket_number)
         print(f"  Existing tickets in DB: {len(existing_ticket_nos)}")
 
-        # Get last sync date for incremental processing
-        last_sync_date = _get_last_ticket_sync_date()
-        if last_sync_date:
-            search_criteria = f'(SINCE {last_sync_date})'
-            print(f"  Ticket sync: fetching emails since {last_sync_date}")
-        else:
-            search_criteria = "ALL"
-            print("  Ticket sync: first sync, fetching ALL emails")
-
-        for folder_name in folders_to_search:
+        for folder_name in SENT_FOLDERS:
             try:
-                if folder_name in processed_folders:
+                uidvalidity = select_folder(mail, folder_name)
+                if uidvalidity is None:
                     continue
 
-                status, _ = mail.select(folder_name)
-                if status != "OK":
-                    continue
+                last_uid = get_last_uid(db, SYNC_NAME, settings.email_user, folder_name, uidvalidity)
+                print(f"  Scanning folder: {folder_name} (UIDs after {last_uid})")
 
-                processed_folders.add(folder_name)
-                print(f"  Scanning folder: {folder_name}")
-
-                status, data = mail.search(None, search_criteria)
-                if status != "OK" or not data[0]:
-                    print(f"  No emails found in {folder_name}")
-                    continue
-
-                email_ids = data[0].split()
+                email_ids = search_new_uids(mail, last_uid, search_criteria)
                 if not email_ids:
+                    print(f"  No new ticket or closure emails in {folder_name}")
                     continue
 
-                print(f"  Found {len(email_ids)} emails in {folder_name}")
+                print(f"  Found {len(email_ids)} ticket/closure emails in {folder_name}")
                 stats["fetched"] += len(email_ids)
 
-                # Process newest first
-                email_ids = email_ids[::-1]
-
-                for eid in email_ids:
-                    try:
-                        _process_ticket_email(mail, eid, existing_ticket_nos, db, stats)
-                    except (ssl.SSLError, imaplib.IMAP4.abort, ConnectionError, OSError) as e:
-                        logger.warning(f"Connection error on email {eid}, reconnecting: {e}")
-                        stats["errors"] += 1
+                # Subjects only, in chunks, newest first. Ticket emails never
+                # need their body; closures are collected for after the new
+                # tickets are committed, so a ticket opened and closed between
+                # two runs is found.
+                closure_headers = []
+                failed = []  # retried next run: the checkpoint stays below them
+                try:
+                    for eid, headers in iter_headers(mail, email_ids[::-1], reconnect, missing=failed):
+                        subject = headers.get("Subject", "") or ""
+                        is_closure = ISSUE_CLOSED_PATTERN.search(subject)
+                        if is_closure:
+                            closure_headers.append((eid, headers))
+                        if is_closure and not TICKET_NUMBER_PATTERN.search(subject):
+                            continue
                         try:
-                            mail = _connect_imap(settings)
-                            mail.select(folder_name)
-                            try:
-                                _process_ticket_email(mail, eid, existing_ticket_nos, db, stats)
-                            except Exception:
-                                logger.warning(f"Skipping email {eid} after reconnect retry")
-                                stats["errors"] += 1
-                        except Exception as reconnect_err:
-                            logger.error(f"Failed to reconnect: {reconnect_err}")
-                            db.commit()
-                            return {"error": f"Connection lost: {str(e)}", **stats}
+                            _process_ticket_email(headers, existing_ticket_nos, db, stats)
+                        except Exception as e:
+                            logger.error(f"Error processing ticket email {eid}: {e}")
+                            stats["errors"] += 1
+                            failed.append(eid)
+                            continue
+                except CONNECTION_ERRORS as e:
+                    logger.error(f"Failed to reconnect: {e}")
+                    db.commit()
+                    return {"error": f"Connection lost: {str(e)}", **stats}
+
+                db.commit()
+
+                # Full emails (for the resolution text) only for tickets still open
+                closure_stats['fetched'] += len(closure_headers)
+                to_close = {}
+                for eid, headers in closure_headers:
+                    found = _find_closure_ticket(headers, db, closure_stats)
+                    if found:
+                        to_close[eid] = found
+
+                for eid, msg in iter_messages(mail, list(to_close), reconnect, missing=failed):
+                    try:
+                        _process_closure_email(msg, *to_close[eid], db, closure_stats)
                     except Exception as e:
-                        logger.error(f"Error processing ticket email {eid}: {e}")
+                        logger.error(f"Error processing closure email {eid}: {e}")
                         stats["errors"] += 1
-                        continue
+                        failed.append(eid)
+
+                # Both kinds are done with these UIDs, up to the first failure
+                last_uid = next_checkpoint(email_ids, failed)
+                if failed:
+                    print(f"  {len(failed)} emails in {folder_name} failed; retrying from UID {last_uid + 1} next run")
+                save_checkpoint(db, SYNC_NAME, settings.email_user, folder_name, uidvalidity, last_uid)
+                db.commit()
 
             except Exception as e:
                 logger.error(f"Error accessing folder {folder_name}: {e}")
+                db.rollback()
                 continue
 
-        db.commit()
-
-        # =============================================
-        # PHASE 2: Scan ALL folders for CLOSURE emails
-        # =============================================
-        print("  --- Phase 2: Ticket Closure Detection (Sent folder) ---")
-        closure_folders = ['"Sent"', '"Sent Items"', '"[Gmail]/Sent Mail"', 'Sent']
-        scanned_closure_folders = set()
-
-        for folder_name in closure_folders:
-            try:
-                if folder_name in scanned_closure_folders:
-                    continue
-
-                status, _ = mail.select(folder_name)
-                if status != "OK":
-                    continue
-
-                scanned_closure_folders.add(folder_name)
-
-                status, data = mail.search(None, search_criteria)
-                if status != "OK" or not data[0]:
-                    continue
-
-                folder_ids = data[0].split()
-                print(f"  Scanning {folder_name} for closures: {len(folder_ids)} emails")
-                closure_stats['fetched'] += len(folder_ids)
-
-                # Process newest first
-                folder_ids = folder_ids[::-1]
-
-                for eid in folder_ids:
-                    try:
-                        _process_closure_email(mail, eid, db, closure_stats)
-                    except (ssl.SSLError, imaplib.IMAP4.abort, ConnectionError, OSError) as e:
-                        logger.warning(f"Connection error on closure email {eid}: {e}")
-                        try:
-                            mail = _connect_imap(settings)
-                            mail.select(folder_name)
-                            _process_closure_email(mail, eid, db, closure_stats)
-                        except Exception:
-                            pass
-                    except Exception as e:
-                        logger.error(f"Error processing closure email {eid}: {e}")
-
-            except Exception as e:
-                logger.error(f"Error scanning {folder_name} for closures: {e}")
-
-        db.commit()
-
         try:
             mail.close()
             mail.logout()
         except Exception:
             pass
 
-        # Save sync date for next run
-        _save_last_ticket_sync_date()
-
+        print(f"  IMAP transfer: {stats['bytes_received']} bytes received, {stats['bytes_sent']} sent")
         print(f"  New tickets: {stats}")
         print(f"  Closures:    {closure_stats}")
         print(f"{'='*60}")
@@ -485,4 +424,5 @@ def sync_ticket_emails(db: Session) -> dict:
         db.rollback()
         return {"error": str(e), **stats}
 
-    return {**stats, **closure_stats}
+    # closure_stats["fetched"] counts closure candidates only; the run's total wins
+    return {**closure_stats, **stats}
@@ -0,0 +1,112 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from database import Base, get_async_read_db
+from main import app
+from models.booking import FlatBookingOrder
+from models.contract_document import ContractDocument
+from models.tenant_invoice import TenantInvoice
+from routes import access_urls
+from schemas.access_url import MAX_ACCESS_URL_BATCH
+from services.auth_service import create_session_token
+
+BUCKET_URL = "https://kots-test-bucket.s3.ap-south-1.amazonaws.com"
+
+
+class _StubS3:
+    """Signs every key except unsignable/*, and records each batch asked for."""
+    batches = []
+
+    def generate_presigned_urls(self, object_names, expiration=3600):
+        keys = list(object_names)
+        self.batches.append(keys)
+        return {key: f"https://signed.example/{key}?X-Amz-Expires={expiration}"
+                for key in keys if not key.startswith("unsignable/")}
+
+
+def test_access_urls():
+    print("Testing POST /api/access-urls...")
+    engine = create_async_engine("sqlite+aiosqlite://")
+    TestSession = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with TestSession() as db:
+            db.add_all([
+                FlatBookingOrder(id=1, flat_booking_order_code="K05B40URL01", tenant_phone_number="9123456786"),
+                FlatBookingOrder(id=2, flat_booking_order_code="K00OTHER01", tenant_phone_number="9000000000"),
+            ])
+            db.add_all([
+                ContractDocument(id=1, booking_id="K05B40URL01", document_category="SIGNED", document_title="Lease",
+                                 pdf_url=f"{BUCKET_URL}/contracts/K05B40URL01/lease.pdf"),
+                ContractDocument(id=2, booking_id="K05B40URL01", document_category="SIGN_REQUEST",
+                                 document_title="Sign"),  # no PDF
+                ContractDocument(id=3, booking_id="K00OTHER01", document_category="SIGNED", document_title="Lease",
+                                 pdf_url=f"{BUCKET_URL}/contracts/K00OTHER01/lease.pdf"),
+                ContractDocument(id=4, booking_id="K05B40URL01", document_category="CIR", document_title="CIR",
+                                 pdf_url="unsignable/cir.pdf"),
+            ])
+            db.add_all([
+                TenantInvoice(id=1, booking_id="K05B40URL01", status="Sent", pdf_url="invoices/INV-1.pdf"),
+                TenantInvoice(id=2, booking_id="K00OTHER01", status="Sent", pdf_url="invoices/INV-2.pdf"),
+            ])
+            await db.commit()
+
+    async def override_get_async_read_db():
+        async with TestSession() as db:
+            yield db
+
+    asyncio.run(setup())
+    app.dependency_overrides[get_async_read_db] = override_get_async_read_db
+    _StubS3.batches = []
+    try:
+        client = TestClient(app)
+        headers = {"Authorization": f"Bearer {create_session_token('9123456786')}"}
+        params = {"booking_id": "K05B40URL01"}
+
+        with patch.object(access_urls, "S3Service", _StubS3):
+            # Documents and invoices in one request, one query, one signing batch
+            res = client.post("/api/access-urls", params=params, headers=headers,
+                              json={"document_ids": [1, 2, 3, 4, 1, 99], "invoice_ids": [1, 2]})
+            print(f"Mixed batch: {res.status_code} {res.text[:120]}")
+            assert res.status_code == 200
+            body = res.json()
+            assert body["documents"] == {"1": "https://signed.example/contracts/K05B40URL01/lease.pdf?X-Amz-Expires=3600"}
+            assert body["invoices"] == {"1": "https://signed.example/invoices/INV-1.pdf?X-Amz-Expires=3600"}
+            # No PDF, another booking's row, unknown ID, failed signature -> missing (deduplicated)
+            assert body["missing_document_ids"] == [2, 3, 4, 99]
+            assert body["missing_invoice_ids"] == [2]
+            assert _StubS3.batches == [["contracts/K05B40URL01/lease.pdf", "unsignable/cir.pdf", "invoices/INV-1.pdf"]]
+
+            # Only one kind asked for
+            res = client.post("/api/access-urls", params=params, headers=headers, json={"invoice_ids": [1]})
+            assert list(res.json()["invoices"]) == ["1"] and res.json()["documents"] == {}
+
+            # Another tenant's booking is refused outright
+            res = client.post("/api/access-urls", params={"booking_id": "K00OTHER01"}, headers=headers,
+                              json={"document_ids": [3]})
+            assert res.status_code == 403
+
+            # Oversize batches are rejected before any query; duplicates don't count
+            res = client.post("/api/access-urls", params=params, headers=headers,
+                              json={"document_ids": list(range(1, MAX_ACCESS_URL_BATCH + 1)), "invoice_ids": [1]})
+            assert res.status_code == 400
+            res = client.post("/api/access-urls", params=params, headers=headers,
+                              json={"document_ids": [1] * (MAX_ACCESS_URL_BATCH + 1)})
+            assert res.status_code == 200
+    finally:
+        app.dependency_overrides.pop(get_async_read_db, None)
+        asyncio.run(engine.dispose())
+    print("✅ Access URLs Test Passed!")
+
+
+if __name__ == "__main__":
+    test_access_urls()
@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from database import Base, get_async_db, get_async_read_db
+from main import app
+from models.booking import FlatBookingOrder
+from models.notification import Notification
+from services.auth_service import create_session_token
+
+
+def test_async_routes_on_sqlite():
+    print("Testing async routes against an SQLite stand-in...")
+    engine = create_async_engine("sqlite+aiosqlite://")
+    TestSession = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with TestSession() as db:
+            db.add(FlatBookingOrder(id=1, flat_booking_order_code="K05B40TEST1", tenant_phone_number="9123456780"))
+            db.add(Notification(booking_id="K05B40TEST1", notification_type="System Message", message="Hello"))
+            await db.commit()
+
+    async def override_get_async_db():
+        async with TestSession() as db:
+            yield db
+
+    asyncio.run(setup())
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
+    try:
+        client = TestClient(app)
+        headers = {"Authorization": f"Bearer {create_session_token('9123456780')}"}
+
+        res = client.get("/api/notifications", params={"booking_id": "K05B40TEST1"}, headers=headers)
+        print(f"Own booking: {res.status_code} {res.text[:80]}")
+        assert res.status_code == 200
+        assert res.json()["notifications"][0]["message"] == "Hello"
+
+        res = client.get("/api/notifications", params={"booking_id": "K00OTHER01"}, headers=headers)
+        print(f"Foreign booking: {res.status_code}")
+        assert res.status_code == 403
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        app.dependency_overrides.pop(get_async_read_db, None)
+    print("✅ Async DB Test Passed!")
+
+
+if __name__ == "__main__":
+    test_async_routes_on_sqlite()
@@ -0,0 +1,66 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from database import Base, RoutingSession
+from models.booking import FlatBookingOrder
+from services.booking_ownership import get_owned_booking_codes, invalidate_booking_ownership, owns_booking
+
+PHONE = "+91 91234 56784"
+
+
+def test_ownership_rechecks_primary():
+    print("Testing booking ownership against a lagging replica...")
+    invalidate_booking_ownership()
+    folder = tempfile.mkdtemp()
+    primary = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(folder, 'primary.db')}")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(folder, 'replica.db')}")
+    ReadSession = async_sessionmaker(class_=AsyncSession, sync_session_class=RoutingSession,
+                                     primary=primary.sync_engine, replica=replica.sync_engine,
+                                     expire_on_commit=False)
+
+    async def add_booking(eng, code):
+        async with async_sessionmaker(eng)() as db:
+            db.add(FlatBookingOrder(flat_booking_order_code=code, tenant_phone_number=PHONE))
+            await db.commit()
+
+    async def run():
+        for eng in (primary, replica):
+            async with eng.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+        # Written by another system; the replica hasn't caught up yet
+        await add_booking(primary, "K05B40OWN01")
+        async with ReadSession() as db:
+            # Empty results aren't cached...
+            assert await get_owned_booking_codes(db, PHONE) == frozenset()
+            # ...and a miss is confirmed on the primary before it is denied
+            assert await owns_booking(db, PHONE, "k05b40own01")
+            assert not await owns_booking(db, PHONE, "K00OTHER01")
+
+        # A second booking after the first was cached is found the same way
+        await add_booking(replica, "K05B40OWN01")
+        await add_booking(primary, "K05B40OWN02")
+        async with ReadSession() as db:
+            assert await get_owned_booking_codes(db, PHONE) == {"K05B40OWN01"}
+            assert await owns_booking(db, PHONE, "K05B40OWN02")
+            assert await get_owned_booking_codes(db, PHONE) == {"K05B40OWN01", "K05B40OWN02"}
+
+        await primary.dispose()
+        await replica.dispose()
+
+    try:
+        asyncio.run(run())
+    finally:
+        invalidate_booking_ownership()
+    print("✅ Booking Ownership Test Passed!")
+
+
+if __name__ == "__main__":
+    test_ownership_rechecks_primary()
@@ -0,0 +1,49 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models.booking import FlatBookingOrder
+from services.booking_resolver import BookingResolver, booking_resolver
+
+
+def test_booking_resolver_cache():
+    print("Testing booking resolver...")
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    resolver = BookingResolver(maxsize=10, ttl=60)
+    with sessionmaker(bind=engine)() as db:
+        db.add(FlatBookingOrder(flat_booking_order_code="K0RESOLVE1", dummy_order_code="D0RESOLVE1",
+                                flat_id=7, tenant_phone_number="+91 98765 43210", status="Active"))
+        db.commit()
+        statements.clear()
+
+        booking = resolver.resolve(db, "k0resolve1")
+        assert booking.flat_id == 7
+        assert booking.dummy_order_code == "D0RESOLVE1"
+        assert resolver.resolve(db, "K0RESOLVE1") == booking
+        assert len(statements) == 1, "second lookup should be served from the cache"
+
+        # Dummy code falls back to the same booking
+        assert resolver.resolve(db, "D0RESOLVE1").flat_booking_order_code == "K0RESOLVE1"
+        assert resolver.resolve(db, "K0MISSING") is None
+
+        # Stored codes in mixed case still resolve from any casing (as the old ILIKE did)
+        db.add(FlatBookingOrder(flat_booking_order_code="K15a4032411202", dummy_order_code="d0mixed1", flat_id=9))
+        db.commit()
+        assert resolver.resolve(db, "K15A4032411202").flat_id == 9
+        assert resolver.resolve(db, "D0MIXED1").flat_booking_order_code == "K15a4032411202"
+
+        # Writes through the ORM drop the shared resolver's entries
+        booking_resolver.resolve(db, "K0RESOLVE1")
+        row = db.query(FlatBookingOrder).first()
+        row.flat_id = 8
+        db.commit()
+        assert booking_resolver.resolve(db, "K0RESOLVE1").flat_id == 8
+    print("✅ Booking Resolver Test Passed!")
+
+
+if __name__ == "__main__":
+    test_booking_resolver_cache()
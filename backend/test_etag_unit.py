@@ -0,0 +1,147 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+
+from services.etag import etag_matches, make_etag
+
+
+def _request(path="/api/notifications", query="booking_id=K0ETAG01", if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": path,
+                    "query_string": query.encode(), "headers": headers})
+
+
+def test_etag_matching():
+    print("Testing ETag helpers...")
+    etag = make_etag(_request(), (3, "2025-01-01 00:00:00"))
+    assert etag.startswith('W/"')
+    assert etag == make_etag(_request(), (3, "2025-01-01 00:00:00"))
+    # New row, other booking or other route -> different tag
+    assert etag != make_etag(_request(), (4, "2025-01-01 00:00:00"))
+    assert etag != make_etag(_request(query="booking_id=K0ETAG02"), (3, "2025-01-01 00:00:00"))
+    assert etag != make_etag(_request(path="/api/invoices"), (3, "2025-01-01 00:00:00"))
+
+    assert not etag_matches(_request(), etag)
+    assert etag_matches(_request(if_none_match=etag), etag)
+    assert etag_matches(_request(if_none_match=f'"other", {etag.removeprefix("W/")}'), etag)
+    assert etag_matches(_request(if_none_match="*"), etag)
+    assert not etag_matches(_request(if_none_match='W/"stale"'), etag)
+    print("✅ ETag Test Passed!")
+
+
+def test_contract_documents_etag_moves_on_title_backfill():
+    print("Testing contract documents ETag after an in-place title rewrite...")
+    pytest.importorskip("aiosqlite")
+    from fastapi.testclient import TestClient
+    from database import Base, get_async_read_db
+    from main import app
+    from models.booking import FlatBookingOrder
+    from models.contract_document import ContractDocument
+    from services.auth_service import create_session_token
+    from services.document_titles import backfill_display_titles
+
+    path = os.path.join(tempfile.mkdtemp(), "etag.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=[FlatBookingOrder.__table__, ContractDocument.__table__])
+    with Session(engine) as db:
+        db.add(FlatBookingOrder(id=1, flat_booking_order_code="K05B40ETAG1", tenant_phone_number="9123456782"))
+        db.add(ContractDocument(id=1, booking_id="K05B40ETAG1", document_category="SIGN_REQUEST",
+                                document_title="Kots requests you to sign :: Rental Agreement :: K05B40ETAG1",
+                                display_title="stale title", sign_url="https://sign.example/1"))
+        db.commit()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    TestSession = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_get_async_read_db():
+        async with TestSession() as db:
+            yield db
+
+    app.dependency_overrides[get_async_read_db] = override_get_async_read_db
+    try:
+        client = TestClient(app)
+        headers = {"Authorization": f"Bearer {create_session_token('9123456782')}"}
+        params = {"booking_id": "K05B40ETAG1"}
+
+        res = client.get("/api/contract-documents", params=params, headers=headers)
+        assert res.json()["sign_requests"][0]["document_title"] == "stale title"
+        etag = res.headers["etag"]
+        res = client.get("/api/contract-documents", params=params, headers={**headers, "If-None-Match": etag})
+        assert res.status_code == 304
+
+        # Same row count and ids, but the titles are rewritten in place
+        backfill_display_titles(engine, recompute=True)
+        res = client.get("/api/contract-documents", params=params, headers={**headers, "If-None-Match": etag})
+        assert res.status_code == 200
+        assert res.json()["sign_requests"][0]["document_title"] != "stale title"
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT document_category FROM contract_documents")).scalar() == "SIGN_REQUEST"
+    finally:
+        app.dependency_overrides.pop(get_async_read_db, None)
+        asyncio.run(async_engine.dispose())
+        engine.dispose()
+    print("✅ Contract Documents ETag Test Passed!")
+
+
+def test_ticket_etag_moves_on_external_status_change():
+    print("Testing ticket list ETag after a status change outside the ORM...")
+    pytest.importorskip("aiosqlite")
+    from fastapi.testclient import TestClient
+    from database import Base, get_async_read_db
+    from main import app
+    from models.booking import FlatBookingOrder
+    from models.ticket import TenantServiceTicket
+    from services.auth_service import create_session_token
+
+    path = os.path.join(tempfile.mkdtemp(), "etag.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=[FlatBookingOrder.__table__, TenantServiceTicket.__table__])
+    with Session(engine) as db:
+        db.add(FlatBookingOrder(id=1, flat_booking_order_code="K05B40ETAG2", tenant_phone_number="9123456787"))
+        db.add_all([
+            TenantServiceTicket(id=1, booking_id="K05B40ETAG2", ticket_number="1", status="Open"),
+            TenantServiceTicket(id=2, booking_id="K05B40ETAG2", ticket_number="2", status="Open"),
+        ])
+        db.commit()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    TestSession = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_get_async_read_db():
+        async with TestSession() as db:
+            yield db
+
+    app.dependency_overrides[get_async_read_db] = override_get_async_read_db
+    try:
+        client = TestClient(app)
+        headers = {"Authorization": f"Bearer {create_session_token('9123456787')}"}
+
+        res = client.get("/api/tickets/K05B40ETAG2", headers=headers)
+        assert res.status_code == 200, res.text
+        etag = res.headers["etag"]
+        res = client.get("/api/tickets/K05B40ETAG2", headers={**headers, "If-None-Match": etag})
+        assert res.status_code == 304
+
+        # Another system moves a ticket on without touching created_at / final_resolution_at
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE tenant_service_tickets SET status = 'In Progress' WHERE id = 2"))
+        res = client.get("/api/tickets/K05B40ETAG2", headers={**headers, "If-None-Match": etag})
+        assert res.status_code == 200
+        assert {t["ticket_number"]: t["status"] for t in res.json()} == {"1": "Open", "2": "In Progress"}
+    finally:
+        app.dependency_overrides.pop(get_async_read_db, None)
+        asyncio.run(async_engine.dispose())
+        engine.dispose()
+    print("✅ Ticket ETag Test Passed!")
+
+
+if __name__ == "__main__":
+    test_etag_matching()
+    test_contract_documents_etag_moves_on_title_backfill()
+    test_ticket_etag_moves_on_external_status_change()
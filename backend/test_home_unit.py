@@ -0,0 +1,191 @@
+import asyncio
+import os
+import tempfile
+from datetime import date, datetime
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from config import get_settings
+from database import Base, get_async_read_db, get_async_read_sessionmaker
+from main import app
+from models.booking import FlatBookingOrder
+from models.flat import Flat
+from models.kyc import KycDetails
+from models.notification import Notification
+from models.parking import ParkingLock
+from models.tenant_invoice import TenantInvoice
+from models.ticket import TenantServiceTicket
+from routes import home
+from routes.home import HOME_SECTIONS, parse_include
+from services.auth_service import create_session_token
+
+
+def test_parse_include():
+    print("Testing /api/home include= parsing...")
+    assert parse_include(None) == set(HOME_SECTIONS)
+    assert parse_include("") == set(HOME_SECTIONS)
+    assert parse_include(" kyc , flat,,") == {"kyc", "flat"}
+    with pytest.raises(HTTPException) as e:
+        parse_include("kyc,wifi")
+    assert e.value.status_code == 400 and "wifi" in e.value.detail
+    print("✅ Home Include Parsing Test Passed!")
+
+
+def test_home_sections():
+    print("Testing /api/home sections...")
+    # File-backed so the concurrently loaded sections each get their own connection
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'home.db')}")
+    TestSession = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with TestSession() as db:
+            db.add(FlatBookingOrder(id=1, flat_booking_order_code="K05B40HOME1", dummy_order_code="D0HOME1",
+                                    flat_id=31, tenant_phone_number="9123456783", status="Active"))
+            db.add(Flat(id=31, wifi_id="kots-31", wifi_password="secret", max_occupancy="3"))
+            db.add(KycDetails(booking_id="K05B40HOME1", tenant_full_name="Asha R", co1_name="Ravi", co1_phone="1"))
+            db.add(ParkingLock(id=1, property_id=4, flat_customer_reference_id="D0HOME1", parking_notify_me=False,
+                               total_available_parking_slots=2, status="Active"))
+            db.add_all([
+                TenantInvoice(id=1, booking_id="K05B40HOME1", status="Sent", balance="100"),
+                TenantInvoice(id=2, booking_id="K05B40HOME1", status="Paid", balance="0"),
+            ])
+            db.add_all([
+                Notification(booking_id="K05B40HOME1", notification_type="System Message", message=f"n{i}",
+                             notification_date=datetime(2025, 1, i + 1))
+                for i in range(4)
+            ])
+            db.add_all([
+                TenantServiceTicket(id=1, booking_id="K05B40HOME1", ticket_number="1", status="Open"),
+                TenantServiceTicket(id=2, booking_id="K05B40HOME1", ticket_number="2", status="Closed"),
+                TenantServiceTicket(id=3, booking_id="K05B40HOME1", ticket_number="3"),
+            ])
+            await db.commit()
+            # The ORM fills in the "Open" default for None; rows written by other systems can be NULL
+            await db.execute(update(TenantServiceTicket).where(TenantServiceTicket.id == 3).values(status=None))
+            await db.commit()
+
+    async def override_get_async_read_db():
+        async with TestSession() as db:
+            yield db
+
+    asyncio.run(setup())
+    app.dependency_overrides[get_async_read_db] = override_get_async_read_db
+    app.dependency_overrides[get_async_read_sessionmaker] = lambda: TestSession
+    try:
+        client = TestClient(app)
+        headers = {"Authorization": f"Bearer {create_session_token('9123456783')}"}
+
+        res = client.get("/api/home", params={"booking_id": "K05B40HOME1", "notifications_limit": 2},
+                         headers=headers)
+        print(f"All sections: {res.status_code} {res.text[:120]}")
+        assert res.status_code == 200
+        body = res.json()
+        assert body["dummy_order_code"] == "D0HOME1"
+        assert body["kyc"]["tenant_name"] == "Asha R" and len(body["kyc"]["co_occupants"]) == 1
+        assert body["flat"]["wifi_id"] == "kots-31"
+        assert body["parking"]["parking_details"]["total_available_parking_slots"] == 2
+        assert [i["id"] for i in body["pending_invoices"]] == [1]
+        assert [n["message"] for n in body["notifications"]] == ["n3", "n2"]
+        # Tickets with no status are still open
+        assert sorted(t["ticket_number"] for t in body["open_tickets"]) == ["1", "3"]
+
+        res = client.get("/api/home", params={"booking_id": "K05B40HOME1", "include": "flat,open_tickets"},
+                         headers=headers)
+        body = res.json()
+        assert body["flat"]["wifi_id"] == "kots-31" and len(body["open_tickets"]) == 2
+        assert body["kyc"] is None and body["parking"] is None and body["notifications"] is None
+
+        res = client.get("/api/home", params={"booking_id": "K05B40HOME1", "include": "bogus"}, headers=headers)
+        assert res.status_code == 400
+    finally:
+        app.dependency_overrides.pop(get_async_read_db, None)
+        app.dependency_overrides.pop(get_async_read_sessionmaker, None)
+        asyncio.run(engine.dispose())
+    print("✅ Home Sections Test Passed!")
+
+
+def test_home_fanout_cap_and_invoice_cursor():
+    print("Testing /api/home session cap and pending invoice cursor...")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'home.db')}")
+    TestSession = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with TestSession() as db:
+            db.add(FlatBookingOrder(id=1, flat_booking_order_code="K05B40HOME2", dummy_order_code="D0HOME2",
+                                    flat_id=32, tenant_phone_number="9123456785", status="Active"))
+            db.add_all([
+                TenantInvoice(id=i, booking_id="K05B40HOME2", status="Sent", balance="100", due_date=date(2025, 1, i))
+                for i in range(1, 6)
+            ])
+            await db.commit()
+
+    open_sessions = []
+    peak = []
+
+    class CountingSession:
+        """Wraps TestSession() to record how many section sessions are open at once."""
+
+        def __init__(self):
+            self.session = TestSession()
+
+        async def __aenter__(self):
+            open_sessions.append(1)
+            peak.append(len(open_sessions))
+            await asyncio.sleep(0.01)
+            return await self.session.__aenter__()
+
+        async def __aexit__(self, *exc):
+            open_sessions.pop()
+            return await self.session.__aexit__(*exc)
+
+    async def override_get_async_read_db():
+        async with TestSession() as db:
+            yield db
+
+    asyncio.run(setup())
+    app.dependency_overrides[get_async_read_db] = override_get_async_read_db
+    app.dependency_overrides[get_async_read_sessionmaker] = lambda: CountingSession
+    try:
+        client = TestClient(app)
+        headers = {"Authorization": f"Bearer {create_session_token('9123456785')}"}
+        with patch.object(get_settings(), "home_section_concurrency", 2), \
+                patch.object(home, "HOME_PENDING_INVOICES", 3):
+            res = client.get("/api/home", params={"booking_id": "K05B40HOME2"}, headers=headers)
+            assert res.status_code == 200, res.text
+            body = res.json()
+            # All six sections loaded, never more than two sessions at once
+            assert len(peak) == len(HOME_SECTIONS) and max(peak) == 2, peak
+
+            # The card shows three of five and says there are more
+            assert [i["id"] for i in body["pending_invoices"]] == [5, 4, 3]
+            cursor = body["pending_invoices_next_cursor"]
+            assert cursor
+            res = client.get("/api/invoices/pending", params={"booking_id": "K05B40HOME2", "cursor": cursor},
+                             headers=headers)
+            assert [i["id"] for i in res.json()["invoices"]] == [2, 1]
+
+            res = client.get("/api/home", params={"booking_id": "K05B40HOME2", "include": "flat"}, headers=headers)
+            assert res.json()["pending_invoices_next_cursor"] is None
+    finally:
+        app.dependency_overrides.pop(get_async_read_db, None)
+        app.dependency_overrides.pop(get_async_read_sessionmaker, None)
+        asyncio.run(engine.dispose())
+    print("✅ Home Fan-out Cap Test Passed!")
+
+
+if __name__ == "__main__":
+    test_parse_include()
+    test_home_sections()
+    test_home_fanout_cap_and_invoice_cursor()
@@ -0,0 +1,139 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models.imap_sync_state import ImapSyncState
+from services.email_service import _may_need_full_email
+from services.imap_checkpoints import get_last_uid, save_checkpoint
+from services.imap_fetch import (
+    ImapFetchError, any_of, iter_fetch, iter_headers, parse_fetch_response, search_new_uids, uid_set
+)
+
+
+class _StubMail:
+    """Returns a canned FETCH response and records the message sets asked for."""
+
+    def __init__(self, response, status="OK"):
+        self.response = response
+        self.status = status
+        self.fetched = []
+
+    def uid(self, command, *args):
+        self.fetched.append((command, *args))
+        return self.status, self.response
+
+
+def test_header_fetch_parsing():
+    print("Testing header-first IMAP fetch...")
+    response = [
+        (b'3 (BODY[HEADER.FIELDS (SUBJECT MESSAGE-ID DATE FROM TO)] {52}',
+         b"Subject: [## 275482 ##] AC :: K15A4032411202\r\n\r\n"),
+        b")",
+        (b'4 (UID 88 BODY[HEADER.FIELDS (SUBJECT)] {25}', b"Subject: Weekly report\r\n\r\n"),
+        b")",
+    ]
+    assert parse_fetch_response(response) == {b"3": response[0][1], b"88": response[2][1]}
+
+    mail = _StubMail(response)
+    headers = list(iter_headers(mail, [b"88", b"3"]))
+    assert mail.fetched == [("FETCH", "3,88", "(BODY.PEEK[HEADER.FIELDS (SUBJECT MESSAGE-ID DATE FROM TO)])")]
+    # Yielded in the order asked for, not the server's
+    assert [uid for uid, _ in headers] == [b"88", b"3"]
+    assert headers[1][1]["Subject"] == "[## 275482 ##] AC :: K15A4032411202"
+
+    assert uid_set([b"9", b"1", b"2", b"3", b"7", b"10"]) == "1:3,7,9:10"
+    print("✅ Header Fetch Test Passed!")
+
+
+def test_trailing_uid_fetch_response():
+    print("Testing FETCH responses with the UID after the literal...")
+    response = [
+        (b'3 (BODY[HEADER.FIELDS (SUBJECT)] {25}', b"Subject: [## 1 ##] AC\r\n\r\n"),
+        b" UID 88)",
+        (b'4 (BODY[HEADER.FIELDS (SUBJECT)] {25}', b"Subject: Weekly report\r\n\r\n"),
+        b" UID 90)",
+        b"5 (UID 91 FLAGS (\\Seen))",
+    ]
+    assert parse_fetch_response(response) == {b"88": response[0][1], b"90": response[2][1]}
+
+    headers = list(iter_headers(_StubMail(response), [b"90", b"88"]))
+    assert [uid for uid, _ in headers] == [b"90", b"88"]
+    assert headers[1][1]["Subject"] == "[## 1 ##] AC"
+    print("✅ Trailing UID Test Passed!")
+
+
+def test_failed_fetch_chunks():
+    print("Testing non-OK and partial FETCH chunks...")
+    # A chunk the server refuses is raised, or reported for the caller to retry
+    with pytest.raises(ImapFetchError):
+        list(iter_fetch(_StubMail([b"Message unavailable"], status="NO"), [b"7", b"8"], "(RFC822)", 10))
+    missing = []
+    assert list(iter_fetch(_StubMail([b"Message unavailable"], status="NO"), [b"7", b"8"], "(RFC822)", 10,
+                           missing=missing)) == []
+    assert missing == [b"7", b"8"]
+
+    # So is a message the OK response left out; the others are still yielded
+    partial = [(b"1 (UID 7 RFC822 {2}", b"hi"), b")"]
+    with pytest.raises(ImapFetchError):
+        list(iter_fetch(_StubMail(partial), [b"7", b"8"], "(RFC822)", 10))
+    missing = []
+    assert list(iter_fetch(_StubMail(partial), [b"7", b"8"], "(RFC822)", 10, missing=missing)) == [(b"7", b"hi")]
+    assert missing == [b"8"]
+    print("✅ Failed Fetch Chunk Test Passed!")
+
+
+def test_contract_header_filter():
+    print("Testing contract email header filter...")
+    stats = {"skipped": 0}
+    seen_ids = {"<old@kots.world>"}
+    seen_titles = {"K15A4032411202||K15A4032411202 has been completed"}
+
+    def check(subject, message_id="<new@kots.world>"):
+        return _may_need_full_email({"Subject": subject, "Message-ID": message_id}, seen_ids, seen_titles, stats)
+
+    assert not check("Weekly report")                                     # no category possible
+    assert not check("Anything", message_id="<old@kots.world>")           # known Message-ID
+    assert not check("K15A4032411202 has been completed")                 # known booking + subject
+    assert check("K15A4032411299 has been completed")
+    assert check("Kots requests you to sign")                             # booking ID may be in the body
+    assert check("Kitchen Flat Condition :: Part A :: K15A4032411202")
+    assert stats["skipped"] == 2
+    print("✅ Contract Header Filter Test Passed!")
+
+
+
+def test_uid_checkpoints():
+    print("Testing IMAP UID checkpoints...")
+    # "UID 41:*" always returns the highest UID, even when nothing is newer
+    mail = _StubMail([b"40"])
+    assert search_new_uids(mail, 40) == []
+    assert mail.fetched == [("SEARCH", None, "UID 41:*", "ALL")]
+    assert search_new_uids(_StubMail([b"41 42"]), 40) == [b"41", b"42"]
+
+    # Subject prefilters are ORed into the same SEARCH
+    assert any_of('SUBJECT "##"') == 'SUBJECT "##"'
+    assert any_of('SUBJECT "##"', 'SUBJECT "Issue Closed"', "NOT SEEN") == \
+        'OR OR SUBJECT "##" SUBJECT "Issue Closed" NOT SEEN'
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[ImapSyncState.__table__])
+    with sessionmaker(bind=engine)() as db:
+        assert get_last_uid(db, "tickets", "ops@kots.world", "Sent", 100) == 0
+        save_checkpoint(db, "tickets", "ops@kots.world", "Sent", 100, 42)
+        db.commit()
+        assert get_last_uid(db, "tickets", "ops@kots.world", "Sent", 100) == 42
+        assert get_last_uid(db, "contracts", "ops@kots.world", "Sent", 100) == 0   # per job
+        assert get_last_uid(db, "tickets", "ops@kots.world", "Sent", 101) == 0     # renumbered folder
+        save_checkpoint(db, "tickets", "ops@kots.world", "Sent", 101, 7)
+        db.commit()
+        assert db.query(ImapSyncState).count() == 1
+    print("✅ UID Checkpoint Test Passed!")
+
+
+if __name__ == "__main__":
+    test_header_fetch_parsing()
+    test_trailing_uid_fetch_response()
+    test_failed_fetch_chunks()
+    test_contract_header_filter()
+    test_uid_checkpoints()
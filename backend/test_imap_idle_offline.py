@@ -0,0 +1,157 @@
+import os
+import socket
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "benchmarks"))
+
+from fake_imap import FakeImapServer, make_message
+from config import get_settings
+from services.imap_idle import CoalescingRunner, ImapIdleWatcher, _LineReader
+
+
+class _Calls:
+    """Counts on_new_mail calls and lets the test wait for the next one."""
+
+    def __init__(self):
+        self.count = 0
+        self._cond = threading.Condition()
+
+    def __call__(self):
+        with self._cond:
+            self.count += 1
+            self._cond.notify_all()
+
+    def wait_for(self, count, timeout=5.0):
+        with self._cond:
+            return self._cond.wait_for(lambda: self.count >= count, timeout)
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_idle_watcher_pushes_new_mail():
+    print("Testing IMAP IDLE watcher against the fake IMAP server...")
+    with FakeImapServer() as server, patch.multiple(
+        get_settings(), email_host="127.0.0.1", email_port=server.port, email_use_ssl=False
+    ):
+        server.add_message("Sent", make_message("Old mail"))
+        calls = _Calls()
+        live_changes = []
+        watcher = ImapIdleWatcher(calls, folders=["Sent", "No Such Folder"], renew_seconds=1,
+                                  max_backoff_seconds=1, on_live_change=live_changes.append)
+        watcher.start()
+        try:
+            # Catch-up run on connect, then the watcher settles into IDLE
+            assert calls.wait_for(1)
+            assert _wait_until(lambda: server.commands.count("IDLE") >= 1)
+            time.sleep(0.2)
+            assert calls.count == 1
+            assert watcher.live and live_changes == [True]
+
+            # New mail is pushed within the IDLE round, not on the next poll
+            started = time.monotonic()
+            server.add_message("Sent", make_message("[## 7001 ##] Plumbing :: Leak :: K15A4032419001"))
+            assert calls.wait_for(2, timeout=2)
+            print(f"  Pushed after {time.monotonic() - started:.2f}s")
+
+            # IDLE is re-issued when renew_seconds runs out, without a spurious sync
+            idles = server.commands.count("IDLE")
+            assert _wait_until(lambda: server.commands.count("IDLE") >= idles + 2)
+            assert calls.count == 2
+
+            # A dropped connection is re-opened (and catches up once)
+            server.disconnect_idlers()
+            assert calls.wait_for(3)
+            assert live_changes == [True, False, True], live_changes
+            server.add_message("Sent", make_message("[## 7002 ##] Electrical :: Fan :: K15A4032419002"))
+            assert calls.wait_for(4, timeout=2)
+        finally:
+            watcher.stop()
+    print("✅ IMAP IDLE Watcher Test Passed!")
+
+
+def test_idle_watcher_reports_no_idle_support():
+    print("Testing IMAP IDLE watcher on a server without IDLE...")
+    with FakeImapServer() as server, patch.multiple(
+        get_settings(), email_host="127.0.0.1", email_port=server.port, email_use_ssl=False
+    ):
+        server.capabilities = b"IMAP4rev1"
+        server.add_message("Sent", make_message("Old mail"))
+        calls = _Calls()
+        live_changes = []
+        watcher = ImapIdleWatcher(calls, folders=["Sent"], on_live_change=live_changes.append)
+        watcher.start()
+        # The thread gives up without ever going live, so the caller keeps polling
+        watcher._threads[0].join(5)
+        assert not watcher._threads[0].is_alive()
+        assert not watcher.live and live_changes == [] and calls.count == 0
+        watcher.stop()
+    print("✅ IMAP IDLE Unsupported Test Passed!")
+
+
+def test_line_reader_drains_imaplib_buffer():
+    print("Testing IDLE line reader picks up imaplib's read-ahead...")
+    ours, server = socket.socketpair()
+    try:
+        file = ours.makefile("rb")
+        server.sendall(b"A1 OK NOOP completed\r\n* 4 EXISTS\r\n")
+        time.sleep(0.1)
+        # imaplib reads the tagged reply; the EXISTS line lands in its buffer
+        assert file.readline() == b"A1 OK NOOP completed\r\n"
+        reader = _LineReader(ours, threading.Event(), file)
+        assert reader.read_line(timeout=1) == b"* 4 EXISTS"
+        server.sendall(b"+ idling\r\n")
+        assert reader.read_line(timeout=1) == b"+ idling"
+        assert reader.read_line(timeout=0.2) is None
+    finally:
+        ours.close()
+        server.close()
+    print("✅ IDLE Line Reader Test Passed!")
+
+
+def test_coalescing_runner():
+    print("Testing CoalescingRunner...")
+    started = threading.Event()
+    release = threading.Event()
+    runs = []
+
+    def job():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+
+    runner = CoalescingRunner(job)
+    first = threading.Thread(target=runner.run)
+    first.start()
+    assert started.wait(5)
+
+    # Calls during a run return at once and fold into a single rerun
+    for _ in range(5):
+        runner.run()
+    release.set()
+    first.join(5)
+    assert len(runs) == 2, runs
+
+    # A failing job doesn't wedge the runner
+    runner.job = lambda: 1 / 0
+    runner.run()
+    runner.job = job
+    runner.run()
+    assert len(runs) == 3
+    print("✅ CoalescingRunner Test Passed!")
+
+
+if __name__ == "__main__":
+    test_idle_watcher_pushes_new_mail()
+    test_idle_watcher_reports_no_idle_support()
+    test_line_reader_drains_imaplib_buffer()
+    test_coalescing_runner()
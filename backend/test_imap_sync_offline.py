@@ -0,0 +1,151 @@
+import os
+import sys
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "benchmarks"))
+
+from fake_imap import FakeImapServer, make_message
+from config import get_settings
+from database import Base
+from models.contract_document import ContractDocument
+from models.imap_sync_state import ImapSyncState
+from models.notification import Notification
+from models.ticket import TenantServiceTicket
+from services import email_service, ticket_email_sync
+from services.email_service import sync_sign_request_emails
+from services.ticket_email_sync import sync_ticket_emails
+
+
+def _session():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[
+        TenantServiceTicket.__table__, Notification.__table__,
+        ContractDocument.__table__, ImapSyncState.__table__,
+    ])
+    return sessionmaker(bind=engine)()
+
+
+def _fetches(server):
+    return [c for c in server.commands if c.startswith("UID FETCH")]
+
+
+def test_ticket_sync_against_fake_server():
+    print("Testing ticket sync against the fake IMAP server...")
+    with FakeImapServer() as server, patch.multiple(
+        get_settings(), email_host="127.0.0.1", email_port=server.port, email_use_ssl=False,
+        imap_header_chunk_size=50, imap_body_chunk_size=5
+    ):
+        for i in range(120):
+            server.add_message("Sent", make_message(f"[## {5000 + i} ##] Plumbing :: Leak :: K15A40324112{i:02d}"))
+        for i in range(12):
+            server.add_message("Sent", make_message(f"Issue Closed - Ticket no {5000 + i}", body="Replaced the tap."))
+        for i in range(30):
+            server.add_message("Sent", make_message(f"Weekly report {i}", attachment_size=10_000))
+
+        db = _session()
+        result = sync_ticket_emails(db)
+        assert result["new"] == 120 and result["closed"] == 12, result
+        assert result["bytes_received"] > 0
+        assert db.query(TenantServiceTicket).filter_by(status="Closed").count() == 12
+        # The server filters out the 30 reports: one pass over 132 headers in
+        # chunks of 50, then 12 closure bodies in chunks of 5
+        assert server.commands.count('UID SEARCH UID 1:* OR SUBJECT "##" SUBJECT "Issue Closed"') == 1
+        assert len(_fetches(server)) == 3 + 3
+
+        # Next run only sees the new message
+        server.commands.clear()
+        server.add_message("Sent", make_message("[## 9001 ##] Electrical :: Switch :: K15A4032419001"))
+        result = sync_ticket_emails(db)
+        assert result["fetched"] == 1 and result["new"] == 1, result
+        assert server.commands.count('UID SEARCH UID 133:* OR SUBJECT "##" SUBJECT "Issue Closed"') == 1
+
+        # A connection dropped mid-fetch is re-opened and the chunk retried
+        server.add_message("Sent", make_message("[## 9002 ##] Electrical :: Fan :: K15A4032419002"))
+        server.drop_on_fetch = 1
+        result = sync_ticket_emails(db)
+        assert result["new"] == 1 and result["errors"] == 1, result
+    print("✅ Ticket Sync Offline Test Passed!")
+
+
+def test_contract_sync_against_fake_server():
+    print("Testing contract sync against the fake IMAP server...")
+    with FakeImapServer() as server, patch.multiple(
+        get_settings(), email_host="127.0.0.1", email_port=server.port, email_use_ssl=False
+    ):
+        server.add_message("Sent", make_message("Kots requests you to sign :: K15A4032411202",
+                                                body="Start signing: https://sign.zoho.in/signform/abc"))
+        server.add_message("Sent", make_message("Weekly report", attachment_size=50_000))
+        server.add_message("Sent", make_message("Kitchen Flat Condition :: Part A :: K15A4032411202"))
+
+        db = _session()
+        result = sync_sign_request_emails(db)
+        assert result["new"] == 2, result
+        docs = {d.document_category: d for d in db.query(ContractDocument)}
+        assert docs["SIGN_REQUEST"].sign_url == "https://sign.zoho.in/signform/abc"
+        assert "CIR" in docs
+        # The unrelated report (and its attachment) is never downloaded
+        assert len(_fetches(server)) == 2 and result["bytes_received"] < 50_000
+    print("✅ Contract Sync Offline Test Passed!")
+
+
+def _failing_once(func, subject_part):
+    """Wrap a per-email handler so it raises the first time it sees `subject_part`."""
+    failed = []
+
+    def wrapper(msg, *args):
+        if subject_part in (msg.get("Subject") or "") and not failed:
+            failed.append(subject_part)
+            raise RuntimeError("database hiccup")
+        return func(msg, *args)
+    return wrapper
+
+
+def test_failed_email_retried_next_run():
+    print("Testing failed emails are retried on the next run...")
+    with FakeImapServer() as server, patch.multiple(
+        get_settings(), email_host="127.0.0.1", email_port=server.port, email_use_ssl=False
+    ):
+        for i in range(3):
+            server.add_message("Sent", make_message(f"[## {6000 + i} ##] Plumbing :: Leak :: K15A40324113{i:02d}"))
+        db = _session()
+
+        # The middle ticket fails; the others are saved but the checkpoint stays below it
+        handler = _failing_once(ticket_email_sync._process_ticket_email, "6001")
+        with patch.object(ticket_email_sync, "_process_ticket_email", handler):
+            result = sync_ticket_emails(db)
+        assert result["new"] == 2 and result["errors"] == 1, result
+        assert db.query(ImapSyncState).filter_by(sync_name="tickets").one().last_uid == 1
+
+        server.commands.clear()
+        result = sync_ticket_emails(db)
+        assert result["new"] == 1 and result["skipped"] == 1, result
+        assert server.commands.count('UID SEARCH UID 2:* OR SUBJECT "##" SUBJECT "Issue Closed"') == 1
+        assert db.query(TenantServiceTicket).count() == 3
+        assert db.query(ImapSyncState).filter_by(sync_name="tickets").one().last_uid == 3
+
+        # Contracts: one message the server doesn't deliver, one that fails to process
+        cir = server.add_message("Sent", make_message("Kitchen Flat Condition :: Part A :: K15A4032411202"))
+        server.add_message("Sent", make_message("Kots requests you to sign :: K15A4032411203",
+                                                body="Start signing: https://sign.zoho.in/signform/abc"))
+        server.omit_on_fetch = {cir}
+        handler = _failing_once(email_service._process_single_email, "K15A4032411203")
+        with patch.object(email_service, "_process_single_email", handler):
+            result = sync_sign_request_emails(db)
+        assert result["new"] == 0 and result["errors"] == 1, result
+        assert db.query(ImapSyncState).filter_by(sync_name="contracts").one().last_uid == cir - 1
+
+        server.omit_on_fetch = set()
+        result = sync_sign_request_emails(db)
+        assert result["new"] == 2, result
+        assert db.query(ImapSyncState).filter_by(sync_name="contracts").one().last_uid == cir + 1
+    print("✅ Failed Email Retry Test Passed!")
+
+
+if __name__ == "__main__":
+    test_ticket_sync_against_fake_server()
+    test_contract_sync_against_fake_server()
+    test_failed_email_retried_next_run()
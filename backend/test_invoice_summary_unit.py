@@ -0,0 +1,106 @@
+import asyncio
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from database import Base, get_async_read_db
+from main import app
+from models.booking import FlatBookingOrder
+from models.tenant_invoice import TenantInvoice
+from services.auth_service import create_session_token
+from services import invoice_query
+from services.invoice_query import fetch_invoice_summary
+
+TODAY = date(2025, 6, 15)
+
+
+def _invoice(id, status, balance, balance_amount, due_date, booking_id="K05B40SUM01"):
+    # balance_amount is generated by Postgres (migrations/0004, 0007); SQLite gets it set directly
+    return TenantInvoice(id=id, booking_id=booking_id, status=status, balance=balance,
+                         balance_amount=balance_amount, due_date=due_date)
+
+
+def _setup():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    TestSession = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+    async def seed():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with TestSession() as db:
+            db.add(FlatBookingOrder(id=1, flat_booking_order_code="K05B40SUM01", tenant_phone_number="9123456781"))
+            db.add_all([
+                _invoice(1, "Sent", "Rs. 1,200.00", Decimal("1200.00"), date(2025, 7, 1)),    # next due
+                _invoice(2, "Sent", "500", Decimal("500"), date(2025, 8, 1)),
+                _invoice(3, "Sent", "250", Decimal("250"), date(2025, 6, 1)),                # past due date
+                _invoice(4, "Overdue", "100", Decimal("100"), None),                         # overdue by status
+                _invoice(5, "Sent", "75", Decimal("75"), None),                              # no due date
+                _invoice(6, "Sent", "TBD", None, date(2025, 9, 1)),                          # unparseable amount
+                _invoice(7, "Paid", "0", Decimal("0"), date(2025, 6, 20)),                   # not pending
+                _invoice(8, "Sent", "999", Decimal("999"), date(2025, 6, 16), booking_id="K00OTHER01"),
+            ])
+            await db.commit()
+
+    asyncio.run(seed())
+    return TestSession
+
+
+def test_invoice_summary_aggregates():
+    print("Testing invoice summary aggregation...")
+    TestSession = _setup()
+
+    async def summarise(booking_id):
+        async with TestSession() as db:
+            return await fetch_invoice_summary(db, booking_id, today=TODAY)
+
+    with patch.object(invoice_query.logger, "warning") as warning:
+        summary = asyncio.run(summarise("K05B40SUM01"))
+    assert summary.pending_count == 6
+    # The unparseable balance is left out of the sum, and that is logged
+    assert summary.outstanding_balance == Decimal("2125.00")
+    assert "1 pending balance(s) not parseable" in warning.call_args[0][0]
+    # Past due date or Overdue status; a NULL due date is neither overdue nor next due
+    assert summary.overdue_count == 2
+    assert summary.next_due_date == date(2025, 7, 1)
+
+    empty = asyncio.run(summarise("K00NONE01"))
+    assert empty.pending_count == 0 and empty.outstanding_balance == 0 and empty.next_due_date is None
+    print("✅ Invoice Summary Test Passed!")
+
+
+def test_invoice_summary_route():
+    print("Testing /api/invoices/summary...")
+    TestSession = _setup()
+
+    async def override_get_async_read_db():
+        async with TestSession() as db:
+            yield db
+
+    app.dependency_overrides[get_async_read_db] = override_get_async_read_db
+    try:
+        client = TestClient(app)
+        headers = {"Authorization": f"Bearer {create_session_token('9123456781')}"}
+
+        res = client.get("/api/invoices/summary", params={"booking_id": "K05B40SUM01"}, headers=headers)
+        print(f"Own booking: {res.status_code} {res.text[:120]}")
+        assert res.status_code == 200
+        body = res.json()
+        assert body["pending_count"] == 6 and Decimal(body["outstanding_balance"]) == Decimal("2125.00")
+
+        res = client.get("/api/invoices/summary", params={"booking_id": "K00OTHER01"}, headers=headers)
+        assert res.status_code == 403
+    finally:
+        app.dependency_overrides.pop(get_async_read_db, None)
+    print("✅ Invoice Summary Route Test Passed!")
+
+
+if __name__ == "__main__":
+    test_invoice_summary_aggregates()
+    test_invoice_summary_route()
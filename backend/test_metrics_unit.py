@@ -0,0 +1,60 @@
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from config import get_settings
+from main import app
+from services.auth_service import create_session_token
+from services.query_metrics import end_request, get_route_summary, instrument_engine, record_route, start_request
+
+OPS_KEY = "ops-test-key"
+
+
+def test_metrics_need_ops_key():
+    print("Testing /api/metrics access...")
+    client = TestClient(app)
+    tenant = {"Authorization": f"Bearer {create_session_token('9123456780')}"}
+    ops = {"X-Ops-Key": OPS_KEY}
+    for path in ("/api/metrics/cache", "/api/metrics/routes"):
+        assert client.get(path).status_code == 403
+        assert client.get(path, headers=ops).status_code == 403   # no key configured
+        with patch.object(get_settings(), "ops_api_key", OPS_KEY):
+            assert client.get(path, headers=tenant).status_code == 403
+            res = client.get(path, headers=ops)
+            print(f"{path}: {res.status_code}")
+            assert res.status_code == 200 and res.json()["success"]
+    print("✅ Metrics Access Test Passed!")
+
+
+def test_sql_stats_survive_failed_statements():
+    print("Testing per-request SQL stats around a failing statement...")
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    token = start_request()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM no_such_table"))
+            conn.execute(text("SELECT 2"))
+            # Nothing from the failed statement is left on the pooled connection
+            assert not conn.info.get("query_start")
+    finally:
+        stats = end_request(token)
+    assert stats["statements"] == 2 and stats["slowest_sql"] in ("SELECT 1", "SELECT 2")
+
+    # The slowest statement per route is reported by /api/metrics/routes
+    record_route("GET /api/test-metrics", 12.0, {**stats, "slowest_ms": 9.5, "slowest_sql": "SELECT\n  1"})
+    record_route("GET /api/test-metrics", 3.0, stats)
+    summary = get_route_summary()["GET /api/test-metrics"]
+    assert summary["requests"] == 2
+    assert summary["slowest_statement_ms"] == 9.5 and summary["slowest_sql"] == "SELECT 1"
+    print("✅ SQL Stats Test Passed!")
+
+
+if __name__ == "__main__":
+    test_metrics_need_ops_key()
+    test_sql_stats_survive_failed_statements()
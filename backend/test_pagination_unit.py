@@ -0,0 +1,56 @@
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models.tenant_invoice import TenantInvoice
+from services.pagination import DEFAULT_PAGE_SIZE, page_limit, paginate, page_rows
+
+
+def _all_pages(db, limit):
+    seen, cursor = [], None
+    while True:
+        stmt = paginate(select(TenantInvoice).where(TenantInvoice.booking_id == "K0PAGE01"),
+                        TenantInvoice.due_date, TenantInvoice.id, cursor, limit)
+        rows, cursor = page_rows(db.execute(stmt).scalars().all(), "due_date", limit)
+        assert len(rows) <= limit
+        seen.extend(row.id for row in rows)
+        if not cursor:
+            return seen
+
+
+def test_keyset_pages_cover_every_row_once():
+    print("Testing keyset pagination...")
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[TenantInvoice.__table__])
+    with sessionmaker(bind=engine)() as db:
+        start = date(2025, 1, 1)
+        for i in range(1, 12):
+            # due_date has no default: ids 1-5 stay NULL, the rest share dates to exercise the tie-break on id
+            due = None if i <= 5 else start + timedelta(days=i // 3)
+            db.add(TenantInvoice(id=i, booking_id="K0PAGE01", due_date=due))
+        db.add(TenantInvoice(id=99, booking_id="K0OTHER01", due_date=start))
+        db.commit()
+        assert db.query(TenantInvoice).filter(TenantInvoice.due_date.is_(None)).count() == 5
+
+        # NULLs first (as in the unpaginated DESC order), then newest first, id DESC within a tie
+        expected = [5, 4, 3, 2, 1, 11, 10, 9, 8, 7, 6]
+        # 4 ends a page inside the NULL block, 5 exactly at its end, 2 on a tie
+        for limit in (4, 5, 2, 1, 20):
+            seen = _all_pages(db, limit)
+            assert seen == expected, (limit, seen)
+            assert len(set(seen)) == len(seen)
+
+        # Neither limit nor cursor: the whole list in one response, as before paging existed
+        assert page_limit(None, None) is None
+        stmt = paginate(select(TenantInvoice).where(TenantInvoice.booking_id == "K0PAGE01"),
+                        TenantInvoice.due_date, TenantInvoice.id, None, None)
+        rows, cursor = page_rows(db.execute(stmt).scalars().all(), "due_date", None)
+        assert [row.id for row in rows] == expected and cursor is None
+        assert page_limit("abc", None) == DEFAULT_PAGE_SIZE and page_limit(None, 7) == 7
+    print("✅ Keyset Pagination Test Passed!")
+
+
+if __name__ == "__main__":
+    test_keyset_pages_cover_every_row_once()
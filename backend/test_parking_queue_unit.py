@@ -0,0 +1,36 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models.parking import ParkingLock
+from services.parking_queue import WaitingListIndex, waiting_index, waiting_position_query
+
+
+def test_waiting_position():
+    print("Testing parking waiting-list position...")
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        for i in range(1, 11):
+            db.add(ParkingLock(id=i, property_id=1 if i != 5 else 2, parking_notify_me=i % 3 != 0))
+        db.commit()
+        # Property 1 waiting ids: 1, 2, 4, 7, 8, 10
+        target = db.get(ParkingLock, 8)
+        assert db.execute(waiting_position_query(target)).scalar() == 5
+
+        index = WaitingListIndex(ttl=60)
+        assert index.position(db, target) == 5
+
+        # Writes through the ORM move entries in the shared index
+        assert waiting_index.position(db, target) == 5
+        db.get(ParkingLock, 2).parking_notify_me = False
+        db.add(ParkingLock(id=11, property_id=1, parking_notify_me=True))
+        db.commit()
+        assert waiting_index.position(db, target) == 4
+        assert waiting_index.position(db, db.get(ParkingLock, 11)) == 6
+        waiting_index.clear()
+    print("✅ Parking Waiting Position Test Passed!")
+
+
+if __name__ == "__main__":
+    test_waiting_position()
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from config import get_settings
+from database import Base, get_read_db
+from main import app
+from models.parking import ParkingLock
+from services.auth_service import create_session_token
+from services.parking_snapshot import get_parking_snapshots, invalidate_parking_snapshot
+
+OPS_KEY = "ops-test-key"
+
+
+def _session_factory():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine, tables=[ParkingLock.__table__])
+    TestSession = sessionmaker(bind=engine)
+    soon = datetime.utcnow() + timedelta(hours=5)
+    later = datetime.utcnow() + timedelta(days=30)
+    with TestSession() as db:
+        # Property 1: 10 slots, 4 paid, 2 reserved; one expiring reservation, two waiting
+        slots = dict(total_available_parking_slots=10, total_paid_parking_slots=4, reserved_parking_slots=2)
+        db.add_all([
+            ParkingLock(id=1, property_id=1, parking_slot_reserved=True, parking_reservation_expires_at=soon, **slots),
+            ParkingLock(id=2, property_id=1, parking_slot_reserved=True, parking_reservation_expires_at=later, **slots),
+            ParkingLock(id=3, property_id=1, parking_notify_me=True, **slots),
+            ParkingLock(id=4, property_id=1, parking_notify_me=True, **slots),
+            ParkingLock(id=5, property_id=2, total_available_parking_slots=3, total_paid_parking_slots=3),
+        ])
+        db.commit()
+    return TestSession
+
+
+def test_parking_snapshots():
+    print("Testing per-property parking snapshots...")
+    invalidate_parking_snapshot()
+    TestSession = _session_factory()
+    with TestSession() as db:
+        snapshots = get_parking_snapshots(db, [1, 2, 99, 1])
+        assert set(snapshots) == {1, 2}
+        one = snapshots[1]
+        assert (one.flats, one.capacity, one.paid, one.reserved) == (4, 10, 4, 2)
+        assert (one.reserved_flats, one.waiting_list_length, one.expiring_reservations) == (2, 2, 1)
+        assert one.available == 4
+        assert snapshots[2].available == 0 and snapshots[2].waiting_list_length == 0
+
+        # Served from cache until an ORM write to the property drops it
+        assert get_parking_snapshots(db, [1])[1] is one
+        db.get(ParkingLock, 3).parking_notify_me = False
+        db.commit()
+        assert get_parking_snapshots(db, [1])[1].waiting_list_length == 1
+        assert get_parking_snapshots(db, [2])[2] is snapshots[2]
+
+        # Moving a flat to another property refreshes both
+        db.get(ParkingLock, 4).property_id = 2
+        db.commit()
+        moved = get_parking_snapshots(db, [1, 2])
+        assert moved[1].flats == 3 and moved[2].flats == 2
+    invalidate_parking_snapshot()
+    print("✅ Parking Snapshot Test Passed!")
+
+
+def test_parking_snapshots_endpoint():
+    print("Testing /api/parking/snapshots access and validation...")
+    invalidate_parking_snapshot()
+    TestSession = _session_factory()
+
+    def override_get_read_db():
+        with TestSession() as db:
+            yield db
+
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    try:
+        client = TestClient(app)
+        tenant = {"Authorization": f"Bearer {create_session_token('9123456780')}"}
+        ops = {"X-Ops-Key": OPS_KEY}
+        params = {"property_ids": "1,2,99"}
+
+        # Without an ops key configured nobody gets in, tenants included
+        assert client.get("/api/parking/snapshots", params=params, headers=ops).status_code == 403
+        with patch.object(get_settings(), "ops_api_key", OPS_KEY):
+            assert client.get("/api/parking/snapshots", params=params, headers=tenant).status_code == 403
+            assert client.get("/api/parking/snapshots", params=params,
+                              headers={"X-Ops-Key": "wrong"}).status_code == 403
+
+            res = client.get("/api/parking/snapshots", params=params, headers=ops)
+            print(f"Ops key: {res.status_code} {res.text[:120]}")
+            assert res.status_code == 200
+            body = res.json()
+            assert [s["property_id"] for s in body["snapshots"]] == [1, 2]
+            assert body["missing_property_ids"] == [99]
+
+            assert client.get("/api/parking/snapshots", params={"property_ids": "1,x"},
+                              headers=ops).status_code == 400
+            too_many = ",".join(str(i) for i in range(201))
+            assert client.get("/api/parking/snapshots", params={"property_ids": too_many},
+                              headers=ops).status_code == 400
+    finally:
+        app.dependency_overrides.pop(get_read_db, None)
+        invalidate_parking_snapshot()
+    print("✅ Parking Snapshot Endpoint Test Passed!")
+
+
+if __name__ == "__main__":
+    test_parking_snapshots()
+    test_parking_snapshots_endpoint()
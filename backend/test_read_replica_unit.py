@@ -0,0 +1,36 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, RoutingSession
+from models.notification import Notification
+
+
+def test_reads_go_to_replica_until_first_write():
+    print("Testing read replica routing...")
+    primary = create_engine("sqlite://")
+    replica = create_engine("sqlite://")
+    for eng in (primary, replica):
+        Base.metadata.create_all(eng)
+
+    # Replica has one row the primary doesn't, so we can tell which one answered
+    with sessionmaker(bind=replica)() as db:
+        db.add(Notification(booking_id="K0REPLICA01", message="from replica"))
+        db.commit()
+
+    ReadSession = sessionmaker(class_=RoutingSession, primary=primary, replica=replica, autoflush=False)
+    with ReadSession() as db:
+        assert db.query(Notification).count() == 1  # replica
+        assert not db.stick_to_primary
+
+        db.add(Notification(booking_id="K0PRIMARY01", message="written"))
+        db.flush()
+        assert db.stick_to_primary
+
+        # Reads after a write see the primary, including the row just written
+        rows = db.query(Notification).all()
+        assert [r.message for r in rows] == ["written"]
+    print("✅ Read Replica Routing Test Passed!")
+
+
+if __name__ == "__main__":
+    test_reads_go_to_replica_until_first_write()
@@ -0,0 +1,68 @@
+import re
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import boto3
+from botocore.config import Config
+
+from services import s3_service
+from services.s3_service import S3Service, get_s3_stats, presign_get_urls, s3_key_from_url
+
+
+def test_shared_client_and_presign_cache():
+    print("Testing shared S3 client and presigned URL cache...")
+    s3_service._presigned_urls.clear()
+    first, second = S3Service(), S3Service()
+    assert first.s3_client is second.s3_client
+    assert get_s3_stats()["clients_created"] == 1
+
+    first.bucket_name = second.bucket_name = "kots-test-bucket"
+    url = first.generate_presigned_url("invoices/INV-1.pdf")
+    assert "Signature=" in url
+    # Same key from another instance -> same URL, no new signature
+    assert second.generate_presigned_url("invoices/INV-1.pdf") == url
+    assert first.generate_presigned_url("invoices/INV-2.pdf") != url
+    # A different lifetime is signed separately
+    assert first.generate_presigned_url("invoices/INV-1.pdf", expiration=600) != url
+
+    stats = get_s3_stats()
+    assert stats["urls_signed"] == 3 and stats["urls_reused"] == 1
+
+    # Inside the refresh margin the URL is re-signed
+    with patch("services.s3_service.time.time", return_value=s3_service.time.time() + 3600):
+        assert "Signature=" in first.generate_presigned_url("invoices/INV-2.pdf")
+    assert get_s3_stats()["urls_signed"] == 4
+    print("✅ S3 Presign Cache Test Passed!")
+
+
+
+def test_batch_presign_matches_boto3():
+    print("Testing batch SigV4 presigning...")
+    settings = s3_service.settings
+    reference = boto3.client(
+        "s3", aws_access_key_id=settings.my_aws_access_key_id,
+        aws_secret_access_key=settings.my_aws_secret_access_key, region_name=settings.my_aws_region,
+        config=Config(signature_version="s3v4", s3={"addressing_style": "virtual"})
+    )
+    keys = ["contracts/K05B40/Signed Lease (1)+final.pdf", "invoices/INV-1.pdf", "cir/ünï/ç~1.pdf"]
+    for key in keys:
+        expected = reference.generate_presigned_url(
+            "get_object", Params={"Bucket": "kots-test-bucket", "Key": key}, ExpiresIn=3600)
+        amz_date = re.search(r"X-Amz-Date=(\w+)", expected).group(1)
+        signed_at = datetime.strptime(amz_date, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+        assert presign_get_urls("kots-test-bucket", [key], 3600, signed_at)[key] == expected
+
+    # Signing key is derived once per day, not per URL
+    derived = get_s3_stats()["signing_keys_derived"]
+    urls = presign_get_urls("kots-test-bucket", [f"invoices/INV-{i}.pdf" for i in range(30)], 3600)
+    assert len(set(urls.values())) == 30
+    assert get_s3_stats()["signing_keys_derived"] - derived <= 1
+
+    assert s3_key_from_url("https://kots.s3.us-east-1.amazonaws.com/contracts/a%20b.pdf") == "contracts/a%20b.pdf"
+    assert s3_key_from_url("invoices/INV-1.pdf") == "invoices/INV-1.pdf"
+    print("✅ Batch Presign Test Passed!")
+
+
+if __name__ == "__main__":
+    test_shared_client_and_presign_cache()
+    test_batch_presign_matches_boto3()
@@ -1,7 +1,7 @@
 import jwt
 import os
 from dotenv import load_dotenv
-from services.auth_service import create_sso_token
+from services.auth_service import create_sso_token, get_sso_token, get_sso_cache_stats
 from config import get_settings
 
 load_dotenv()
@@ -25,5 +25,23 @@ def test_sso_token_generation():
     assert "exp" in decoded
     print("✅ Unit Test Passed!")
 
+def test_sso_token_reuse():
+    print("Testing SSO Token Reuse...")
+    phone = "919999999999"
+
+    first = get_sso_token(phone, "reuse-booking-1")
+    second = get_sso_token(phone, "reuse-booking-1")
+    other = get_sso_token(phone, "reuse-booking-2")
+
+    assert first == second
+    assert other != first
+
+    stats = get_sso_cache_stats()
+    print(f"Stats: {stats}")
+    assert stats["tokens_reused"] >= 1
+    assert stats["tokens_signed"] >= 2
+    print("✅ Reuse Test Passed!")
+
 if __name__ == "__main__":
     test_sso_token_generation()
+    test_sso_token_reuse()
@@ -0,0 +1,45 @@
+import time
+from services.auth_service import create_session_token, verify_token_cached, get_token_cache_stats
+from services.ttl_cache import TTLCache
+
+
+def test_ttl_cache_expiry_and_eviction():
+    print("Testing TTLCache...")
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1, expires_at=time.time() + 60)
+    cache.set("b", 2, expires_at=time.time() - 1)  # already expired
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+    cache.set("c", 3, ttl=60)
+    cache.set("d", 4, ttl=60)  # evicts least recently used ("a")
+    assert cache.get("a") is None
+    assert cache.get("d") == 4
+    print(f"Stats: {cache.stats()}")
+    print("✅ TTLCache Test Passed!")
+
+
+def test_verified_token_cache():
+    print("Testing verified token cache...")
+    token = create_session_token("9999999999")
+    before = get_token_cache_stats()
+
+    first = verify_token_cached(token)
+    second = verify_token_cached(token)
+    after = get_token_cache_stats()
+
+    assert first["phone"] == "9999999999"
+    assert second == first
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"] + 1
+
+    # Invalid tokens are rejected and never cached
+    assert verify_token_cached(token + "x") is None
+    assert verify_token_cached(token + "x") is None
+    print(f"Stats: {get_token_cache_stats()}")
+    print("✅ Token Cache Test Passed!")
+
+
+if __name__ == "__main__":
+    test_ttl_cache_expiry_and_eviction()
+    test_verified_token_cache()